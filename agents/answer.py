@@ -1,13 +1,40 @@
 # agents/answer_node.py
+from typing import Optional
+
 from agents.state import QueryState
 from langchain_core.messages import SystemMessage, HumanMessage
+from langchain_core.runnables import RunnableConfig
 from utils.llm import get_llm
+from retrieval.context_packer import count_tokens
+from agents.deadline import invoke_llm, ainvoke_llm, count_llm_call, degrade, DeadlineExceeded, ANSWER_HEDGING
 
 llm = get_llm()
 
 
-def answer_generation_node(state: QueryState) -> QueryState:
-
+SYSTEM_PROMPT = (
+    "You are an evidence-bound assistant.\n\n"
+    "Rules:\n"
+    "- Answer ONLY using the provided evidence.\n"
+    "- Do NOT add external knowledge.\n"
+    "- If the evidence does not fully answer the question, say so explicitly.\n"
+    "- Do NOT speculate or infer beyond the text."
+)
+
+# Explicit refusal detection
+REFUSAL_SIGNALS = [
+    "insufficient",
+    "does not answer",
+    "not provided",
+    "cannot be determined",
+    "not mentioned"
+]
+
+
+def _precheck(state: QueryState):
+    """
+    Returns a refusal update when there is nothing to answer from,
+    otherwise None.
+    """
     # Hard stop — validator decides authority
     if state.get("validation_status") != "pass":
         return {
@@ -30,7 +57,12 @@ def answer_generation_node(state: QueryState) -> QueryState:
             "reason": "No validated evidence"
         }
 
+    return None
+
+
+def _answer_messages(state: QueryState) -> list:
     query = state["final_query"]
+    chunks = state.get("final_chunks", [])
 
     context = "\n\n".join(
         f"[{c['chunk_id']}] {c['text']}"
@@ -39,40 +71,46 @@ def answer_generation_node(state: QueryState) -> QueryState:
 
     # print(f"✅CONTEXT: {context}...")
 
-    system_prompt = (
-        "You are an evidence-bound assistant.\n\n"
-        "Rules:\n"
-        "- Answer ONLY using the provided evidence.\n"
-        "- Do NOT add external knowledge.\n"
-        "- If the evidence does not fully answer the question, say so explicitly.\n"
-        "- Do NOT speculate or infer beyond the text."
-    )
+    # Multi-hop: one synthesis call over the merged evidence of every hop
+    sub_questions = state.get("sub_questions") or []
+    plan = ""
+    if sub_questions:
+        plan = "Sub-questions:\n" + "\n".join(f"- {q}" for q in sub_questions) + "\n\n"
 
     user_prompt = (
         f"Question:\n{query}\n\n"
+        f"{plan}"
         f"Evidence:\n{context}\n\n"
         "Answer:"
     )
 
-    messages = [
-        SystemMessage(content=system_prompt),
+    return [
+        SystemMessage(content=SYSTEM_PROMPT),
         HumanMessage(content=user_prompt)
     ]
 
-    response = llm.invoke(messages)
-    answer_text = response.content.strip()
 
+def _prompt_tokens(messages: list, response) -> int:
+    """Billed input tokens when the provider reports them, else an estimate."""
+    usage = getattr(response, "usage_metadata", None) or {}
+    if usage.get("input_tokens"):
+        return int(usage["input_tokens"])
+    return sum(count_tokens(m.content) for m in messages)
 
-    # Explicit refusal detection
-    refusal_signals = [
-        "insufficient",
-        "does not answer",
-        "not provided",
-        "cannot be determined",
-        "not mentioned"
-    ]
 
-    if any(sig in answer_text.lower() for sig in refusal_signals):
+def _deadline_refusal(state: QueryState) -> QueryState:
+    return {
+        **state,
+        "answer_text": None,
+        "answer_citations": [],
+        "answer_supported": False,
+        "refused": True,
+        "degraded": degrade(state, "answer_timeout")
+    }
+
+
+def _finalize_answer(state: QueryState, answer_text: str) -> QueryState:
+    if any(sig in answer_text.lower() for sig in REFUSAL_SIGNALS):
         return {
             **state,
             "answer_text": None,
@@ -82,7 +120,7 @@ def answer_generation_node(state: QueryState) -> QueryState:
             "reason": "Evidence insufficient to answer question"
         }
 
-    citations = [c["chunk_id"] for c in chunks]
+    citations = [c["chunk_id"] for c in state.get("final_chunks", [])]
 
     return {
         **state,
@@ -92,3 +130,45 @@ def answer_generation_node(state: QueryState) -> QueryState:
         "refused": False,
         "reason": None
     }
+
+
+def answer_generation_node(state: QueryState, config: Optional[RunnableConfig] = None) -> QueryState:
+    """
+    `config` carries the graph's callbacks to the LLM call, so under
+    `stream_mode="messages"` answer tokens surface as they are generated.
+
+    Bounded by the request deadline. With ANSWER_HEDGING=1 the async
+    node (not this one) sends a second request once the first is slower
+    than the recent p95, unless tokens are being streamed.
+    """
+    refused = _precheck(state)
+    if refused is not None:
+        return refused
+
+    messages = _answer_messages(state)
+    state = count_llm_call(state)
+    try:
+        response = invoke_llm(llm, messages, state, config=config, hedge=ANSWER_HEDGING)
+    except DeadlineExceeded:
+        return _deadline_refusal(state)
+
+    prompt_tokens = _prompt_tokens(messages, response)
+    print(f"✅ANSWER PROMPT TOKENS: {prompt_tokens} (context {state.get('context_tokens')})")
+    return _finalize_answer({**state, "prompt_tokens": prompt_tokens}, response.content.strip())
+
+
+async def answer_generation_node_async(state: QueryState, config: Optional[RunnableConfig] = None) -> QueryState:
+    refused = _precheck(state)
+    if refused is not None:
+        return refused
+
+    messages = _answer_messages(state)
+    state = count_llm_call(state)
+    try:
+        response = await ainvoke_llm(llm, messages, state, config=config, hedge=ANSWER_HEDGING)
+    except DeadlineExceeded:
+        return _deadline_refusal(state)
+
+    prompt_tokens = _prompt_tokens(messages, response)
+    print(f"✅ANSWER PROMPT TOKENS: {prompt_tokens} (context {state.get('context_tokens')})")
+    return _finalize_answer({**state, "prompt_tokens": prompt_tokens}, response.content.strip())
@@ -0,0 +1,31 @@
+# agents/compress.py
+from agents.state import QueryState
+
+
+def compress_context_node(state: QueryState, compressor) -> QueryState:
+    """
+    Optional stage between validation and answer: keep only the evidence
+    sentences closest to the query (see retrieval/context_compressor.py).
+    """
+    chunks = state.get("final_chunks") or []
+    if state.get("validation_status") != "pass" or not chunks:
+        return state
+
+    query_embedding = state.get("query_embedding")
+    if query_embedding is None:
+        # multi-hop: no single retrieval embedding for the original question
+        from indexes.dense_embeddings import embed_texts   # loads the BGE model
+        query_embedding = embed_texts([state.get("final_query") or state["user_query"]])[0]
+
+    compressed, report = compressor.compress(query_embedding, chunks)
+    print(
+        f"✅CONTEXT COMPRESSED: {report['sentences_kept']}/{report['sentences_total']} sentences, "
+        f"{report['tokens_before']} → {report['tokens_after']} tokens"
+    )
+
+    return {
+        **state,
+        "final_chunks": compressed,
+        "context_tokens": report["tokens_after"],
+        "compression": report
+    }
@@ -0,0 +1,241 @@
+# agents/deadline.py
+"""
+End-to-end request deadlines.
+
+- `deadline_at` (time.monotonic) is set once per request and carried in
+  QueryState; every node reads the remaining budget from it
+- LLM calls are bounded by the remaining budget (DeadlineExceeded)
+- Low budget → degrade instead of failing: local intent, skip rewrite,
+  skip rerank, shrink context; each step is recorded in `degraded`
+- Optional hedging (async path only): a second identical request after
+  the p95 latency, first response wins, the loser is cancelled
+"""
+import os
+import time
+import asyncio
+import contextvars
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeout
+from typing import Optional
+
+import numpy as np
+
+from agents.state import QueryState
+from retrieval.context_packer import MAX_CONTEXT_TOKENS
+from utils.rate_limiter import abandoned
+
+# off by default (0): the thresholds below are seconds LEFT, so the deadline
+# must be well above LOCAL_INTENT_BELOW_SECONDS or normal traffic degrades
+REQUEST_DEADLINE_SECONDS = float(os.getenv("REQUEST_DEADLINE_SECONDS", 0))
+ANSWER_HEDGING = os.getenv("ANSWER_HEDGING", "0") == "1"
+
+# degrade when less than this is left
+LOCAL_INTENT_BELOW_SECONDS = 20    # accept the local intent whatever its confidence
+SKIP_REWRITE_BELOW_SECONDS = 15
+SKIP_RERANK_BELOW_SECONDS = 10
+SHRINK_CONTEXT_BELOW_SECONDS = 10
+SHRUNK_CONTEXT_FRACTION = 0.5
+MIN_LLM_CALL_SECONDS = 1.0         # not worth starting an LLM call
+
+# config["configurable"] flag set when answer tokens stream to a client
+# (graph/streaming.py STREAM_CONFIG): hedging is off for those calls
+STREAM_ANSWER_KEY = "stream_answer"
+
+HEDGE_PERCENTILE = 95
+HEDGE_MIN_SAMPLES = 20             # no hedging until the latency estimate is warm
+HEDGE_WINDOW = 200
+LLM_CALL_WORKERS = 16
+
+# with a deadline, sync calls run here so the caller can stop waiting; the
+# orphaned call is marked abandoned: it leaves the limiter queue if still
+# waiting there and is not retried, but an HTTP request in progress keeps
+# its thread until the provider answers. At most LLM_CALL_WORKERS sync
+# calls (live + abandoned) run at once; more queue here, inside the deadline.
+# Without a deadline, sync calls run inline on the caller's thread.
+_llm_executor = ThreadPoolExecutor(max_workers=LLM_CALL_WORKERS, thread_name_prefix="llm-call")
+
+
+class DeadlineExceeded(TimeoutError):
+    pass
+
+
+# --------------------
+# BUDGET
+# --------------------
+def deadline_after(seconds: float = REQUEST_DEADLINE_SECONDS) -> Optional[float]:
+    return time.monotonic() + seconds if seconds and seconds > 0 else None
+
+
+def remaining(state: QueryState) -> Optional[float]:
+    """Seconds left for this request (None → no deadline)."""
+    deadline_at = state.get("deadline_at")
+    return None if deadline_at is None else deadline_at - time.monotonic()
+
+
+def budget_below(state: QueryState, seconds: float) -> bool:
+    left = remaining(state)
+    return left is not None and left < seconds
+
+
+def degrade(state: QueryState, step: str) -> list:
+    print(f"⏱️ DEADLINE: {step} ({remaining(state) or 0:.1f}s left)")
+    return [*(state.get("degraded") or []), step]
+
+
+def context_budget(state: QueryState) -> int:
+    """Evidence token budget: shrunk when the answer call has little time."""
+    if budget_below(state, SHRINK_CONTEXT_BELOW_SECONDS):
+        return int(MAX_CONTEXT_TOKENS * SHRUNK_CONTEXT_FRACTION)
+    return MAX_CONTEXT_TOKENS
+
+
+def deadline_intent(state: QueryState) -> QueryState:
+    """Planning ran out of time: unknown intent → raw query, no rewrite."""
+    return {
+        **state,
+        "intent": "unknown",
+        "intent_confidence": 0.0,
+        "intent_reason": "Deadline exceeded",
+        "degraded": degrade(state, "plan_timeout")
+    }
+
+
+def _timeout(state: QueryState) -> Optional[float]:
+    left = remaining(state)
+    if left is not None and left < MIN_LLM_CALL_SECONDS:
+        raise DeadlineExceeded(f"{left:.2f}s left")
+    return left
+
+
+# --------------------
+# HEDGING
+# --------------------
+class LatencyTracker:
+    """Recent successful call latencies (thread-safe)."""
+
+    def __init__(self, window: int = HEDGE_WINDOW, min_samples: int = HEDGE_MIN_SAMPLES):
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.min_samples = min_samples
+        self.hedged = 0
+
+    def observe(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def record_hedge(self) -> None:
+        with self._lock:
+            self.hedged += 1
+
+    def percentile(self, p: float = HEDGE_PERCENTILE) -> Optional[float]:
+        with self._lock:
+            if len(self._samples) < self.min_samples:
+                return None
+            return float(np.percentile(self._samples, p))
+
+
+answer_latency = LatencyTracker()
+
+
+def _streaming(config) -> bool:
+    """Tokens stream to a client: two calls would interleave (or the winner differ)."""
+    configurable = (config or {}).get("configurable") or {}
+    return bool(configurable.get(STREAM_ANSWER_KEY))
+
+
+def _hedge_delay(hedge: bool, timeout: Optional[float], config=None) -> Optional[float]:
+    if not hedge or _streaming(config):
+        return None
+    delay = answer_latency.percentile()
+    if delay is None or (timeout is not None and delay >= timeout):
+        return None
+    return delay
+
+
+# --------------------
+# BOUNDED LLM CALLS
+# --------------------
+def count_llm_call(state: QueryState) -> QueryState:
+    """Per-request LLM call count (graph/routing.py derives the calls saved)."""
+    return {**state, "llm_calls": (state.get("llm_calls") or 0) + 1}
+
+
+def invoke_llm(llm, messages, state: QueryState, config=None, hedge: bool = False):
+    """
+    `llm.invoke` within the request's remaining budget.
+    Raises DeadlineExceeded when the budget runs out first.
+
+    Never hedged: a sync call cannot be cancelled, so a hedge would keep
+    a second request (and limiter slot) busy. `hedge` only records the
+    latency that ainvoke_llm hedges on.
+    """
+    timeout = _timeout(state)
+
+    def run():
+        t = time.monotonic()
+        response = llm.invoke(messages, config=config)
+        if hedge:
+            answer_latency.observe(time.monotonic() - t)
+        return response
+
+    if timeout is None:
+        return run()
+
+    gave_up = threading.Event()
+
+    def bounded():
+        abandoned.set(gave_up)
+        return run()
+
+    future = _llm_executor.submit(contextvars.copy_context().run, bounded)
+    try:
+        return future.result(timeout=timeout)
+    except FuturesTimeout:
+        gave_up.set()
+        future.cancel()
+        raise DeadlineExceeded(f"no LLM response within {timeout:.1f}s")
+
+
+async def ainvoke_llm(llm, messages, state: QueryState, config=None, hedge: bool = False):
+    timeout = _timeout(state)
+    delay = _hedge_delay(hedge, timeout, config)
+    if timeout is None and delay is None and not hedge:
+        return await llm.ainvoke(messages, config=config)
+
+    start = time.monotonic()
+
+    async def timed():
+        t = time.monotonic()
+        response = await llm.ainvoke(messages, config=config)
+        if hedge:
+            answer_latency.observe(time.monotonic() - t)
+        return response
+
+    pending = {asyncio.ensure_future(timed())}
+    try:
+        if delay is not None:
+            done, _ = await asyncio.wait(pending, timeout=delay)
+            if not done:
+                answer_latency.record_hedge()
+                print(f"⏱️ HEDGE: answer slower than p{HEDGE_PERCENTILE} ({delay:.1f}s), second request")
+                pending.add(asyncio.ensure_future(timed()))
+
+        error = None
+        while pending:
+            left = None if timeout is None else timeout - (time.monotonic() - start)
+            if left is not None and left <= 0:
+                break
+            done, pending = await asyncio.wait(pending, timeout=left, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+                error = task.exception()
+
+        if error is not None and not pending:
+            raise error
+        raise DeadlineExceeded(f"no LLM response within {timeout:.1f}s")
+    finally:
+        # loser / timed-out calls are cancelled (and leave the limiter queue)
+        for task in pending:
+            task.cancel()
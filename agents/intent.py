@@ -1,6 +1,12 @@
 # intent_check.py (NODE-1)
+import os
+import json
+import time
+import threading
+
 from agents.state import QueryState
 from utils.llm import get_llm
+from agents.deadline import invoke_llm, ainvoke_llm, count_llm_call, deadline_intent, DeadlineExceeded
 from utils.json_fomater import extract_json
 
 from langchain_core.messages import SystemMessage, HumanMessage
@@ -12,11 +18,12 @@ VALID_MODEL_INTENTS = {
     "unanswerable"
 }
 
-def intent_check_node(state: QueryState) -> QueryState:
-    llm = get_llm()
-    query = state["user_query"]
+# opt-in: when set, every LLM decision is appended to this path as
+# training data for agents/local_intent.py (e.g. ./logs/intent_decisions.jsonl)
+INTENT_DECISION_LOG = os.getenv("INTENT_DECISION_LOG", "")
+_log_lock = threading.Lock()
 
-    system_prompt = """
+SYSTEM_PROMPT = """
     You are an intent classifier for a retrieval system.
 
     Allowed labels:
@@ -37,14 +44,31 @@ def intent_check_node(state: QueryState) -> QueryState:
     }
     """
 
+
+def _intent_messages(state: QueryState) -> list:
+    query = state["user_query"]
     user_prompt = f'Query: "{query}"'
 
-    response = llm.invoke([
-        SystemMessage(content=system_prompt),
+    return [
+        SystemMessage(content=SYSTEM_PROMPT),
         HumanMessage(content=user_prompt)
-    ])
+    ]
+
+
+def log_intent_decision(query: str, intent: str, confidence: float, path: str = INTENT_DECISION_LOG) -> None:
+    if not path or intent not in VALID_MODEL_INTENTS:
+        return
+
+    record = {"query": query, "intent": intent, "confidence": confidence, "ts": time.time()}
+    try:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with _log_lock, open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+    except OSError as e:
+        print(f"⚠️ Could not log intent decision: {e}")
 
 
+def _parse_intent(state: QueryState, response) -> QueryState:
     try:
         parsed = extract_json(response.content)
         print(f"✅INTENT CLASSIFICATION===={parsed}")
@@ -61,13 +85,14 @@ def intent_check_node(state: QueryState) -> QueryState:
     if intent not in VALID_MODEL_INTENTS:
         intent = "unknown"
 
-    confidence = float(parsed.get("confidence", 0.0))
+    confidence = parsed.get("confidence", 0.0)
     ######################################
     try:
         confidence = float(confidence)
     except (TypeError, ValueError):
         confidence = 0.0
     confidence = max(0.0, min(confidence, 1.0))
+    log_intent_decision(state["user_query"], intent, confidence)
 
     return {
         **state,
@@ -76,3 +101,23 @@ def intent_check_node(state: QueryState) -> QueryState:
         "intent_reason": parsed.get("reason", ""),
         # "should_refuse": (intent == "unanswerable" and confidence >= 0.75)  # early flag to refuse before refusal logic
     }
+
+
+def intent_check_node(state: QueryState) -> QueryState:
+    llm = get_llm()
+    state = count_llm_call(state)
+    try:
+        response = invoke_llm(llm, _intent_messages(state), state)
+    except DeadlineExceeded:
+        return deadline_intent(state)
+    return _parse_intent(state, response)
+
+
+async def intent_check_node_async(state: QueryState) -> QueryState:
+    llm = get_llm()
+    state = count_llm_call(state)
+    try:
+        response = await ainvoke_llm(llm, _intent_messages(state), state)
+    except DeadlineExceeded:
+        return deadline_intent(state)
+    return _parse_intent(state, response)
@@ -0,0 +1,243 @@
+# local_intent.py
+"""
+Local intent classifier: softmax regression over BGE query embeddings,
+trained from logged LLM intent decisions.
+
+Confident predictions skip the intent LLM call; anything below the
+threshold escalates to the LLM path (whose decision is logged and
+becomes training data for the next fit).
+"""
+import os
+import json
+from typing import List, Optional, Tuple
+
+import numpy as np
+from langchain_core.runnables.config import run_in_executor
+
+from agents.state import QueryState
+from agents.deadline import budget_below, degrade, LOCAL_INTENT_BELOW_SECONDS
+from agents.intent import (
+    VALID_MODEL_INTENTS,
+    INTENT_DECISION_LOG,
+    intent_check_node,
+    intent_check_node_async
+)
+from agents.planner import planner_node, planner_node_async
+
+INTENT_CLASSIFIER_PATH = os.getenv("INTENT_CLASSIFIER_PATH", "./models/intent_classifier.npz")
+LOCAL_INTENT_THRESHOLD = float(os.getenv("LOCAL_INTENT_THRESHOLD", 0.85))
+MIN_LLM_CONFIDENCE = 0.7   # only confident LLM labels become training data
+
+# marks local decisions: the routing policy never refuses on them
+LOCAL_INTENT_REASON = "local classifier"
+
+LABELS = sorted(VALID_MODEL_INTENTS)
+
+
+# --------------------
+# TRAINING DATA (logged LLM decisions, see agents/intent.py)
+# --------------------
+def load_intent_decisions(path: str = INTENT_DECISION_LOG) -> Tuple[List[str], List[str]]:
+    """Latest confident label per distinct query."""
+    latest = {}
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            r = json.loads(line)
+            if r["intent"] in VALID_MODEL_INTENTS and r["confidence"] >= MIN_LLM_CONFIDENCE:
+                latest[r["query"].strip()] = r["intent"]
+    return list(latest), list(latest.values())
+
+
+# --------------------
+# CLASSIFIER
+# --------------------
+class LocalIntentClassifier:
+    """
+    Multinomial logistic regression (numpy only).
+    Input: L2-normalised query embeddings. Output: P(label) over LABELS.
+    """
+
+    def __init__(self, threshold: float = LOCAL_INTENT_THRESHOLD):
+        self.threshold = threshold
+        self.W: Optional[np.ndarray] = None   # (dim, n_labels)
+        self.b: Optional[np.ndarray] = None   # (n_labels,)
+        self.labels = list(LABELS)
+
+    @staticmethod
+    def _normalize(X: np.ndarray) -> np.ndarray:
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        norms = np.linalg.norm(X, axis=1, keepdims=True)
+        return X / np.maximum(norms, 1e-12)
+
+    def fit(
+        self,
+        X: np.ndarray,
+        y: List[str],
+        epochs: int = 300,
+        lr: float = 0.5,
+        l2: float = 1e-3
+    ) -> "LocalIntentClassifier":
+        X = self._normalize(X)
+        index = {label: i for i, label in enumerate(self.labels)}
+        Y = np.zeros((len(y), len(self.labels)), dtype=np.float32)
+        Y[np.arange(len(y)), [index[label] for label in y]] = 1.0
+
+        self.W = np.zeros((X.shape[1], len(self.labels)), dtype=np.float32)
+        self.b = np.zeros(len(self.labels), dtype=np.float32)
+
+        # full-batch gradient descent: logged datasets are small
+        for _ in range(epochs):
+            P = self._softmax(X @ self.W + self.b)
+            grad = (P - Y) / len(X)
+            self.W -= lr * (X.T @ grad + l2 * self.W)
+            self.b -= lr * grad.sum(axis=0)
+
+        return self
+
+    @staticmethod
+    def _softmax(Z: np.ndarray) -> np.ndarray:
+        Z = Z - Z.max(axis=1, keepdims=True)
+        E = np.exp(Z)
+        return E / E.sum(axis=1, keepdims=True)
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        return self._softmax(self._normalize(X) @ self.W + self.b)
+
+    def predict(self, embedding: np.ndarray) -> Tuple[str, float]:
+        """(label, probability) for ONE query embedding."""
+        p = self.predict_proba(embedding)[0]
+        i = int(p.argmax())
+        return self.labels[i], float(p[i])
+
+    # --------------------
+    # PERSISTENCE
+    # --------------------
+    def save(self, path: str = INTENT_CLASSIFIER_PATH) -> None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        np.savez(path, W=self.W, b=self.b, labels=np.array(self.labels))
+
+    @classmethod
+    def load(cls, path: str = INTENT_CLASSIFIER_PATH, threshold: float = LOCAL_INTENT_THRESHOLD):
+        data = np.load(path)
+        clf = cls(threshold=threshold)
+        clf.W, clf.b = data["W"], data["b"]
+        clf.labels = [str(label) for label in data["labels"]]
+        return clf
+
+    @staticmethod
+    def exists(path: str = INTENT_CLASSIFIER_PATH) -> bool:
+        return os.path.exists(path)
+
+
+# --------------------
+# NODES
+# --------------------
+def classify_locally(state: QueryState, classifier: LocalIntentClassifier) -> Optional[QueryState]:
+    """
+    Confident local decision → state with intent set; otherwise None
+    (caller escalates to the LLM).
+
+    Reuses the speculative embedding of the raw query when it is
+    available, so the classifier adds no extra forward pass.
+    """
+    from agents.retrieve import speculative_embedding
+    from indexes.dense_embeddings import embed_texts
+
+    embedding = speculative_embedding(state, state["user_query"])
+    if embedding is None:
+        embedding = embed_texts([state["user_query"]])[0]
+    intent, confidence = classifier.predict(embedding)
+
+    degraded = state.get("degraded") or []
+    if confidence < classifier.threshold:
+        # little time left: a less confident local intent beats an LLM call
+        if not budget_below(state, LOCAL_INTENT_BELOW_SECONDS):
+            print(f"✅LOCAL INTENT: {intent} ({confidence:.2f}) below threshold → LLM")
+            return None
+        degraded = degrade(state, "local_intent")
+
+    print(f"✅LOCAL INTENT: {intent} ({confidence:.2f})")
+    return {
+        **state,
+        "intent": intent,
+        "intent_confidence": confidence,
+        "intent_reason": LOCAL_INTENT_REASON,
+        "degraded": degraded
+    }
+
+
+def local_intent_node(state: QueryState, classifier: LocalIntentClassifier) -> QueryState:
+    """two_step planner: local intent, or the intent LLM call below threshold."""
+    classified = classify_locally(state, classifier)
+    return classified if classified is not None else intent_check_node(state)
+
+
+async def local_intent_node_async(state: QueryState, classifier: LocalIntentClassifier) -> QueryState:
+    classified = await run_in_executor(None, classify_locally, state, classifier)
+    return classified if classified is not None else await intent_check_node_async(state)
+
+
+def local_planner_node(state: QueryState, classifier: LocalIntentClassifier) -> QueryState:
+    """
+    fused planner: confident local intent → intent only (the routing
+    policy decides whether a rewrite call follows); otherwise the fused
+    intent + rewrite call.
+    """
+    classified = classify_locally(state, classifier)
+    return classified if classified is not None else planner_node(state)
+
+
+async def local_planner_node_async(state: QueryState, classifier: LocalIntentClassifier) -> QueryState:
+    classified = await run_in_executor(None, classify_locally, state, classifier)
+    return classified if classified is not None else await planner_node_async(state)
+
+
+# --------------------
+# TRAINING
+# --------------------
+def train_from_log(
+    log_path: str = INTENT_DECISION_LOG,
+    model_path: str = INTENT_CLASSIFIER_PATH,
+    holdout: float = 0.2,
+    seed: int = 0
+) -> LocalIntentClassifier:
+    from indexes.dense_embeddings import embed_texts
+
+    if not log_path:
+        raise ValueError("No decision log: set INTENT_DECISION_LOG and serve traffic first")
+
+    queries, labels = load_intent_decisions(log_path)
+    if len(queries) < 20:
+        raise ValueError(f"Need at least 20 logged decisions, found {len(queries)}")
+
+    X = embed_texts(queries)
+    y = np.array(labels)
+
+    order = np.random.default_rng(seed).permutation(len(queries))
+    n_test = max(1, int(len(order) * holdout))
+    test, train = order[:n_test], order[n_test:]
+
+    # held-out report at the serving threshold
+    clf = LocalIntentClassifier().fit(X[train], list(y[train]))
+    P = clf.predict_proba(X[test])
+    confident = P.max(axis=1) >= clf.threshold
+    predicted = np.array(clf.labels)[P.argmax(axis=1)]
+    correct = predicted == y[test]
+
+    print(f"[INTENT] {len(train)} train / {len(test)} held-out")
+    print(f"[INTENT] accuracy (all):       {correct.mean():.3f}")
+    print(f"[INTENT] coverage @ {clf.threshold}:  {confident.mean():.3f}")
+    if confident.any():
+        print(f"[INTENT] accuracy (confident): {correct[confident].mean():.3f}")
+
+    # final model on everything
+    clf = LocalIntentClassifier().fit(X, list(y))
+    clf.save(model_path)
+    print(f"[INTENT] Model saved at: {model_path}")
+    return clf
+
+
+if __name__ == "__main__":
+    train_from_log()
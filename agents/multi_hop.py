@@ -0,0 +1,166 @@
+# agents/multi_hop.py
+from concurrent.futures import ThreadPoolExecutor
+
+from agents.state import QueryState
+from agents.retrieve import FINAL_TOP_K, DENSE_TOP_K, SPARSE_TOP_K, discard_speculation
+from agents.validate import validate_node, MAX_CHUNKS_PER_DOC
+from agents.deadline import context_budget
+from retrieval.retrieval_signal import dense_retrieve_text_batch, sparse_retrieve_batch
+from retrieval.hybrid_fusion import hybrid_fusion
+from retrieval.context_packer import token_counter
+
+MAX_SUB_QUESTIONS = 4
+
+
+def _sub_questions(state: QueryState) -> list:
+    seen = []
+    for q in state.get("rewrite_candidates") or []:
+        q = (q or "").strip()
+        if q and q not in seen:
+            seen.append(q)
+    return seen[:MAX_SUB_QUESTIONS] or [state["user_query"]]
+
+
+def _merge_evidence(sub_states: list, budget: int) -> list:
+    """
+    Round-robin across sub-questions so every hop gets evidence,
+    dedupe by chunk_id, enforce the global token budget.
+    """
+    merged = []
+    seen = set()
+    doc_counter = {}
+    total_tokens = 0
+
+    ranked_lists = [s.get("final_chunks") or [] for s in sub_states]
+    depth = max((len(r) for r in ranked_lists), default=0)
+
+    for rank in range(depth):
+        for sub_question, ranked in zip((s["final_query"] for s in sub_states), ranked_lists):
+            if rank >= len(ranked):
+                continue
+
+            c = ranked[rank]
+            if c["chunk_id"] in seen:
+                continue
+
+            doc_id = c["document_id"]
+            if doc_counter.get(doc_id, 0) >= MAX_CHUNKS_PER_DOC:
+                continue
+
+            # skip (not break): a smaller chunk from another hop may still fit
+            tokens = token_counter.count(c["text"], c["chunk_id"])
+            if total_tokens + tokens > budget:
+                continue
+
+            merged.append({**c, "sub_question": sub_question})
+            seen.add(c["chunk_id"])
+            doc_counter[doc_id] = doc_counter.get(doc_id, 0) + 1
+            total_tokens += tokens
+
+    return merged
+
+
+def multi_hop_node(state: QueryState, vector_store, bm25_store, chunk_retriever) -> QueryState:
+    """
+    Retrieve + validate every sub-question in parallel, then hand ONE
+    deduplicated evidence set to the answer node.
+    """
+    # hops are searched instead of the raw query
+    discard_speculation(state)
+
+    sub_questions = _sub_questions(state)
+    intent = state.get("intent", "unknown")
+
+    # 1. One embedding batch, one FAISS call, one BM25 pass for all hops
+    from indexes.dense_embeddings import embed_texts   # loads the BGE model
+    embeddings = embed_texts(sub_questions)
+
+    dense_lists = dense_retrieve_text_batch(
+        query_embeddings=embeddings,
+        vector_store=vector_store,
+        top_k=DENSE_TOP_K
+    ) or [[] for _ in sub_questions]
+
+    sparse_lists = sparse_retrieve_batch(
+        queries=sub_questions,
+        bm25_index=bm25_store,
+        top_k=SPARSE_TOP_K
+    )
+
+    sub_states = []
+    for sub_question, embedding, dense_results, sparse_results in zip(
+        sub_questions, embeddings, dense_lists, sparse_lists
+    ):
+        sub_states.append({
+            **state,
+            "final_query": sub_question,
+            "selected_queries": [sub_question],
+            "query_embedding": embedding,
+            "retrieved_chunks": hybrid_fusion(
+                dense_results=dense_results,
+                sparse_results=sparse_results,
+                intent=intent,
+                top_k=FINAL_TOP_K
+            )
+        })
+
+    # 2. Validation (ground-truth fetch) per hop, in parallel
+    with ThreadPoolExecutor(max_workers=len(sub_states)) as pool:
+        sub_states = list(pool.map(
+            lambda s: validate_node(s, chunk_retriever=chunk_retriever),
+            sub_states
+        ))
+
+    # 3. Deduplicate evidence across hops
+    retrieved = {}
+    for s in sub_states:
+        for c in s.get("retrieved_chunks") or []:
+            if c["final_score"] > retrieved.get(c["chunk_id"], {}).get("final_score", -1.0):
+                retrieved[c["chunk_id"]] = c
+
+    evidence = _merge_evidence(sub_states, context_budget(state))
+    print(f"✅MULTI-HOP: {len(sub_questions)} sub-questions → {len(evidence)} evidence chunks")
+
+    sub_question_results = [
+        {
+            "sub_question": s["final_query"],
+            "validation_status": s.get("validation_status"),
+            "validation_reason": s.get("validation_reason"),
+            "chunk_ids": [c["chunk_id"] for c in s.get("final_chunks") or []]
+        }
+        for s in sub_states
+    ]
+
+    base = {
+        **state,
+        # the answer is synthesised for the ORIGINAL question
+        "final_query": state["user_query"],
+        "selected_queries": sub_questions,
+        "sub_questions": sub_questions,
+        "sub_question_results": sub_question_results,
+        "retrieved_chunks": sorted(
+            retrieved.values(), key=lambda x: x["final_score"], reverse=True
+        ),
+        "retrieval_debug": {
+            "query_count": len(sub_questions),
+            "dense_count": sum(len(r) for r in dense_lists),
+            "sparse_count": sum(len(r) for r in sparse_lists),
+            "fusion": "intent_weighted_minmax_per_hop"
+        }
+    }
+
+    if not evidence:
+        return {
+            **base,
+            "final_chunks": [],
+            "validation_status": "refuse",
+            "validation_reason": "No answerable evidence found for any sub-question"
+        }
+
+    return {
+        **base,
+        "final_chunks": evidence,
+        "context_tokens": sum(token_counter.count(c["text"], c["chunk_id"]) for c in evidence),
+        "validation_status": "pass",
+        "validation_reason": None
+    }
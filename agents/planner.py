@@ -0,0 +1,118 @@
+# planner.py (NODE-1, fused)
+from agents.state import QueryState
+from agents.intent import (
+    VALID_MODEL_INTENTS,
+    _parse_intent,
+    intent_check_node,
+    intent_check_node_async
+)
+from agents.rewrite import (
+    _parse_rewrite,
+    _rewrite_update,
+    rewrite_generate_node,
+    rewrite_generate_node_async
+)
+from utils.llm import get_llm
+from agents.deadline import invoke_llm, ainvoke_llm, count_llm_call, deadline_intent, DeadlineExceeded
+
+from langchain_core.messages import SystemMessage, HumanMessage
+
+SYSTEM_PROMPT = """
+    You are the query planner for a retrieval system.
+    In ONE response: classify the query intent AND produce the rewrites for that intent.
+
+    Allowed labels:
+    - factual
+    - analytical
+    - multi_hop
+    - unanswerable
+
+    Rewrites by label:
+    - factual: "expanded_query" — essential keywords only; do NOT broaden scope,
+      do NOT introduce new entities
+    - analytical: "expanded_query" (keyword-expanded query) and "hyde"
+      (hypothetical answer that only rephrases concepts implied by the query;
+      no new entities, no assumptions)
+    - multi_hop: "sub_questions" — minimal sub-questions, each answerable independently
+    - unanswerable: no rewrites
+
+    Return ONLY valid JSON.
+    No markdown.
+    No extra text.
+
+    Schema:
+    {
+      "intent": string,
+      "confidence": number,
+      "reason": string,
+      "expanded_query": string,      (factual, analytical)
+      "hyde": string,                (analytical)
+      "sub_questions": [string]      (multi_hop)
+    }
+    """
+
+
+def _planner_messages(state: QueryState) -> list:
+    query = state["user_query"]
+    user_prompt = f'Query: "{query}"'
+
+    return [
+        SystemMessage(content=SYSTEM_PROMPT),
+        HumanMessage(content=user_prompt)
+    ]
+
+
+def _parse_plan(state: QueryState, response):
+    """
+    One structured response → intent + rewrite state.
+    Returns None when the response is unusable (caller falls back).
+    """
+    state = _parse_intent(state, response)
+    intent = state["intent"]
+    if intent not in VALID_MODEL_INTENTS:
+        return None
+
+    try:
+        rewrite_candidates, rewrite_risk = _parse_rewrite(intent, response.content)
+    except Exception:
+        return None
+
+    return _rewrite_update(state, rewrite_candidates, rewrite_risk)
+
+
+def planner_node(state: QueryState) -> QueryState:
+    """
+    Intent + rewrites in ONE LLM round trip.
+    Falls back to the two-call path (intent_check → rewrite_generate)
+    when the fused output cannot be parsed.
+    """
+    state = count_llm_call(state)
+    try:
+        planned = _parse_plan(state, invoke_llm(get_llm(), _planner_messages(state), state))
+    except DeadlineExceeded:
+        # no time for the fallback calls either: raw query, no rewrites
+        return _rewrite_update(deadline_intent(state), [], None)
+    except Exception:
+        planned = None
+
+    if planned is not None:
+        return planned
+
+    print("⚠️ PLANNER OUTPUT UNUSABLE: falling back to intent → rewrite")
+    return rewrite_generate_node(intent_check_node(state))
+
+
+async def planner_node_async(state: QueryState) -> QueryState:
+    state = count_llm_call(state)
+    try:
+        planned = _parse_plan(state, await ainvoke_llm(get_llm(), _planner_messages(state), state))
+    except DeadlineExceeded:
+        return _rewrite_update(deadline_intent(state), [], None)
+    except Exception:
+        planned = None
+
+    if planned is not None:
+        return planned
+
+    print("⚠️ PLANNER OUTPUT UNUSABLE: falling back to intent → rewrite")
+    return await rewrite_generate_node_async(await intent_check_node_async(state))
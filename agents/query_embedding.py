@@ -1,5 +1,7 @@
+import numpy as np
+
 from agents.state import QueryState
-from indexes.dense_embeddings import embed_texts
+from agents.retrieve import speculative_result
 
 def query_embedding_node(state: QueryState) -> QueryState:
     query = state["final_query"]
@@ -7,14 +9,32 @@ def query_embedding_node(state: QueryState) -> QueryState:
     if not query:
         return {
             **state,
-            "query_embedding": None
+            "query_embedding": None,
+            "query_embeddings": None
         }
 
-    embedding = embed_texts([query])[0]
-    print("✅✅SUCCESSFULLY GENERATED EMBEDDINGS")
+    # original query + accepted rewrites, embedded in ONE forward pass
+    queries = state.get("selected_queries") or [query]
+    if query not in queries:
+        queries = [query, *queries]
+
+    # original query's row comes from speculative retrieval when available
+    original = state.get("original_query")
+    speculated = speculative_result(state, original) if original in queries else None
+    todo = [q for q in queries if speculated is None or q != original]
+
+    from indexes.dense_embeddings import embed_texts   # loads the BGE model
+    computed = iter(embed_texts(todo)) if todo else iter(())
+    embeddings = np.vstack([
+        speculated["embedding"] if speculated is not None and q == original else next(computed)
+        for q in queries
+    ])
+    print(f"✅✅SUCCESSFULLY GENERATED EMBEDDINGS: {len(todo)}")
 
 
     return {
         **state,
-        "query_embedding": embedding
+        "selected_queries": queries,
+        "query_embedding": embeddings[queries.index(query)],
+        "query_embeddings": embeddings
     }
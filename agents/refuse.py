@@ -46,10 +46,17 @@
 
 # agents/refusal.py
 
+from typing import Optional
+
 from agents.state import QueryState
+from agents.answer import REFUSAL_SIGNALS
 
 REFUSAL_MESSAGE = "The provided evidence does not contain this information."
 
+# Over-claim heuristic: long answer resting on too few citations
+OVERCLAIM_WORDS = 100
+OVERCLAIM_MIN_CITATIONS = 2
+
 
 def refusal_node(state: QueryState) -> QueryState:
     """
@@ -61,13 +68,23 @@ def refusal_node(state: QueryState) -> QueryState:
     citations = state.get("answer_citations") or []
     retrieved = state.get("retrieved_chunks") or []
 
+    # 0️⃣ Routed here straight from planning (confidently unanswerable)
+    if state.get("should_refuse"):
+        return {
+            **state,
+            "final_response": REFUSAL_MESSAGE,
+            "refused": True,
+            "refusal_reason": "UNANSWERABLE_INTENT"
+        }
+
     # 1️⃣ Empty answer → refuse
     if not answer:
+        timed_out = "answer_timeout" in (state.get("degraded") or [])
         return {
             **state,
             "final_response": REFUSAL_MESSAGE,
             "refused": True,
-            "refusal_reason": "EMPTY_ANSWER"
+            "refusal_reason": "DEADLINE_EXCEEDED" if timed_out else "EMPTY_ANSWER"
         }
 
     # 2️⃣ No retrieval happened → refuse
@@ -89,7 +106,7 @@ def refusal_node(state: QueryState) -> QueryState:
         }
 
     # 4️⃣ Over-claim heuristic (simple but sane)
-    if len(answer.split()) > 100 and len(citations) < 2:
+    if len(answer.split()) > OVERCLAIM_WORDS and len(citations) < OVERCLAIM_MIN_CITATIONS:
         return {
             **state,
             "final_response": REFUSAL_MESSAGE,
@@ -110,3 +127,53 @@ def refusal_node(state: QueryState) -> QueryState:
         "refused": False,
         "refusal_reason": None
     }
+
+
+class StreamingRefusalGate:
+    """
+    Incremental form of the answer-side refusal checks, for streamed
+    answers: feed tokens, get back the text that is safe to show.
+
+    - Holds back the tail that could still grow into a refusal signal
+    - Stops emitting for good once a signal appears or the answer
+      over-claims (too many words for the citations available)
+
+    The final state from `refusal_node` stays authoritative: callers
+    reconcile against it when the stream ends.
+    """
+
+    HOLDBACK = max(len(s) for s in REFUSAL_SIGNALS) - 1
+
+    def __init__(self, citation_count: int):
+        self.citation_count = citation_count
+        self.text = ""
+        self.emitted = 0
+        self.blocked: Optional[str] = None
+
+    def feed(self, token: str) -> str:
+        if self.blocked:
+            return ""
+        self.text += token
+
+        if any(sig in self.text.lower() for sig in REFUSAL_SIGNALS):
+            self.blocked = "INSUFFICIENT_EVIDENCE"
+            return ""
+        if (
+            self.citation_count < OVERCLAIM_MIN_CITATIONS
+            and len(self.text.split()) > OVERCLAIM_WORDS
+        ):
+            self.blocked = "OVERCLAIM"
+            return ""
+
+        safe = max(self.emitted, len(self.text) - self.HOLDBACK)
+        out = self.text[self.emitted:safe]
+        self.emitted = safe
+        return out
+
+    def flush(self) -> str:
+        """End of stream: release the held-back tail (unless blocked)."""
+        if self.blocked:
+            return ""
+        out = self.text[self.emitted:]
+        self.emitted = len(self.text)
+        return out
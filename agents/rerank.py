@@ -0,0 +1,71 @@
+# agents/rerank.py
+from agents.state import QueryState
+from agents.deadline import budget_below, degrade, SKIP_RERANK_BELOW_SECONDS
+from agents.validate import strong_candidates
+
+
+def _rerank_query(state: QueryState) -> str:
+    # the user's own question: cross-encoders are trained on natural queries
+    return state.get("original_query") or state["user_query"]
+
+
+def _candidates(state: QueryState) -> list:
+    """
+    Fused candidates validation can still use: above the relevance
+    threshold and, when the ingestion sidecar is indexed, answerable.
+    Only these are fetched and scored; validate would drop the rest.
+    """
+    return [
+        c for c in strong_candidates(state)
+        if (c.get("meta") or {}).get("answerable", True)
+    ]
+
+
+def rerank_batch(states: list, reranker, chunk_retriever) -> list:
+    """
+    Cross-encoder re-ranking of the fused candidates of MANY states:
+    ONE chunk fetch and ONE model batch for every (query, chunk) pair.
+    Skipped (fused order kept) when the request deadline is close.
+    States without a usable candidate are left for validate to refuse.
+    """
+    if any(budget_below(s, SKIP_RERANK_BELOW_SECONDS) for s in states):
+        return [{**s, "degraded": degrade(s, "skip_rerank")} for s in states]
+
+    candidates = [_candidates(s) for s in states]
+    chunk_ids = list(dict.fromkeys(
+        c["chunk_id"]
+        for per_state in candidates
+        for c in per_state[:reranker.top_n]
+    ))
+    if not chunk_ids:
+        return states
+
+    # text for validation is fetched again right after: served by the chunk cache
+    chunks, _ = chunk_retriever.get_chunks(chunk_ids)
+    texts = {c["chunk_id"]: c["clean_text"] for c in chunks}
+
+    todo = [i for i, per_state in enumerate(candidates) if per_state]
+    reranked = reranker.rerank_many(
+        [(_rerank_query(states[i]), candidates[i]) for i in todo],
+        texts
+    )
+
+    results = list(states)
+    for i, kept in zip(todo, reranked):
+        state = states[i]
+        print(f"✅RERANKED: {len(state.get('retrieved_chunks') or [])} fused → {len(kept)} kept")
+        results[i] = {
+            **state,
+            "retrieved_chunks": kept,
+            "retrieval_debug": {
+                **(state.get("retrieval_debug") or {}),
+                "reranked": len(kept)
+            }
+        }
+    return results
+
+
+def rerank_node(state: QueryState, reranker, chunk_retriever) -> QueryState:
+    if not state.get("retrieved_chunks"):
+        return state
+    return rerank_batch([state], reranker, chunk_retriever)[0]
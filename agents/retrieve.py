@@ -1,35 +1,179 @@
 # agents/retrieve_node.py
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FuturesTimeout
+from typing import Dict, NamedTuple, Optional
+
 from agents.state import QueryState
-from retrieval.retrieval_signal import dense_retrieve_text, sparse_retrieve
-from retrieval.hybrid_fusion import hybrid_fusion
+from agents.deadline import remaining
+from retrieval.retrieval_signal import dense_retrieve_text_batch, sparse_retrieve_batch
+from retrieval.hybrid_fusion import multi_query_fusion
 
 
 FINAL_TOP_K = 8
+DENSE_TOP_K = 15
+SPARSE_TOP_K = 10
 
+# Speculative retrieval of the raw user query while the LLM plans.
+# Off by default: refused / cached / multi-hop requests pay for a search
+# they never use. Own pool: consumers block on the result from
+# retrieval-executor threads.
+SPECULATIVE_RETRIEVAL = os.getenv("SPECULATIVE_RETRIEVAL", "0") == "1"
+SPECULATIVE_WORKERS = 4
+_speculative_executor = ThreadPoolExecutor(
+    max_workers=SPECULATIVE_WORKERS,
+    thread_name_prefix="speculative"
+)
 
-def retrieve_node(state: QueryState, vector_store, bm25_store) -> QueryState:
 
-    # MUST use guarded query
-    query = state["final_query"]
-    query_embedding = state.get("query_embedding")
-    # intent = state.get("intent", "ambiguous")
-    intent = state.get("intent", "unknown")
+class _Speculation(NamedTuple):
+    query: str
+    job: Future        # → _retrieve_raw result
+    embedded: Future   # → the query embedding alone (set before the searches)
+
+
+# request_id → speculation in flight. Kept out of QueryState: Futures are
+# not serialisable, and a checkpointed state must not carry them.
+_speculations: Dict[str, _Speculation] = {}
+_speculations_lock = threading.Lock()
+
 
-    dense_results = dense_retrieve_text( # output = List[Dict]
-        query_embedding=query_embedding,
+# --------------------
+# SPECULATIVE RETRIEVAL
+# --------------------
+def _retrieve_raw(query: str, vector_store, bm25_store, embedded: Future) -> dict:
+    # loads the BGE model: imported on first use, not with the graph
+    from indexes.dense_embeddings import embed_texts
+
+    try:
+        embeddings = embed_texts([query])
+    except Exception as e:
+        embedded.set_exception(e)
+        raise
+    # published before the searches: the local intent classifier needs only this
+    embedded.set_result(embeddings[0])
+
+    dense_lists = dense_retrieve_text_batch(
+        query_embeddings=embeddings,
         vector_store=vector_store,
-        top_k=15
-    )
+        top_k=DENSE_TOP_K
+    ) or [[]]
 
-    sparse_results = sparse_retrieve(
-        query=query,
+    sparse_lists = sparse_retrieve_batch(
+        queries=[query],
         bm25_index=bm25_store,
-        top_k=10
+        top_k=SPARSE_TOP_K
     )
 
-    fused = hybrid_fusion(
-        dense_results=dense_results,
-        sparse_results=sparse_results,
+    return {
+        "query": query,
+        "embedding": embeddings[0],
+        "dense": dense_lists[0],
+        "sparse": sparse_lists[0]
+    }
+
+
+def speculative_retrieve_node(state: QueryState, vector_store, bm25_store) -> QueryState:
+    """
+    Graph entry: start embedding + dense + sparse search of the raw
+    `user_query` in the background and return at once.
+
+    The guard always keeps the original query in `selected_queries`, so
+    query_embedding / retrieve reuse this result for that row and only
+    compute the accepted rewrites. Routes that never retrieve (refuse,
+    semantic cache hit, multi-hop) discard it.
+    """
+    query = state["user_query"]
+    request_id = state.get("request_id")
+    if not query or not query.strip() or request_id is None:
+        return state
+
+    embedded = Future()
+    job = _speculative_executor.submit(_retrieve_raw, query, vector_store, bm25_store, embedded)
+    with _speculations_lock:
+        _speculations[request_id] = _Speculation(query, job, embedded)
+    return state
+
+
+def _speculation(state: QueryState) -> Optional[_Speculation]:
+    request_id = state.get("request_id")
+    if request_id is None:
+        return None
+    with _speculations_lock:
+        return _speculations.get(request_id)
+
+
+def discard_speculation(state: QueryState) -> None:
+    """
+    Drop this request's speculation: cancelled if still queued, result
+    ignored if running. Called once retrieval has collected it, on routes
+    that never retrieve, and when the request ends.
+    """
+    request_id = state.get("request_id")
+    if request_id is None:
+        return
+    with _speculations_lock:
+        speculation = _speculations.pop(request_id, None)
+    if speculation is not None:
+        speculation.job.cancel()
+
+
+def speculative_result(state: QueryState, query: str) -> Optional[dict]:
+    """
+    Finished speculative result for `query`, or None (not started / other
+    query / failed / too late) → the caller searches inline.
+
+    Still queued behind other requests' speculation → cancelled, not
+    waited for; running → waited for at most the request's remaining budget.
+    """
+    speculation = _speculation(state)
+    if speculation is None or speculation.query != query:
+        return None
+
+    future = speculation.job
+    if future.cancel():
+        return None
+
+    try:
+        result = future.result(timeout=remaining(state))
+    except FuturesTimeout:
+        print("⚠️ Speculative retrieval still running at the deadline: searching inline")
+        return None
+    except Exception as e:
+        print(f"⚠️ Speculative retrieval failed: {e}")
+        return None
+
+    return result
+
+
+def speculative_embedding(state: QueryState, query: str):
+    """
+    Embedding of `query` from the speculative job, or None (not started /
+    other query / still queued / failed / too late) → the caller embeds.
+    Never cancels the job: retrieval still collects its result.
+    """
+    speculation = _speculation(state)
+    if speculation is None or speculation.query != query:
+        return None
+    if not (speculation.job.running() or speculation.job.done()):
+        return None
+
+    try:
+        return speculation.embedded.result(timeout=remaining(state))
+    except FuturesTimeout:
+        return None
+    except Exception as e:
+        print(f"⚠️ Speculative embedding failed: {e}")
+        return None
+
+
+def _fused_state(state: QueryState, queries, dense_lists, sparse_lists) -> QueryState:
+    # intent = state.get("intent", "ambiguous")
+    intent = state.get("intent", "unknown")
+
+    fused = multi_query_fusion(
+        dense_lists=dense_lists,
+        sparse_lists=sparse_lists,
         intent=intent,
         top_k=FINAL_TOP_K
     )
@@ -38,8 +182,123 @@ def retrieve_node(state: QueryState, vector_store, bm25_store) -> QueryState:
         **state,
         "retrieved_chunks": fused,
         "retrieval_debug": {
-            "dense_count": len(dense_results),
-            "sparse_count": len(sparse_results),
-            "fusion": "intent_weighted_minmax"
+            "query_count": len(queries),
+            "dense_count": sum(len(r) for r in dense_lists),
+            "sparse_count": sum(len(r) for r in sparse_lists),
+            "fusion": "intent_weighted_minmax" if len(queries) == 1 else "intent_weighted_minmax+rrf"
         }
     }
+
+
+def retrieve_node(state: QueryState, vector_store, bm25_store) -> QueryState:
+
+    # MUST use guarded query (+ accepted rewrites, if any)
+    query = state["final_query"]
+    queries = state.get("selected_queries") or [query]
+    query_embeddings = state.get("query_embeddings")
+    if query_embeddings is None and state.get("query_embedding") is not None:
+        query_embeddings = state["query_embedding"].reshape(1, -1)
+
+    # empty query → nothing was embedded: empty retrieval, validation refuses
+    if not query or query_embeddings is None:
+        discard_speculation(state)
+        return {**state, "retrieved_chunks": [], "retrieval_debug": None}
+
+    # original query already searched speculatively → search the rest only
+    original = state.get("original_query")
+    speculated = speculative_result(state, original) if original in queries else None
+    discard_speculation(state)   # last consumer
+    todo = [i for i, q in enumerate(queries) if speculated is None or q != original]
+
+    dense_lists = [[] for _ in queries]
+    sparse_lists = [[] for _ in queries]
+
+    if todo:
+        # ONE batched FAISS call for every remaining query variant
+        dense_todo = dense_retrieve_text_batch( # output = List[List[Dict]]
+            query_embeddings=query_embeddings[todo],
+            vector_store=vector_store,
+            top_k=DENSE_TOP_K
+        ) or [[] for _ in todo]
+
+        # ONE batched BM25 scoring pass for every remaining query variant
+        sparse_todo = sparse_retrieve_batch(
+            queries=[queries[i] for i in todo],
+            bm25_index=bm25_store,
+            top_k=SPARSE_TOP_K
+        )
+
+        for i, dense, sparse in zip(todo, dense_todo, sparse_todo):
+            dense_lists[i] = dense
+            sparse_lists[i] = sparse
+
+    if speculated is not None:
+        i = queries.index(original)
+        dense_lists[i] = speculated["dense"]
+        sparse_lists[i] = speculated["sparse"]
+
+    return _fused_state(state, queries, dense_lists, sparse_lists)
+
+
+def retrieve_batch(states: list, vector_store, bm25_store) -> list:
+    """
+    Embedding + retrieval for MANY guarded queries at once.
+
+    Every distinct query string across the batch (originals + rewrites)
+    goes through one BGE forward pass, one FAISS search and one BM25
+    pass; results are then fused per state exactly like retrieve_node.
+    """
+    per_state = []
+    for state in states:
+        query = state.get("final_query")
+        queries = (state.get("selected_queries") or [query]) if query else []
+        if query and query not in queries:
+            queries = [query, *queries]
+        per_state.append(queries)
+
+    unique = list(dict.fromkeys(q for queries in per_state for q in queries))
+    row = {q: i for i, q in enumerate(unique)}
+
+    from indexes.dense_embeddings import embed_texts
+    embeddings = embed_texts(unique)
+    print(f"✅✅SUCCESSFULLY GENERATED EMBEDDINGS: {len(unique)}")
+
+    dense_lists = dense_retrieve_text_batch(
+        query_embeddings=embeddings,
+        vector_store=vector_store,
+        top_k=DENSE_TOP_K
+    ) or [[] for _ in unique]
+
+    sparse_lists = sparse_retrieve_batch(
+        queries=unique,
+        bm25_index=bm25_store,
+        top_k=SPARSE_TOP_K
+    )
+
+    results = []
+    for state, queries in zip(states, per_state):
+        if not queries:
+            results.append({
+                **state,
+                "query_embedding": None,
+                "query_embeddings": None,
+                "retrieved_chunks": [],
+                "retrieval_debug": None
+            })
+            continue
+
+        rows = [row[q] for q in queries]
+        state = {
+            **state,
+            "selected_queries": queries,
+            "query_embedding": embeddings[row[state["final_query"]]],
+            "query_embeddings": embeddings[rows]
+        }
+        results.append(_fused_state(
+            state,
+            queries,
+            [dense_lists[i] for i in rows],
+            [sparse_lists[i] for i in rows]
+        ))
+
+    return results
@@ -1,5 +1,6 @@
 from agents.state import QueryState
 from utils.llm import get_llm
+from agents.deadline import invoke_llm, ainvoke_llm, count_llm_call, degrade, DeadlineExceeded
 from utils.json_fomater import extract_json
 
 # def rewrite_generate_node(state: QueryState) -> QueryState:
@@ -95,25 +96,16 @@ from utils.json_fomater import extract_json
 #         "rewrite_risk": risk
 #     }
 
-def rewrite_generate_node(state: QueryState) -> QueryState:
-    # If upstream decided this query should be refused, do nothing
-    if state.get("should_refuse"):
-        return state
-
-    query = state["user_query"]
-    # intent = state.get("intent", "factual")
-    intent = state.get("intent")
-    llm = get_llm()
+REWRITE_RISK = {
+    "factual":    {"precision_risk": 0.0, "recall_boost": 0.4},
+    "analytical": {"precision_risk": 0.6, "recall_boost": 0.7},
+    "multi_hop":  {"precision_risk": 0.7, "recall_boost": 0.8},
+}
 
-    rewrite_candidates = []
-    rewrite_risk = {
-        "precision_risk": 0.0,
-        "recall_boost": 0.0
-    }
 
-    try:
-        if intent == "factual":
-            prompt = f"""
+def _rewrite_prompt(intent: str, query: str):
+    if intent == "factual":
+        return f"""
             Expand the query with essential keywords only.
             Do NOT broaden scope.
             Do NOT introduce new entities.
@@ -123,12 +115,9 @@ def rewrite_generate_node(state: QueryState) -> QueryState:
             Return JSON:
             {{ "expanded_query": "..." }}
             """
-            data = extract_json(llm.invoke(prompt).content)
-            rewrite_candidates.append(data["expanded_query"])
-            rewrite_risk["recall_boost"] = 0.4
 
-        elif intent == "analytical":
-            prompt = f"""
+    if intent == "analytical":
+        return f"""
             Generate:
             1. A keyword-expanded query
             2. A hypothetical answer (HyDE)
@@ -146,16 +135,9 @@ def rewrite_generate_node(state: QueryState) -> QueryState:
               "hyde": "..."
             }}
             """
-            data = extract_json(llm.invoke(prompt).content)
-            rewrite_candidates.extend([
-                data["expanded_query"],
-                data["hyde"]
-            ])
-            rewrite_risk["recall_boost"] = 0.7
-            rewrite_risk["precision_risk"] = 0.6
-
-        elif intent == "multi_hop":
-            prompt = f"""
+
+    if intent == "multi_hop":
+        return f"""
             Decompose into minimal sub-questions.
             Each sub-question must be answerable independently.
 
@@ -164,16 +146,31 @@ def rewrite_generate_node(state: QueryState) -> QueryState:
             Return JSON:
             {{ "sub_questions": ["...", "..."] }}
             """
-            data = extract_json(llm.invoke(prompt).content)
-            rewrite_candidates.extend(data["sub_questions"])
-            rewrite_risk["recall_boost"] = 0.8
-            rewrite_risk["precision_risk"] = 0.7
 
-    except Exception:
-        # LLM failure → safe fallback
-        rewrite_candidates = []
-        rewrite_risk = None
-    
+    return None
+
+
+def _parse_rewrite(intent: str, content):
+    """
+    LLM output → (rewrite_candidates, rewrite_risk).
+    Raises on malformed output (caller falls back).
+    """
+    if intent not in REWRITE_RISK or content is None:
+        return [], {"precision_risk": 0.0, "recall_boost": 0.0}
+
+    data = extract_json(content)
+
+    if intent == "factual":
+        candidates = [data["expanded_query"]]
+    elif intent == "analytical":
+        candidates = [data["expanded_query"], data["hyde"]]
+    else:
+        candidates = list(data["sub_questions"])
+
+    return candidates, dict(REWRITE_RISK[intent])
+
+
+def _rewrite_update(state: QueryState, rewrite_candidates, rewrite_risk) -> QueryState:
     print(f"\n\n✅REWRITE CANDIDATES===={rewrite_candidates}\n\n")
     return {
         **state,
@@ -181,6 +178,50 @@ def rewrite_generate_node(state: QueryState) -> QueryState:
         "rewrite_risk": rewrite_risk
     }
 
+
+def rewrite_generate_node(state: QueryState) -> QueryState:
+    # If upstream decided this query should be refused, do nothing
+    if state.get("should_refuse"):
+        return state
+
+    # intent = state.get("intent", "factual")
+    intent = state.get("intent")
+    prompt = _rewrite_prompt(intent, state["user_query"])
+    if prompt:
+        state = count_llm_call(state)
+
+    try:
+        content = invoke_llm(get_llm(), prompt, state).content if prompt else None
+        rewrite_candidates, rewrite_risk = _parse_rewrite(intent, content)
+    except DeadlineExceeded:
+        return _rewrite_update({**state, "degraded": degrade(state, "rewrite_timeout")}, [], None)
+    except Exception:
+        # LLM failure → safe fallback
+        rewrite_candidates, rewrite_risk = [], None
+
+    return _rewrite_update(state, rewrite_candidates, rewrite_risk)
+
+
+async def rewrite_generate_node_async(state: QueryState) -> QueryState:
+    if state.get("should_refuse"):
+        return state
+
+    intent = state.get("intent")
+    prompt = _rewrite_prompt(intent, state["user_query"])
+    if prompt:
+        state = count_llm_call(state)
+
+    try:
+        content = (await ainvoke_llm(get_llm(), prompt, state)).content if prompt else None
+        rewrite_candidates, rewrite_risk = _parse_rewrite(intent, content)
+    except DeadlineExceeded:
+        return _rewrite_update({**state, "degraded": degrade(state, "rewrite_timeout")}, [], None)
+    except Exception:
+        # LLM failure → safe fallback
+        rewrite_candidates, rewrite_risk = [], None
+
+    return _rewrite_update(state, rewrite_candidates, rewrite_risk)
+
 # PRECISION_RISK_THRESHOLD = 0.65
 
 # def rewrite_guard_node(state: QueryState) -> QueryState:
@@ -209,26 +250,34 @@ PRECISION_RISK_THRESHOLD = 0.65
 
 def rewrite_guard_node(state: QueryState) -> QueryState:
     original_query = state["user_query"]
-    candidates = state.get("rewrite_candidates", [])
-    risk = state.get("rewrite_risk", {})
+    candidates = state.get("rewrite_candidates") or []
+    risk = state.get("rewrite_risk") or {}
 
     precision_risk = risk.get("precision_risk", 1.0)
 
     # Default: safest behavior
     final_query = original_query
+    selected_queries = [original_query]
     rewrite_allowed = False
     rewrite_reason = "Fallback to original query"
 
     if candidates and precision_risk <= PRECISION_RISK_THRESHOLD:
-        final_query = candidates[0]   # SINGLE source of truth
+        final_query = candidates[0]   # SINGLE source of truth for the answer prompt
         print(f"\n\n✅FINAL QUERY ===== {final_query}\n\n")
         rewrite_allowed = True
         rewrite_reason = "Rewrite accepted within precision risk threshold"
 
+        # Retrieval fans out over the original query + every accepted candidate
+        for candidate in candidates:
+            candidate = (candidate or "").strip()
+            if candidate and candidate not in selected_queries:
+                selected_queries.append(candidate)
+
     return {
         **state,
         "final_query": final_query,
         "original_query": original_query,
+        "selected_queries": selected_queries,
         "rewrite_allowed": rewrite_allowed,
         "rewrite_reason": rewrite_reason
     }
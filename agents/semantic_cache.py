@@ -0,0 +1,91 @@
+# agents/semantic_cache.py
+from agents.state import QueryState
+from agents.retrieve import discard_speculation
+
+
+def _key_embedding(state: QueryState):
+    """
+    Embedding of the user's own question (a row query_embedding_node
+    already computed): paraphrase detection must not depend on rewrites.
+    """
+    queries = state.get("selected_queries") or []
+    embeddings = state.get("query_embeddings")
+    original = state.get("original_query") or state.get("user_query")
+
+    if embeddings is not None and original in queries:
+        return embeddings[queries.index(original)]
+    return state.get("query_embedding")
+
+
+def semantic_cache_lookup_node(state: QueryState, semantic_cache, chunk_retriever) -> QueryState:
+    """
+    Paraphrase of an earlier answered question → reuse its answer.
+
+    Citations are re-verified against the current chunk store: every
+    cited chunk must still exist, otherwise the entry is dropped and the
+    query continues through retrieval as usual.
+    """
+    embedding = _key_embedding(state)
+    if embedding is None:
+        return {**state, "semantic_cache_hit": None}
+
+    found = semantic_cache.lookup(embedding)
+    if found is None:
+        return {**state, "semantic_cache_hit": None}
+
+    entry, similarity = found
+    chunks, missing = chunk_retriever.get_chunks(entry["citations"])
+    if missing or not chunks:
+        print(f"⚠️ SEMANTIC CACHE: stale citations {missing}, dropping entry")
+        semantic_cache.invalidate(entry["entry_id"])
+        return {**state, "semantic_cache_hit": None}
+
+    print(f"✅SEMANTIC CACHE HIT: {similarity:.3f} ← {entry['query']!r}")
+    discard_speculation(state)   # retrieval is skipped
+    evidence = [
+        {
+            "chunk_id": c["chunk_id"],
+            "final_score": similarity,
+            "text": c["clean_text"],
+            "document_id": c["document_id"],
+            "chunk_index": c.get("chunk_index")
+        }
+        for c in chunks
+    ]
+
+    return {
+        **state,
+        "retrieved_chunks": [
+            {"chunk_id": c["chunk_id"], "final_score": c["final_score"]}
+            for c in evidence
+        ],
+        "final_chunks": evidence,
+        "validation_status": "pass",
+        "validation_reason": None,
+        "answer_text": entry["answer"],
+        "answer_citations": [c["chunk_id"] for c in chunks],
+        "semantic_cache_hit": similarity
+    }
+
+
+def semantic_cache_store_node(state: QueryState, semantic_cache) -> QueryState:
+    """
+    After the final gate: remember answered queries. Not refused, not
+    served from the cache, not degraded by the deadline (a later,
+    unhurried run may do better).
+    """
+    embedding = _key_embedding(state)
+    if (
+        state.get("refused")
+        or state.get("semantic_cache_hit") is not None
+        or state.get("degraded")
+        or embedding is None
+    ):
+        return state
+
+    semantic_cache.store(embedding, {
+        "query": state.get("original_query") or state.get("user_query"),
+        "answer": state.get("final_response"),
+        "citations": list(state.get("answer_citations") or []),
+    })
+    return state
@@ -1,4 +1,5 @@
 # state.py
+import uuid
 from typing import TypedDict, Optional, List, Dict
 import numpy as np
 
@@ -6,12 +7,20 @@ class QueryState(TypedDict):
     # core input
     user_query: str
 
+    # end-to-end deadline (time.monotonic, None → none) and the
+    # degradation steps taken to meet it (agents/deadline.py)
+    deadline_at: Optional[float]
+    degraded: List[str]
+
     # intent understanding
     intent: Optional[str]
     intent_confidence: Optional[float]
     intent_reason: Optional[str]
     should_refuse: bool
 
+    # routing policy decision (graph/routing.py)
+    route: Optional[str]
+
     # rewrite generation
     rewrite_candidates: Optional[List[str]]
     rewrite_risk: Optional[Dict[str, float]]
@@ -21,11 +30,25 @@ class QueryState(TypedDict):
     selected_queries: Optional[List[str]]
     rewrite_allowed: Optional[bool]
 
+    # Multi-hop decomposition
+    sub_questions: Optional[List[str]]
+    sub_question_results: Optional[List[Dict]]
+
     # Final query
     final_query: Optional[str]
 
+    # Per-request id (keys side tables such as speculative retrieval)
+    request_id: Optional[str]
+
+    # LLM calls made so far for this request (cache hits included)
+    llm_calls: int
+
     # Embedding
     query_embedding: Optional[np.ndarray]
+    query_embeddings: Optional[np.ndarray]   # one row per selected query
+
+    # Semantic answer cache (similarity of the reused entry, None on miss)
+    semantic_cache_hit: Optional[float]
     
     # Retrieval 
     retrieved_chunks: Optional[List[Dict]]
@@ -35,14 +58,85 @@ class QueryState(TypedDict):
     final_chunks: Optional[List[Dict]]     
     validation_status: Optional[str]        
     validation_reason: Optional[str]
+    missing_chunk_ids: Optional[List[str]]   # in the index, not in the chunk store
+    context_tokens: Optional[int]            # packed evidence, in model tokens
+    compression: Optional[Dict[str, int]]    # extractive compression report (if enabled)
     
     # Answer generation
     answer_text: Optional[str]
     answer_citations: Optional[List[str]]    
     answer_supported: Optional[bool]
+    prompt_tokens: Optional[int]             # answer prompt as billed (or estimated)
 
     # Refusal / Final output
     final_response: Optional[str]             
     refused: Optional[bool] 
     
-    refusal_reason: Optional[str]
\ No newline at end of file
+    refusal_reason: Optional[str]
+
+
+# Shared template: every key the graph reads, at its "not yet computed" value.
+_INITIAL_STATE: QueryState = {
+    "user_query": "",
+    "deadline_at": None,
+    "degraded": [],
+
+    # intent
+    "intent": None,
+    "intent_confidence": None,
+    "intent_reason": None,
+    "should_refuse": False,
+    "route": None,
+
+    # rewrite
+    "rewrite_candidates": None,
+    "rewrite_risk": None,
+    "original_query": None,
+    "selected_queries": None,
+    "rewrite_allowed": None,
+    "final_query": None,
+    "request_id": None,
+    "llm_calls": 0,
+
+    # semantic cache
+    "semantic_cache_hit": None,
+
+    # retrieval
+    "retrieved_chunks": [],
+    "retrieval_debug": None,
+
+    # validation
+    "final_chunks": [],
+    "validation_status": None,
+    "validation_reason": None,
+    "context_tokens": None,
+    "compression": None,
+
+    # answer
+    "answer_text": None,
+    "answer_citations": [],
+    "prompt_tokens": None,
+
+    # final output
+    "final_response": None,
+    "refused": None,
+    "refusal_reason": None,
+}
+
+
+def initial_state(user_query: str, deadline_at: Optional[float] = None) -> QueryState:
+    """
+    Per-request state: shallow copy of the template + the query.
+    List fields get fresh objects so requests never share them.
+    """
+    return {
+        **_INITIAL_STATE,
+        "user_query": user_query,
+        "request_id": uuid.uuid4().hex,
+        "original_query": user_query,
+        "deadline_at": deadline_at,
+        "degraded": [],
+        "retrieved_chunks": [],
+        "final_chunks": [],
+        "answer_citations": [],
+    }
@@ -1,21 +1,53 @@
 from agents.state import QueryState
+from retrieval.context_expansion import CONTEXT_WINDOW, plan_windows, expand_chunks
+from retrieval.context_packer import MAX_CONTEXT_TOKENS, count_tokens, pack, token_counter
+from agents.deadline import context_budget, degrade
 
 MIN_FINAL_SCORE = 0.45
-MAX_CONTEXT_CHARS = 6000
 MAX_CHUNKS_PER_DOC = 5  #2 -> 10
 MIN_TEXT_LENGTH = 20   # critical
 
 
-def _is_answerable(text: str) -> bool:
+def is_answerable(text: str) -> bool:
     """
     Hard heuristic: prevents headers, titles, empty sections.
     This is NOT semantic understanding — just structural sanity.
     """
     print(f"✅IS ANSWERABLE: {text and len(text.strip()) >= MIN_TEXT_LENGTH}")
-    return text and len(text.strip()) >= MIN_TEXT_LENGTH
+    return bool(text) and len(text.strip()) >= MIN_TEXT_LENGTH
 
 
-def validate_node(state: QueryState, chunk_retriever) -> QueryState:
+def evidence_sidecar(document_id: str, text: str) -> dict:
+    """
+    Computed at ingestion and stored next to each vector, so validation
+    can apply answerability, per-doc caps and the token budget BEFORE
+    fetching any text. Same rules as select_evidence.
+    """
+    return {
+        "document_id": str(document_id),
+        "text_length": len(text or ""),
+        "token_count": count_tokens(text or ""),
+        "answerable": is_answerable(text),
+    }
+
+
+def context_tokens(chunks: list) -> int:
+    return sum(token_counter.count(c["text"], c["chunk_id"]) for c in chunks)
+
+
+def strong_candidates(state: QueryState) -> list:
+    """Retrieved chunks that pass the relevance threshold."""
+    return [
+        c for c in state.get("retrieved_chunks") or []
+        if c.get("final_score", 0.0) >= MIN_FINAL_SCORE
+    ]
+
+
+def select_evidence(state: QueryState, chunks_by_id: dict) -> QueryState:
+    """
+    Validation decision given ground-truth chunks already fetched
+    (chunk_id → chunk record). Never touches the database.
+    """
 
     # 0. Intent-level refusal
     # if state.get("should_refuse"):
@@ -36,10 +68,7 @@ def validate_node(state: QueryState, chunk_retriever) -> QueryState:
         }
 
     # 1. Relevance threshold
-    strong = [
-        c for c in retrieved
-        if c.get("final_score", 0.0) >= MIN_FINAL_SCORE
-    ]
+    strong = strong_candidates(state)
 
     if not strong:
         return {
@@ -49,38 +78,35 @@ def validate_node(state: QueryState, chunk_retriever) -> QueryState:
             "validation_reason": "No chunks above relevance threshold"
         }
 
-    # 2. Fetch ground-truth + enforce answerability
-    validated = []
-    doc_counter = {}
-    total_chars = 0
+    # 2. Ground-truth + enforce answerability
+    eligible = []
 
     for c in strong:
-        chunk = chunk_retriever.get_chunk(c["chunk_id"])
+        chunk = chunks_by_id.get(c["chunk_id"])
+        if chunk is None:
+            continue
 
         text = chunk.get("clean_text", "")
         print(f"✅RETRIEVED CHUNK: {len(text)}")
-        if not _is_answerable(text):
+        if not is_answerable(text):
             continue
 
-        doc_id = chunk["document_id"]
-        doc_counter.setdefault(doc_id, 0)
-
-        if doc_counter[doc_id] >= MAX_CHUNKS_PER_DOC:
-            continue
-
-        if total_chars + len(text) > MAX_CONTEXT_CHARS:
-            break
-
-        validated.append({
+        eligible.append({
             **c,
             "text": text,
-            "document_id": doc_id
+            "document_id": chunk["document_id"],
+            "chunk_index": chunk.get("chunk_index"),
+            "tokens": token_counter.count(text, c["chunk_id"])
         })
 
-        doc_counter[doc_id] += 1
-        total_chars += len(text)
+    # 3. Token budget: per-doc cap, then best total score that fits
+    budget = context_budget(state)
+    validated = [
+        eligible[i]
+        for i in pack(eligible, budget, MAX_CHUNKS_PER_DOC, tokens=lambda c: c["tokens"])
+    ]
 
-    # 3. Final decision
+    # 4. Final decision
     if not validated:
         return {
             **state,
@@ -89,9 +115,151 @@ def validate_node(state: QueryState, chunk_retriever) -> QueryState:
             "validation_reason": "No answerable evidence found"
         }
 
+    total = sum(c["tokens"] for c in validated)
+    print(f"✅CONTEXT PACKED: {len(validated)}/{len(eligible)} chunks, {total}/{budget} tokens")
+
+    if budget < MAX_CONTEXT_TOKENS:
+        state = {**state, "degraded": degrade(state, "shrink_context")}
+
     return {
         **state,
         "final_chunks": validated,
+        "context_tokens": total,
         "validation_status": "pass",
         "validation_reason": None
     }
+
+
+def plan_fetch(state: QueryState) -> list:
+    """
+    chunk_ids worth fetching for this state.
+
+    When every strong candidate carries its ingestion sidecar (with a
+    token count), the select_evidence rules run on metadata alone and
+    only the chunks that would reach the LLM are returned. Otherwise
+    (older index) every strong candidate is fetched, as before.
+    """
+    strong = strong_candidates(state)
+    if any(c.get("meta") is None or "token_count" not in c["meta"] for c in strong):
+        return [c["chunk_id"] for c in strong]
+
+    answerable = [
+        {**c, "document_id": c["meta"]["document_id"]}
+        for c in strong if c["meta"].get("answerable")
+    ]
+    planned = [
+        answerable[i]["chunk_id"]
+        for i in pack(answerable, context_budget(state), MAX_CHUNKS_PER_DOC, tokens=lambda c: c["meta"]["token_count"])
+    ]
+
+    print(f"✅FETCH PLAN: {len(planned)}/{len(strong)} strong candidates")
+    return planned
+
+
+def _fetch_chunks(chunk_retriever, chunk_ids):
+    """
+    ONE round trip for all candidates.
+    Returns (chunk_id → chunk record, missing chunk_ids).
+    """
+    chunks, missing = chunk_retriever.get_chunks(chunk_ids)
+    if missing:
+        print(f"⚠️ MISSING CHUNKS (index/DB drift): {missing}")
+    return {c["chunk_id"]: c for c in chunks}, missing
+
+
+def _expansion_windows(states: list, chunk_retriever, window: int) -> list:
+    if window <= 0 or not hasattr(chunk_retriever, "get_neighbour_windows"):
+        return []
+    return list(dict.fromkeys(
+        w
+        for s in states if s.get("validation_status") == "pass"
+        for w in plan_windows(s["final_chunks"], window)
+    ))
+
+
+def _apply_expansion(states: list, records: list, window: int) -> list:
+    expanded = []
+    for s in states:
+        if s.get("validation_status") != "pass":
+            expanded.append(s)
+            continue
+
+        final_chunks = expand_chunks(
+            s["final_chunks"], records, window, context_budget(s), size=count_tokens
+        )
+        expanded.append({
+            **s,
+            "final_chunks": final_chunks,
+            "context_tokens": context_tokens(final_chunks)
+        })
+    return expanded
+
+
+def _expand(states: list, chunk_retriever, window: int) -> list:
+    """
+    Optional neighbour-window expansion of passed states:
+    ONE range fetch for every window of every state.
+    """
+    windows = _expansion_windows(states, chunk_retriever, window)
+    if not windows:
+        return states
+
+    records = chunk_retriever.get_neighbour_windows(windows)
+    print(f"✅NEIGHBOUR WINDOWS: {len(windows)} windows, {len(records)} chunks")
+    return _apply_expansion(states, records, window)
+
+
+def validate_node(state: QueryState, chunk_retriever, context_window: int = CONTEXT_WINDOW) -> QueryState:
+    chunks_by_id, missing = _fetch_chunks(chunk_retriever, plan_fetch(state))
+    state = {
+        **select_evidence(state, chunks_by_id),
+        "missing_chunk_ids": missing
+    }
+    return _expand([state], chunk_retriever, context_window)[0]
+
+
+async def validate_node_async(state: QueryState, chunk_retriever, context_window: int = CONTEXT_WINDOW) -> QueryState:
+    """
+    Same decisions as validate_node over an async chunk retriever
+    (AsyncChunkRetriever): chunk lookups are awaited, so they overlap
+    with other in-flight requests.
+    """
+    chunks, missing = await chunk_retriever.get_chunks(plan_fetch(state))
+    if missing:
+        print(f"⚠️ MISSING CHUNKS (index/DB drift): {missing}")
+
+    state = {
+        **select_evidence(state, {c["chunk_id"]: c for c in chunks}),
+        "missing_chunk_ids": missing
+    }
+
+    windows = _expansion_windows([state], chunk_retriever, context_window)
+    if not windows:
+        return state
+
+    records = await chunk_retriever.get_neighbour_windows(windows)
+    print(f"✅NEIGHBOUR WINDOWS: {len(windows)} windows, {len(records)} chunks")
+    return _apply_expansion([state], records, context_window)[0]
+
+
+def validate_batch(states: list, chunk_retriever, context_window: int = CONTEXT_WINDOW) -> list:
+    """
+    Validate many queries with ONE chunk fetch:
+    a chunk shared by several queries is read once.
+    """
+    plans = [plan_fetch(state) for state in states]
+    chunk_ids = [chunk_id for plan in plans for chunk_id in plan]
+    chunks_by_id, missing = _fetch_chunks(chunk_retriever, chunk_ids)
+    missing = set(missing)
+
+    validated = [
+        {
+            **select_evidence(state, chunks_by_id),
+            "missing_chunk_ids": [
+                chunk_id for chunk_id in plan
+                if chunk_id in missing
+            ]
+        }
+        for state, plan in zip(states, plans)
+    ]
+    return _expand(validated, chunk_retriever, context_window)
@@ -1,10 +1,8 @@
 import json
 from langchain_core.messages import SystemMessage, HumanMessage
 from utils.llm import get_llm
-import time
-
-RATE_LIMIT_SECONDS = 15
 
+# pacing: utils/rate_limiter.py (LLM_RPM / LLM_TPM), no fixed sleeps
 llm = get_llm()
 
 SYSTEM_PROMPT = """
@@ -65,7 +63,6 @@ def run_eval_answer_generation(eval_retrieval_results, output_path):
                 query=item["query"],
                 retrieved_chunks=item["retrieved_chunks"]
             )
-            time.sleep(RATE_LIMIT_SECONDS)
 
         # --- CASE 2: REFUSE → deterministic ---
         elif behavior == "refuse":
@@ -0,0 +1,112 @@
+import json
+import time
+
+from evaluation.eval_answer import generate_eval_answer
+from evaluation.faithfulness import deterministic_faithfulness
+from indexes.dense_embeddings import embed_texts
+from retrieval.context_compressor import ContextCompressor
+from retrieval.context_packer import count_tokens
+
+
+def _prompt_tokens(chunks) -> int:
+    return sum(count_tokens(c.get("text", "")) for c in chunks)
+
+
+def _timed_answer(query, chunks):
+    start = time.perf_counter()
+    answer = generate_eval_answer(query=query, retrieved_chunks=chunks)
+    return answer, time.perf_counter() - start
+
+
+def run_compression_eval(eval_retrieval_results, compressor: ContextCompressor = None):
+    """
+    Full vs compressed evidence for every answerable eval query:
+    prompt tokens, answer latency and deterministic faithfulness
+    (both answers judged against the FULL evidence).
+    """
+    compressor = compressor or ContextCompressor()
+    rows = []
+
+    for item in eval_retrieval_results:
+        if item["expected_behavior"] != "answer" or not item["retrieved_chunks"]:
+            continue
+
+        query = item["query"]
+        full = [c for c in item["retrieved_chunks"] if c.get("text")]
+        compressed, report = compressor.compress(embed_texts([query])[0], full)
+
+        full_answer, full_latency = _timed_answer(query, full)
+        compressed_answer, compressed_latency = _timed_answer(query, compressed)
+
+        judge = dict(
+            retrieved_chunks=full,
+            expected_behavior=item["expected_behavior"],
+            expected_answer_type=item["expected_answer_type"],
+            strictness=item["strictness"]
+        )
+
+        rows.append({
+            "eval_id": item["eval_id"],
+            "query": query,
+            "tokens_full": _prompt_tokens(full),
+            "tokens_compressed": _prompt_tokens(compressed),
+            "sentences_kept": report["sentences_kept"],
+            "sentences_total": report["sentences_total"],
+            "latency_full": full_latency,
+            "latency_compressed": compressed_latency,
+            "faithful_full": deterministic_faithfulness(answer_text=full_answer, **judge),
+            "faithful_compressed": deterministic_faithfulness(answer_text=compressed_answer, **judge),
+            "answer_full": full_answer,
+            "answer_compressed": compressed_answer
+        })
+
+    return rows
+
+
+def summarize(rows):
+    n = len(rows)
+    if not n:
+        return {"total": 0}
+
+    tokens_full = sum(r["tokens_full"] for r in rows)
+    tokens_compressed = sum(r["tokens_compressed"] for r in rows)
+
+    return {
+        "total": n,
+        "avg_tokens_full": tokens_full / n,
+        "avg_tokens_compressed": tokens_compressed / n,
+        "token_reduction": 1 - tokens_compressed / tokens_full if tokens_full else 0.0,
+        "avg_latency_full": sum(r["latency_full"] for r in rows) / n,
+        "avg_latency_compressed": sum(r["latency_compressed"] for r in rows) / n,
+        "faithfulness_full": sum(r["faithful_full"] for r in rows) / n,
+        "faithfulness_compressed": sum(r["faithful_compressed"] for r in rows) / n,
+        "regressions": [r["eval_id"] for r in rows if r["faithful_full"] and not r["faithful_compressed"]],
+    }
+
+
+if __name__ == "__main__":
+    print("📦 Loading retrieval results...")
+    with open("evaluation/eval_retrieval_results.json", "r", encoding="utf-8") as f:
+        retrieval_results = json.load(f)
+
+    print("🗜️ Answering with full vs compressed evidence...")
+    rows = run_compression_eval(retrieval_results)
+    summary = summarize(rows)
+
+    with open("evaluation/eval_compression_results.json", "w", encoding="utf-8") as f:
+        json.dump({"summary": summary, "rows": rows}, f, indent=2, ensure_ascii=False)
+
+    print("\n" + "=" * 60)
+    print("📊 CONTEXT COMPRESSION REPORT")
+    print("=" * 60)
+    if not summary["total"]:
+        print("No answerable eval queries with evidence")
+    else:
+        print(f"Queries               : {summary['total']}")
+        print(f"Prompt tokens (avg)   : {summary['avg_tokens_full']:.0f} → {summary['avg_tokens_compressed']:.0f} "
+              f"(-{summary['token_reduction']:.0%})")
+        print(f"Answer latency (avg)  : {summary['avg_latency_full']:.2f}s → {summary['avg_latency_compressed']:.2f}s")
+        print(f"Faithfulness          : {summary['faithfulness_full']:.2%} → {summary['faithfulness_compressed']:.2%}")
+        print(f"Regressions           : {summary['regressions'] or 'None'}")
+    print("=" * 60)
+    print("📁 Saved to evaluation/eval_compression_results.json")
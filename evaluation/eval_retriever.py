@@ -1,5 +1,10 @@
 # eval_retriever.py
-from retrieval.retrieval_signal import dense_retrieve_text, sparse_retrieve
+from retrieval.retrieval_signal import (
+    dense_retrieve_text,
+    sparse_retrieve,
+    dense_retrieve_text_batch,
+    sparse_retrieve_batch
+)
 from retrieval.hybrid_fusion import hybrid_fusion
 from indexes.dense_embeddings import embed_texts
 from retrieval.chunk_retriever import ChunkRetriever
@@ -30,16 +35,72 @@ def eval_retriver(query, vector_store, bm25_store, intent, top_k):
         top_k=top_k
     )
 
+    chunks, missing = chunk_retriever.get_chunks([f["chunk_id"] for f in fused])
+    texts = {c["chunk_id"]: c["clean_text"] for c in chunks}
+    if missing:
+        print(f"⚠️ MISSING CHUNKS: {missing}")
+
     results = []
     for f in fused:
-        chunk_text = chunk_retriever.get_chunk(f["chunk_id"])["clean_text"]
+        if f["chunk_id"] not in texts:
+            continue
         results.append({
             "chunk_id": f["chunk_id"],
-            "text": chunk_text,
+            "text": texts[f["chunk_id"]],
             "score": f["final_score"]
         })
     return results
 
+def eval_retriever_batch(queries, vector_store, bm25_store, intent, top_k):
+    """
+    Batched eval_retriver: one embedding pass, one FAISS call, one BM25
+    pass for the whole eval set; each chunk text is fetched once.
+    Returns one result list per query, same shape as eval_retriver.
+    """
+    query_embeddings = embed_texts(queries)
+
+    dense_lists = dense_retrieve_text_batch(
+        query_embeddings=query_embeddings,
+        vector_store=vector_store,
+        top_k=15
+    ) or [[] for _ in queries]
+
+    sparse_lists = sparse_retrieve_batch(
+        queries=queries,
+        bm25_index=bm25_store,
+        top_k=10
+    )
+
+    fused_lists = [
+        hybrid_fusion(
+            dense_results=dense_results,
+            sparse_results=sparse_results,
+            intent=intent,
+            top_k=top_k
+        )
+        for dense_results, sparse_results in zip(dense_lists, sparse_lists)
+    ]
+
+    chunks, missing = chunk_retriever.get_chunks(
+        [f["chunk_id"] for fused in fused_lists for f in fused]
+    )
+    texts = {c["chunk_id"]: c["clean_text"] for c in chunks}
+    if missing:
+        print(f"⚠️ MISSING CHUNKS: {missing}")
+
+    return [
+        [
+            {
+                "chunk_id": f["chunk_id"],
+                "text": texts[f["chunk_id"]],
+                "score": f["final_score"]
+            }
+            for f in fused
+            if f["chunk_id"] in texts
+        ]
+        for fused in fused_lists
+    ]
+
 if __name__ == "__main__":
     from storage.multimodel_vector_store import MultiModalVectorStore
     from indexes.sparse_index import BM25Index
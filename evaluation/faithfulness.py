@@ -1,5 +1,4 @@
 import random
-import time
 
 import json
 from evaluation.load_eval import load_eval_dataset
@@ -125,7 +124,6 @@ def llm_faithfulness_check(query, answer, retrieved_chunks):
     response = llm.invoke(messages)
     return response.content.strip().upper()
 
-RATE_LIMIT_SECONDS = 15
 def run_llm_faithfulness(
     eval_outputs,
     deterministic_failures,
@@ -173,8 +171,6 @@ def run_llm_faithfulness(
             "llm_faithful": verdict
         })
 
-        time.sleep(RATE_LIMIT_SECONDS)
-
     return results
     
 
@@ -248,7 +244,6 @@ def main():
     
 def main1():
         # ---- CONFIG ----
-    RATE_LIMIT_SECONDS = 15          # Gemini free tier safe
     MAX_CALLS = 8                    # hard cap (important)
     TARGET_EVAL_IDS = {
         "EVAL_A_01",
@@ -293,8 +288,6 @@ def main1():
         print("LLM verdict:", verdict)
         print("-" * 60)
 
-        time.sleep(RATE_LIMIT_SECONDS)
-
     # ---- Summary ----
     yes = sum(1 for r in results if r["llm_faithful"] == "YES")
     no = sum(1 for r in results if r["llm_faithful"] == "NO")
@@ -1,5 +1,5 @@
 from typing import Dict, List
-from evaluation.eval_retriever import eval_retriver
+from evaluation.eval_retriever import eval_retriver, eval_retriever_batch
 from storage.multimodel_vector_store import MultiModalVectorStore
 from indexes.sparse_index import BM25Index
 
@@ -8,21 +8,7 @@ bm25_store = BM25Index()
 # load the sparse index pickle file
 bm25_store.load("sparse_store/bm25_index.pkl")
 
-def run_retrieval_eval(query: str, top_k ) -> Dict:
-    """
-    Runs retrieval ONLY.
-    No LLM.
-    No answer generation.
-    """
-
-    results = eval_retriver(
-            query=query,
-            vector_store=vector_store,
-            bm25_store=bm25_store,
-            intent="unknown",
-            top_k=top_k
-        )
-
+def _format_retrieval(results, top_k) -> Dict:
     retrieved_chunk_ids = []
     retrieved_chunks = []
 
@@ -40,15 +26,41 @@ def run_retrieval_eval(query: str, top_k ) -> Dict:
         "top_k": top_k
     }
 
-def run_retrieval_on_eval_set(eval_data, top_k):
-    outputs = []
+def run_retrieval_eval(query: str, top_k ) -> Dict:
+    """
+    Runs retrieval ONLY.
+    No LLM.
+    No answer generation.
+    """
 
-    for item in eval_data:
-        retrieval = run_retrieval_eval(
-            query=item["query"],
+    results = eval_retriver(
+            query=query,
+            vector_store=vector_store,
+            bm25_store=bm25_store,
+            intent="unknown",
             top_k=top_k
         )
 
+    return _format_retrieval(results, top_k)
+
+def run_retrieval_on_eval_set(eval_data, top_k):
+    """
+    Retrieval for the whole eval set in ONE batched pass
+    (embedding, dense + sparse search, chunk fetch).
+    """
+    outputs = []
+
+    batch_results = eval_retriever_batch(
+        queries=[item["query"] for item in eval_data],
+        vector_store=vector_store,
+        bm25_store=bm25_store,
+        intent="unknown",
+        top_k=top_k
+    )
+
+    for item, results in zip(eval_data, batch_results):
+        retrieval = _format_retrieval(results, top_k)
+
         outputs.append({
             "eval_id": item["id"],
             "query": item["query"],
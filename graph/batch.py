@@ -0,0 +1,147 @@
+# graph/batch.py
+"""
+Batch execution of the query flow for many questions at once.
+
+Same decisions as the compiled graph, different scheduling:
+- LLM stages (planning, answer) run per query, with bounded
+  concurrency so a large batch never floods the provider
+- Deterministic stages (embedding, dense + sparse search, chunk fetch)
+  run ONCE for the whole batch
+- Chunks are read with the sync retriever on the executor (one batched
+  fetch); an async chunk retriever would not overlap anything here
+"""
+import asyncio
+from functools import partial
+from typing import List
+
+from langchain_core.runnables.config import run_in_executor
+
+from agents.state import QueryState, initial_state
+from agents.intent import intent_check_node_async
+from agents.planner import planner_node_async
+from agents.rewrite import rewrite_generate_node_async, rewrite_guard_node
+from agents.retrieve import retrieve_batch
+from agents.validate import validate_batch
+from agents.multi_hop import multi_hop_node
+from agents.answer import answer_generation_node_async
+from agents.refuse import refusal_node
+from agents.local_intent import local_intent_node_async, local_planner_node_async
+from graph.workflow import QUERY_PLANNER
+from graph.routing import route_policy_node
+from agents.compress import compress_context_node
+from agents.rerank import rerank_batch
+from agents.semantic_cache import semantic_cache_lookup_node, semantic_cache_store_node
+from agents.deadline import deadline_after
+
+LLM_CONCURRENCY = 4
+
+
+async def arun_batch(
+    queries: List[str],
+    vector_store,
+    bm25_store,
+    chunk_retriever,
+    max_concurrency: int = LLM_CONCURRENCY,
+    planner: str = QUERY_PLANNER,
+    intent_classifier=None,
+    context_compressor=None,
+    reranker=None,
+    semantic_cache=None,
+    deadline_seconds: float = 0
+) -> List[QueryState]:
+    """
+    Returns one final state per query, in input order.
+
+    `semantic_cache` (optional): looked up with the batch's embeddings;
+    hits skip validation and the answer call, answered queries are stored.
+
+    `deadline_seconds` (0 → none): one deadline shared by the whole
+    batch, counted from submission. Offline jobs normally run without.
+    """
+    llm_slots = asyncio.Semaphore(max_concurrency)
+    deadline_at = deadline_after(deadline_seconds)
+
+    if planner == "fused":
+        first = planner_node_async if intent_classifier is None else partial(
+            local_planner_node_async, classifier=intent_classifier
+        )
+    else:
+        first = intent_check_node_async if intent_classifier is None else partial(
+            local_intent_node_async, classifier=intent_classifier
+        )
+
+    async def plan(user_query: str) -> QueryState:
+        async with llm_slots:
+            state = route_policy_node(await first(initial_state(user_query, deadline_at)), planner)
+            if state["route"] == "rewrite_generate":
+                state = await rewrite_generate_node_async(state)
+            return state
+
+    async def answer(state: QueryState) -> QueryState:
+        if state.get("validation_status") == "pass" and state.get("semantic_cache_hit") is None:
+            if context_compressor is not None:
+                state = await run_in_executor(None, compress_context_node, state, context_compressor)
+            async with llm_slots:
+                state = await answer_generation_node_async(state)
+        state = refusal_node(state)
+        if semantic_cache is not None:
+            state = semantic_cache_store_node(state, semantic_cache)
+        return state
+
+    # 1. LLM planning (bounded concurrency)
+    planned = await asyncio.gather(*(plan(q) for q in queries))
+
+    # refused by the routing policy → final gate only
+    refuse_idx = [i for i, s in enumerate(planned) if s.get("route") == "refuse"]
+
+    # multi_hop keeps its own per-query fan-out (already batched inside)
+    hop_idx = [
+        i for i, s in enumerate(planned)
+        if s.get("route") != "refuse"
+        and s.get("intent") == "multi_hop" and s.get("rewrite_candidates")
+    ]
+    skip = set(hop_idx) | set(refuse_idx)
+    flat_idx = [i for i in range(len(planned)) if i not in skip]
+
+    # 2. Deterministic stages, batched across all non-multi-hop queries
+    def deterministic() -> List[QueryState]:
+        guarded = [rewrite_guard_node(planned[i]) for i in flat_idx]
+        retrieved = retrieve_batch(guarded, vector_store, bm25_store)
+        if semantic_cache is not None:
+            retrieved = [
+                semantic_cache_lookup_node(s, semantic_cache, chunk_retriever)
+                for s in retrieved
+            ]
+
+        # semantic cache hits already carry their answer and evidence
+        misses = [i for i, s in enumerate(retrieved) if s.get("semantic_cache_hit") is None]
+        todo = [retrieved[i] for i in misses]
+        if reranker is not None:
+            todo = rerank_batch(todo, reranker, chunk_retriever)
+        for i, state in zip(misses, validate_batch(todo, chunk_retriever)):
+            retrieved[i] = state
+        return retrieved
+
+    validated = await run_in_executor(None, deterministic)
+    hops = await asyncio.gather(*(
+        run_in_executor(
+            None,
+            multi_hop_node,
+            planned[i],
+            vector_store,
+            bm25_store,
+            chunk_retriever
+        )
+        for i in hop_idx
+    ))
+
+    ready = [None] * len(planned)
+    for i, state in zip(flat_idx, validated):
+        ready[i] = state
+    for i, state in zip(hop_idx, hops):
+        ready[i] = state
+    for i in refuse_idx:
+        ready[i] = planned[i]
+
+    # 3. Answer + final gate (bounded concurrency)
+    return list(await asyncio.gather(*(answer(s) for s in ready)))
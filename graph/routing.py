@@ -0,0 +1,151 @@
+# graph/routing.py
+"""
+Intent-driven routing after planning.
+
+One policy node decides the path from (intent, confidence) and what
+planning already produced; the graph's conditional edges just read
+`state["route"]`. Every decision is counted so the LLM traffic saved by
+short-cuts is visible: the calls a request actually made (`llm_calls`)
+plus the ones its route still implies, against the full path of the
+planner in use.
+
+Routes:
+- "refuse"           confident unanswerable → final gate, no retrieval / answer call
+                     (LLM decisions only: the local classifier's softmax is not
+                     calibrated against these thresholds)
+- "skip_rewrite"     confident factual → straight to guard + embedding (raw query)
+- "rewrite_generate" intent known, rewrites not generated yet
+- "multi_hop"        sub-questions ready
+- "rewrite_guard"    rewrites ready (fused planner)
+
+Under deadline pressure (agents/deadline.py) "rewrite_generate" becomes
+"skip_rewrite" whatever the intent.
+"""
+import os
+import threading
+from collections import Counter
+
+from agents.state import QueryState
+from agents.deadline import budget_below, degrade, SKIP_REWRITE_BELOW_SECONDS
+from agents.local_intent import LOCAL_INTENT_REASON
+from agents.retrieve import discard_speculation
+
+FACTUAL_SKIP_REWRITE_CONFIDENCE = float(os.getenv("FACTUAL_SKIP_REWRITE_CONFIDENCE", 0.9))
+UNANSWERABLE_REFUSE_CONFIDENCE = float(os.getenv("UNANSWERABLE_REFUSE_CONFIDENCE", 0.9))
+
+# per-intent policy: confidence at/above which the short-cut is taken
+ROUTING_POLICY = {
+    "factual":      {"skip_rewrite_at": FACTUAL_SKIP_REWRITE_CONFIDENCE},
+    "analytical":   {},
+    "multi_hop":    {},
+    "unanswerable": {"refuse_at": UNANSWERABLE_REFUSE_CONFIDENCE},
+}
+
+# LLM calls of the full path (no short-cut): planning + answer generation
+FULL_PATH_LLM_CALLS = {
+    "fused": 2,          # plan, answer
+    "two_step": 3,       # intent, rewrite, answer
+}
+
+
+class RouteCounters:
+    """Thread-safe per-route counts (shared by every graph in the process)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = Counter()
+        self._saved = 0
+
+    def record(self, route: str, intent: str, llm_calls_saved: int = 0) -> None:
+        with self._lock:
+            self._counts[route] += 1
+            self._counts[f"{route}:{intent}"] += 1
+            self._saved += llm_calls_saved
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counts.clear()
+            self._saved = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            counts = dict(self._counts)
+            saved = self._saved
+
+        routes = {k: v for k, v in counts.items() if ":" not in k}
+        total = sum(routes.values())
+        return {
+            "total": total,
+            "routes": routes,
+            "by_intent": {k: v for k, v in counts.items() if ":" in k},
+            "llm_calls_saved": saved,
+        }
+
+
+route_counters = RouteCounters()
+
+
+def decide_route(state: QueryState) -> str:
+    intent = state.get("intent") or "unknown"
+    confidence = state.get("intent_confidence") or 0.0
+    policy = ROUTING_POLICY.get(intent, {})
+
+    local = state.get("intent_reason") == LOCAL_INTENT_REASON
+    if not local and confidence >= policy.get("refuse_at", float("inf")):
+        return "refuse"
+
+    # rewrites already produced (fused planner / fallback inside it)
+    if state.get("rewrite_candidates") is not None:
+        if intent == "multi_hop" and state["rewrite_candidates"]:
+            return "multi_hop"
+        return "rewrite_guard"
+
+    if confidence >= policy.get("skip_rewrite_at", float("inf")):
+        return "skip_rewrite"
+    if budget_below(state, SKIP_REWRITE_BELOW_SECONDS):
+        return "skip_rewrite"
+    return "rewrite_generate"
+
+
+def llm_calls_saved(state: QueryState, route: str, planner: str) -> int:
+    """
+    Full-path calls minus this request's: the planning calls already made
+    (local intent → none; unusable fused output → fallback calls too),
+    the rewrite call "rewrite_generate" still makes, and the answer call
+    every route but "refuse" makes.
+    """
+    calls = state.get("llm_calls") or 0
+    if route == "rewrite_generate":
+        calls += 1
+    if route != "refuse":
+        calls += 1
+    return max(0, FULL_PATH_LLM_CALLS[planner] - calls)
+
+
+def route_policy_node(state: QueryState, planner: str) -> QueryState:
+    route = decide_route(state)
+    route_counters.record(
+        route,
+        state.get("intent") or "unknown",
+        llm_calls_saved(state, route, planner)
+    )
+    print(f"✅ROUTE===={route} ({state.get('intent')}, {state.get('intent_confidence')})")
+
+    if route == "refuse":
+        discard_speculation(state)   # nothing will be retrieved
+
+    degraded = state.get("degraded") or []
+    if route == "skip_rewrite" and decide_route({**state, "deadline_at": None}) != route:
+        degraded = degrade(state, "skip_rewrite")
+
+    return {
+        **state,
+        "route": route,
+        "should_refuse": route == "refuse",
+        "degraded": degraded
+    }
+
+
+def route_after_policy(state: QueryState) -> str:
+    route = state.get("route")
+    return "rewrite_guard" if route == "skip_rewrite" else route
@@ -0,0 +1,242 @@
+# graph/service.py
+import asyncio
+from typing import AsyncIterator, Iterator, List, Optional
+
+from agents.state import QueryState, initial_state
+from graph.workflow import build_query_graph
+from agents.deadline import deadline_after
+from agents.retrieve import discard_speculation
+from graph.batch import arun_batch, LLM_CONCURRENCY
+from graph.routing import route_counters
+from graph.streaming import STREAM_MODES, STREAM_CONFIG, AnswerStream, token_event, replay
+from utils.response_cache import ResponseCache, normalize_query
+from utils.semantic_cache import SemanticCache
+from utils.rate_limiter import llm_limiter
+from agents.local_intent import LocalIntentClassifier
+from retrieval.context_compressor import ContextCompressor
+from retrieval.reranker import CrossEncoderReranker
+
+
+class QueryService:
+    """
+    Long-lived query entry point.
+
+    Responsibilities:
+    - Own the retrieval stores (vector, BM25, chunk retriever, and
+      optionally an async chunk retriever for `arun`)
+    - Compile the query graph ONCE at construction
+    - Per request: response cache → fresh state → invoke → response dict
+      (or, streaming: answer tokens as generated, then the response dict)
+
+    Does NOT:
+    - Load or build indexes (caller passes ready stores)
+    """
+
+    def __init__(
+        self,
+        vector_store,
+        bm25_store,
+        chunk_retriever,
+        async_chunk_retriever=None,
+        response_cache: Optional[ResponseCache] = None,
+        semantic_cache: Optional[SemanticCache] = None,
+        intent_classifier: Optional[LocalIntentClassifier] = None,
+        context_compressor: Optional[ContextCompressor] = None,
+        reranker: Optional[CrossEncoderReranker] = None
+    ):
+        self.vector_store = vector_store
+        self.bm25_store = bm25_store
+        self.chunk_retriever = chunk_retriever
+        self.async_chunk_retriever = async_chunk_retriever
+        self.response_cache = response_cache
+        self.semantic_cache = semantic_cache
+        self.intent_classifier = intent_classifier
+        self.context_compressor = context_compressor
+        self.reranker = reranker
+
+        self.workflow = build_query_graph(
+            vector_store=vector_store,
+            bm25_store=bm25_store,
+            chunk_retriever=chunk_retriever,
+            async_chunk_retriever=async_chunk_retriever,
+            semantic_cache=semantic_cache,
+            intent_classifier=intent_classifier,
+            context_compressor=context_compressor,
+            reranker=reranker
+        )
+
+    def run(self, user_query: str) -> dict:
+        version = self._cache_version()
+        cached = self._cached(user_query, version)
+        if cached is not None:
+            return cached
+
+        state = initial_state(user_query, deadline_after())
+        try:
+            final_state = self.workflow.invoke(state)
+        finally:
+            discard_speculation(state)   # no-op unless the request ended before retrieval
+        return self._remember(user_query, self.to_response(final_state), version)
+
+    async def arun(self, user_query: str) -> dict:
+        """
+        Async path: LLM nodes await the provider, retrieval runs on the
+        retrieval executor — many queries can be in flight per process.
+        """
+        version = self._cache_version()
+        cached = self._cached(user_query, version)
+        if cached is not None:
+            return cached
+
+        state = initial_state(user_query, deadline_after())
+        try:
+            final_state = await self.workflow.ainvoke(state)
+        finally:
+            discard_speculation(state)
+        return self._remember(user_query, self.to_response(final_state), version)
+
+    def run_queries(self, user_queries: List[str], max_concurrency: int = LLM_CONCURRENCY) -> List[dict]:
+        """
+        Throughput path for offline jobs / evals: deterministic stages are
+        batched across all queries, LLM stages share `max_concurrency` slots.
+        """
+        return asyncio.run(self.arun_queries(user_queries, max_concurrency))
+
+    async def arun_queries(self, user_queries: List[str], max_concurrency: int = LLM_CONCURRENCY) -> List[dict]:
+        """
+        Same collaborators as `arun` (response and semantic caches, local
+        intent, reranker, compression), except the async chunk retriever:
+        the batch reads chunks in one sync fetch on the executor.
+        """
+        version = self._cache_version()
+        responses = [self._cached(q, version) for q in user_queries]
+
+        # misses, with trivially different duplicates run once
+        todo = {}
+        for i, r in enumerate(responses):
+            if r is None:
+                todo.setdefault(normalize_query(user_queries[i]), []).append(i)
+        first = [idx[0] for idx in todo.values()]
+
+        final_states = await arun_batch(
+            [user_queries[i] for i in first],
+            vector_store=self.vector_store,
+            bm25_store=self.bm25_store,
+            chunk_retriever=self.chunk_retriever,
+            max_concurrency=max_concurrency,
+            intent_classifier=self.intent_classifier,
+            context_compressor=self.context_compressor,
+            reranker=self.reranker,
+            semantic_cache=self.semantic_cache
+        ) if first else []
+
+        for idx, final_state in zip(todo.values(), final_states):
+            response = self._remember(user_queries[idx[0]], self.to_response(final_state), version)
+            for i in idx:
+                responses[i] = dict(response)
+        return responses
+
+    # --------------------
+    # STREAMING
+    # --------------------
+    def stream(self, user_query: str) -> Iterator[dict]:
+        """
+        Answer tokens as the LLM produces them, then the final response
+        (event shapes: graph/streaming.py). Time to first token is the
+        latency the user sees.
+        """
+        version = self._cache_version()
+        cached = self._cached(user_query, version)
+        if cached is not None:
+            yield from replay(cached)
+            return
+
+        answer = AnswerStream()
+        state = initial_state(user_query, deadline_after())
+        try:
+            for mode, data in self.workflow.stream(
+                state,
+                config=STREAM_CONFIG,
+                stream_mode=STREAM_MODES
+            ):
+                text = answer.on_event(mode, data)
+                if text:
+                    yield token_event(text)
+        finally:
+            discard_speculation(state)   # also when the consumer stops early
+
+        response = self._remember(user_query, self.to_response(answer.final_state), version)
+        yield from answer.finish(response)
+
+    async def astream(self, user_query: str) -> AsyncIterator[dict]:
+        version = self._cache_version()
+        cached = self._cached(user_query, version)
+        if cached is not None:
+            for event in replay(cached):
+                yield event
+            return
+
+        answer = AnswerStream()
+        state = initial_state(user_query, deadline_after())
+        try:
+            async for mode, data in self.workflow.astream(
+                state,
+                config=STREAM_CONFIG,
+                stream_mode=STREAM_MODES
+            ):
+                text = answer.on_event(mode, data)
+                if text:
+                    yield token_event(text)
+        finally:
+            discard_speculation(state)
+
+        response = self._remember(user_query, self.to_response(answer.final_state), version)
+        for event in answer.finish(response):
+            yield event
+
+    async def aclose(self) -> None:
+        """
+        Release the running loop's async resources (the async chunk
+        retriever's pool). Call before a loop you own shuts down; under
+        asyncio.run the pool is also closed at loop shutdown.
+        """
+        if self.async_chunk_retriever is not None:
+            await self.async_chunk_retriever.close()
+
+    @staticmethod
+    def route_stats() -> dict:
+        """Per-path routing counts and LLM calls saved (process-wide)."""
+        return route_counters.stats()
+
+    @staticmethod
+    def llm_stats() -> dict:
+        """Shared LLM limiter: calls, retries, queue depth, time spent waiting."""
+        return llm_limiter.stats()
+
+    # --------------------
+    # RESPONSE CACHE
+    # --------------------
+    def _cache_version(self) -> Optional[str]:
+        # captured at lookup: a response is stored under the index version it was computed against
+        return self.response_cache.version() if self.response_cache is not None else None
+
+    def _cached(self, user_query: str, version: Optional[str]) -> Optional[dict]:
+        if self.response_cache is None:
+            return None
+        return self.response_cache.get(user_query, version)
+
+    def _remember(self, user_query: str, response: dict, version: Optional[str]) -> dict:
+        # degraded by the deadline: a later, unhurried run may do better
+        if self.response_cache is not None and not response.get("degraded"):
+            self.response_cache.put(user_query, response, version)
+        return response
+
+    @staticmethod
+    def to_response(final_state: QueryState) -> dict:
+        return {
+            "answer": final_state.get("final_response"),
+            "citations": final_state.get("answer_citations"),
+            "refused": final_state.get("refused"),
+            "reason": final_state.get("refusal_reason") or final_state.get("validation_reason"),
+            "degraded": final_state.get("degraded") or [],
+        }
@@ -0,0 +1,81 @@
+# graph/streaming.py
+"""
+Answer streaming on top of the compiled graph.
+
+The graph runs with `stream_mode=["messages", "values"]`:
+- "messages": LLM tokens from every node; only the `answer` node's are kept
+- "values":   full state after each step (evidence count for the gate,
+              final state for reconciliation)
+
+Events handed to callers:
+- {"type": "token", "text": ...}         answer text that passed the gate
+- {"type": "final", "response": {...}}   authoritative QueryService response;
+                                         when "refused", discard streamed text
+"""
+from typing import List, Optional
+
+from agents.state import QueryState
+from agents.refuse import StreamingRefusalGate
+from agents.deadline import STREAM_ANSWER_KEY
+
+STREAM_MODES = ["messages", "values"]
+STREAM_CONFIG = {"configurable": {STREAM_ANSWER_KEY: True}}   # no answer hedging
+ANSWER_NODE = "answer"
+
+
+def _chunk_text(chunk) -> str:
+    content = getattr(chunk, "content", "")
+    if isinstance(content, str):
+        return content
+    # provider content blocks: [{"type": "text", "text": ...}, ...]
+    return "".join(
+        block.get("text", "") if isinstance(block, dict) else str(block)
+        for block in content
+    )
+
+
+def token_event(text: str) -> dict:
+    return {"type": "token", "text": text}
+
+
+def final_event(response: dict) -> dict:
+    return {"type": "final", "response": response}
+
+
+class AnswerStream:
+    """Per-request fold over the graph's (mode, data) stream."""
+
+    def __init__(self):
+        self.final_state: Optional[QueryState] = None
+        self.gate: Optional[StreamingRefusalGate] = None
+
+    def on_event(self, mode: str, data) -> str:
+        """Text to emit now ("" when nothing is safe to show yet)."""
+        if mode == "values":
+            self.final_state = data
+            return ""
+
+        chunk, metadata = data
+        if metadata.get("langgraph_node") != ANSWER_NODE:
+            return ""
+
+        if self.gate is None:
+            evidence = (self.final_state or {}).get("final_chunks") or []
+            self.gate = StreamingRefusalGate(citation_count=len(evidence))
+        return self.gate.feed(_chunk_text(chunk))
+
+    def finish(self, response: dict) -> List[dict]:
+        """Held-back tail (answer stood) + the final event."""
+        events = []
+        if not response.get("refused") and response.get("answer"):
+            # nothing streamed (semantic cache hit) → whole answer at once
+            tail = self.gate.flush() if self.gate is not None else response["answer"]
+            if tail:
+                events.append(token_event(tail))
+        events.append(final_event(response))
+        return events
+
+
+def replay(response: dict) -> List[dict]:
+    """Response-cache hit: same event shape as a live stream."""
+    return AnswerStream().finish(response)
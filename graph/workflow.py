@@ -2,17 +2,122 @@
 from langgraph.graph import StateGraph, END
 from agents.state import QueryState
 
-from agents.intent import intent_check_node
-from agents.rewrite import rewrite_generate_node, rewrite_guard_node
-from agents.retrieve import retrieve_node
-from agents.validate import validate_node
-from agents.answer import answer_generation_node
+from langchain_core.runnables import RunnableLambda
+from langchain_core.runnables.config import run_in_executor
+
+from agents.intent import intent_check_node, intent_check_node_async
+from agents.planner import planner_node, planner_node_async
+from agents.rewrite import rewrite_generate_node, rewrite_generate_node_async, rewrite_guard_node
+from agents.retrieve import retrieve_node, speculative_retrieve_node, SPECULATIVE_RETRIEVAL
+from agents.validate import validate_node, validate_node_async
+from agents.answer import answer_generation_node, answer_generation_node_async
 from agents.query_embedding import query_embedding_node
 from agents.refuse import refusal_node
+from agents.multi_hop import multi_hop_node
+from agents.semantic_cache import semantic_cache_lookup_node, semantic_cache_store_node
+from agents.compress import compress_context_node
+from agents.rerank import rerank_node
+from graph.routing import route_policy_node, route_after_policy
+from agents.local_intent import (
+    local_intent_node,
+    local_intent_node_async,
+    local_planner_node,
+    local_planner_node_async
+)
+from concurrent.futures import ThreadPoolExecutor
 from functools import partial
+import os
+
+# Bounded pool for blocking retrieval work (BGE, FAISS, BM25, Postgres)
+# when the graph runs under `ainvoke`. Keeps the event loop free for
+# other in-flight queries waiting on the LLM.
+RETRIEVAL_WORKERS = 8
+
+# "fused": intent + rewrites in one LLM call (planner node)
+# "two_step": intent_check → rewrite_generate (two sequential calls)
+QUERY_PLANNER = os.getenv("QUERY_PLANNER", "fused")
+_retrieval_executor = ThreadPoolExecutor(
+    max_workers=RETRIEVAL_WORKERS,
+    thread_name_prefix="retrieval"
+)
+
+
+def _offloaded(func):
+    async def run(state: QueryState) -> QueryState:
+        return await run_in_executor(_retrieval_executor, func, state)
+    return run
+
+
+def _inline(func):
+    async def run(state: QueryState) -> QueryState:
+        return func(state)
+    return run
+
+
+def _node(func, afunc=None, blocking: bool = True) -> RunnableLambda:
+    """
+    One node, two execution paths:
+    - `invoke`  → func
+    - `ainvoke` → afunc (native async), or func offloaded to the
+      executor when it blocks, or run inline when it is pure CPU-cheap
+    """
+    if afunc is None:
+        afunc = _offloaded(func) if blocking else _inline(func)
+    return RunnableLambda(func, afunc=afunc)
+
+
+def _route_after_rewrite(state: QueryState) -> str:
+    # multi_hop → parallel per-sub-question execution
+    if state.get("intent") == "multi_hop" and state.get("rewrite_candidates"):
+        return "multi_hop"
+    return "rewrite_guard"
+
+
+def _route_after_validation(state: QueryState) -> str:
+    return "answer" if state.get("validation_status") == "pass" else "refuse"
+
+
+def _route_after_cache_lookup(state: QueryState) -> str:
+    # cached answer (citations re-verified) → straight to the final gate
+    return "refuse" if state.get("semantic_cache_hit") is not None else "retrieve"
+
+
+def build_query_graph(
+    vector_store,
+    bm25_store,
+    chunk_retriever,
+    async_chunk_retriever=None,
+    semantic_cache=None,
+    planner: str = QUERY_PLANNER,
+    intent_classifier=None,
+    speculative: bool = SPECULATIVE_RETRIEVAL,
+    context_compressor=None,
+    reranker=None
+):
+    """
+    `planner`: "fused" (one LLM call for intent + rewrites, falling back
+    to two calls on unusable output) or "two_step". Either way the
+    routing policy then decides the path (see graph/routing.py).
+
+    `async_chunk_retriever` (optional): awaited by `validate` under
+    `ainvoke` instead of running the sync retriever on the executor.
+
+    `semantic_cache` (optional): paraphrases of answered questions skip
+    retrieval, validation and the answer LLM call.
+
+    `intent_classifier` (optional LocalIntentClassifier): confident local
+    intent skips the intent LLM call; below its threshold the planner
+    runs as configured.
 
+    `speculative`: embed + search the raw query in the background while
+    the LLM plans; retrieval reuses it for the original-query row.
 
-def build_query_graph(vector_store, bm25_store, chunk_retriever):
+    `context_compressor` (optional ContextCompressor): validated evidence
+    is cut down to the sentences closest to the query before `answer`.
+
+    `reranker` (optional CrossEncoderReranker): fused candidates are
+    re-scored by a cross-encoder between `retrieve` and `validate`.
+    """
     graph = StateGraph(QueryState)
 
     # retrieve
@@ -27,39 +132,151 @@ def build_query_graph(vector_store, bm25_store, chunk_retriever):
         chunk_retriever=chunk_retriever
     )
 
-    # Nodes
-    graph.add_node("intent_check", intent_check_node)
-    graph.add_node("rewrite_generate", rewrite_generate_node)
-    graph.add_node("rewrite_guard", rewrite_guard_node)
-    graph.add_node("query_embedding", query_embedding_node)
-    graph.add_node("retrieve", retrieve)
-    graph.add_node("validate", validate)
-    graph.add_node("answer", answer_generation_node)
-    graph.add_node("refuse", refusal_node)
-
-    # Entry
-    graph.set_entry_point("intent_check")
-
-    # Linear flow
-    graph.add_edge("intent_check", "rewrite_generate")
-    graph.add_edge("rewrite_generate", "rewrite_guard")
-    graph.add_edge("rewrite_guard", "query_embedding")
-    graph.add_edge("query_embedding", "retrieve")
-    graph.add_edge("retrieve", "validate")
+    validate_async = None
+    if async_chunk_retriever is not None:
+        validate_async = partial(
+            validate_node_async,
+            chunk_retriever=async_chunk_retriever
+        )
+
+    multi_hop = partial(
+        multi_hop_node,
+        vector_store=vector_store,
+        bm25_store=bm25_store,
+        chunk_retriever=chunk_retriever
+    )
+
+    plan, plan_async = planner_node, planner_node_async
+    intent_check, intent_check_async = intent_check_node, intent_check_node_async
+    if intent_classifier is not None:
+        plan = partial(local_planner_node, classifier=intent_classifier)
+        plan_async = partial(local_planner_node_async, classifier=intent_classifier)
+        intent_check = partial(local_intent_node, classifier=intent_classifier)
+        intent_check_async = partial(local_intent_node_async, classifier=intent_classifier)
+
+    # Nodes (sync for `invoke`, async for `ainvoke`)
+    if planner == "fused":
+        graph.add_node("plan", _node(plan, plan_async))
+    elif planner == "two_step":
+        graph.add_node("intent_check", _node(intent_check, intent_check_async))
+    else:
+        raise ValueError(f"Unknown planner: {planner!r} (expected 'fused' or 'two_step')")
+    graph.add_node("route", _node(partial(route_policy_node, planner=planner), blocking=False))
+    graph.add_node("rewrite_generate", _node(rewrite_generate_node, rewrite_generate_node_async))
+    graph.add_node("rewrite_guard", _node(rewrite_guard_node, blocking=False))
+    graph.add_node("query_embedding", _node(query_embedding_node))
+    graph.add_node("retrieve", _node(retrieve))
+    graph.add_node("validate", _node(validate, validate_async))
+    graph.add_node("multi_hop", _node(multi_hop))
+    graph.add_node("answer", _node(answer_generation_node, answer_generation_node_async))
+    graph.add_node("refuse", _node(refusal_node, blocking=False))
+
+    if semantic_cache is not None:
+        cache_lookup = partial(
+            semantic_cache_lookup_node,
+            semantic_cache=semantic_cache,
+            chunk_retriever=chunk_retriever
+        )
+        cache_store = partial(
+            semantic_cache_store_node,
+            semantic_cache=semantic_cache
+        )
+        graph.add_node("semantic_cache_lookup", _node(cache_lookup))
+        graph.add_node("semantic_cache_store", _node(cache_store, blocking=False))
+
+    if reranker is not None:
+        rerank = partial(
+            rerank_node,
+            reranker=reranker,
+            chunk_retriever=chunk_retriever
+        )
+        graph.add_node("rerank", _node(rerank))
 
-    # Validation decision
+    if context_compressor is not None:
+        compress = partial(
+            compress_context_node,
+            compressor=context_compressor
+        )
+        graph.add_node("compress", _node(compress))
+
+    # Entry → (speculative retrieval) → planning (one or two LLM calls)
+    first = "plan" if planner == "fused" else "intent_check"
+    if speculative:
+        speculate = partial(
+            speculative_retrieve_node,
+            vector_store=vector_store,
+            bm25_store=bm25_store
+        )
+        graph.add_node("speculate", _node(speculate, blocking=False))
+        graph.set_entry_point("speculate")
+        graph.add_edge("speculate", first)
+    else:
+        graph.set_entry_point(first)
+
+    # Planning → routing policy (graph/routing.py):
+    # refuse early / skip rewrite / generate rewrite / rewrites ready
+    graph.add_edge(first, "route")
+    graph.add_conditional_edges(
+        "route",
+        route_after_policy,
+        {
+            "refuse": "refuse",
+            "rewrite_generate": "rewrite_generate",
+            "multi_hop": "multi_hop",
+            "rewrite_guard": "rewrite_guard"
+        }
+    )
+
+    # Multi-hop branch
     graph.add_conditional_edges(
-        "validate",
-        lambda state: "answer" if state.get("validation_status") == "pass" else "refuse",
+        "rewrite_generate",
+        _route_after_rewrite,
         {
-            "answer": "answer",
-            "refuse": "refuse"
+            "multi_hop": "multi_hop",
+            "rewrite_guard": "rewrite_guard"
         }
     )
 
+    graph.add_edge("rewrite_guard", "query_embedding")
+    if semantic_cache is not None:
+        graph.add_edge("query_embedding", "semantic_cache_lookup")
+        graph.add_conditional_edges(
+            "semantic_cache_lookup",
+            _route_after_cache_lookup,
+            {
+                "refuse": "refuse",
+                "retrieve": "retrieve"
+            }
+        )
+    else:
+        graph.add_edge("query_embedding", "retrieve")
+    if reranker is not None:
+        graph.add_edge("retrieve", "rerank")
+        graph.add_edge("rerank", "validate")
+    else:
+        graph.add_edge("retrieve", "validate")
+
+    # Validation decision (→ optional compression → answer)
+    answer_entry = "compress" if context_compressor is not None else "answer"
+    for node in ("validate", "multi_hop"):
+        graph.add_conditional_edges(
+            node,
+            _route_after_validation,
+            {
+                "answer": answer_entry,
+                "refuse": "refuse"
+            }
+        )
+    if context_compressor is not None:
+        graph.add_edge("compress", "answer")
+
     # Final gate
     graph.add_edge("answer", "refuse")
-    graph.add_edge("refuse", END)
+    if semantic_cache is not None:
+        graph.add_edge("refuse", "semantic_cache_store")
+        graph.add_edge("semantic_cache_store", END)
+    else:
+        graph.add_edge("refuse", END)
 
     return graph.compile()
 
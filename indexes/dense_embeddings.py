@@ -22,6 +22,7 @@ TEXT_MODEL_NAME = "BAAI/bge-base-en-v1.5"
 text_tokenizer = AutoTokenizer.from_pretrained(TEXT_MODEL_NAME)
 text_model = AutoModel.from_pretrained(TEXT_MODEL_NAME).to(DEVICE)
 text_model.eval()
+TEXT_EMBEDDING_DIM = text_model.config.hidden_size
 
 # Image Embeddong Model (CLIP)
 CLIP_MODEL_NAME = "openai/clip-vit-base-patch32"
@@ -38,7 +39,7 @@ def embed_texts(texts: List[str]) -> np.ndarray:
     - L2 normalized (required for cosine/IP search)
     """
     if not texts:
-        return np.empty((0, 768), dtype=np.float32)
+        return np.empty((0, TEXT_EMBEDDING_DIM), dtype=np.float32)
 
     inputs = text_tokenizer(
         texts,
@@ -2,6 +2,7 @@
 
 from typing import List, Dict
 from rank_bm25 import BM25Okapi
+import numpy as np
 import re
 from config import DB_CONFIG
 from storage.postgres import PostgresStore
@@ -94,34 +95,81 @@ class BM25Index:
             }
         ]
         """
+        return self.search_batch([query], top_k)[0]
+
+    # Batched search
+    def search_batch(self, queries: List[str], top_k: int = 10) -> List[List[Dict]]:
+        """
+        Score many queries in ONE pass over the corpus.
+
+        Every unique query token is scored against the corpus once, then
+        each query's scores are a token-count weighted sum of those rows
+        (same math as BM25Okapi.get_scores, shared across queries).
+
+        Returns one result list per query, same shape as `search`.
+        """
 
         if self.bm25 is None:
             raise RuntimeError("BM25 index not built")
 
-        query_tokens = self._tokenize(query)
+        tokenized = [self._tokenize(q) for q in queries]
+
+        vocab: Dict[str, int] = {}
+        for tokens in tokenized:
+            for token in tokens:
+                vocab.setdefault(token, len(vocab))
+
+        if not vocab:
+            return [[] for _ in queries]
+
+        # query x token counts (duplicates count, as in get_scores)
+        query_counts = np.zeros((len(queries), len(vocab)))
+        for row, tokens in enumerate(tokenized):
+            for token in tokens:
+                query_counts[row, vocab[token]] += 1
 
-        if not query_tokens:
-            return []
+        scores = query_counts @ self._token_scores(list(vocab))
 
-        scores = self.bm25.get_scores(query_tokens)
+        batch_results = []
+        for row, tokens in enumerate(tokenized):
+            if not tokens:
+                batch_results.append([])
+                continue
+
+            # rank by score (stable → same tie order as sorted())
+            ranked = np.argsort(-scores[row], kind="stable")[:top_k]
+
+            results = []
+            for idx in ranked:
+                score = scores[row, idx]
+                if score <= 0:
+                    continue
+                results.append({
+                    "chunk_id": self.chunk_ids[idx],
+                    "score": float(score)
+                })
+            batch_results.append(results)
 
-        # rank by score
-        ranked = sorted(
-            enumerate(scores),
-            key=lambda x: x[1],
-            reverse=True
-        )[:top_k]
+        # print(f"✅✅ SUCCESSFULLY SEARCHED SPARSE EMBEDDINGS: {len(batch_results)}")
+        return batch_results
 
-        results = []
-        for idx, score in ranked:
-            if score <= 0:
+    def _token_scores(self, tokens: List[str]) -> np.ndarray:
+        """
+        token x corpus matrix of per-token BM25 contributions.
+        """
+        bm25 = self.bm25
+        doc_len = np.array(bm25.doc_len)
+        norm = bm25.k1 * (1 - bm25.b + bm25.b * doc_len / bm25.avgdl)
+
+        rows = np.zeros((len(tokens), bm25.corpus_size))
+        for i, token in enumerate(tokens):
+            idf = bm25.idf.get(token) or 0
+            if not idf:
                 continue
-            results.append({
-                "chunk_id": self.chunk_ids[idx],
-                "score": float(score)
-            })
-        # print(f"✅✅ SUCCESSFULLY SEARCHED SPARSE EMBEDDINGS: {len(results)}")
-        return results
+            q_freq = np.array([(doc.get(token) or 0) for doc in bm25.doc_freqs])
+            rows[i] = idf * (q_freq * (bm25.k1 + 1) / (q_freq + norm))
+
+        return rows
 
 if __name__ == "__main__":
     from indexes.sparse_index import BM25Index
@@ -148,4 +196,7 @@ if __name__ == "__main__":
     print("[BM25] Saving index to disk...")
     bm25.save(BM25_INDEX_PATH)
 
-    print(f"[BM25] Index saved at: {BM25_INDEX_PATH}")
\ No newline at end of file
+    print(f"[BM25] Index saved at: {BM25_INDEX_PATH}")
+
+    from utils.index_version import publish_index_version
+    publish_index_version(source="sparse_index")
\ No newline at end of file
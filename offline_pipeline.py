@@ -11,15 +11,27 @@ from ingestion.chunks import chunk_documents
 
 from storage.postgres import PostgresStore
 from storage.multimodel_vector_store import MultiModalVectorStore
+from storage.chunk_store import write_chunk_store, CHUNK_STORE_ENABLED
 
 from indexes.dense_embeddings import embed_text, embed_image, embed_table
+from agents.validate import evidence_sidecar
+from utils.index_version import publish_index_version
 
 VERSION = 1
+
 FILES_TO_INGEST = ["./data/Tauhid_CV.pdf"]
 # FILES_TO_INGEST = ["./data/India Post.pdf", "./data/instagram data.csv", "./data/ppt.pptx", "./data/Tauhid_CV.pdf", "./data/tiger.jpg"]
 
 # OFFLINE PIPELINE
-def run_offline_pipeline(files: List[str]) -> None:
+def run_offline_pipeline(
+    files: List[str],
+    emit_chunk_store: bool = False,
+    replace_existing: bool = False
+) -> None:
+    """
+    `replace_existing`: delete earlier versions of the same source_path
+    (and invalidate cached chunks) instead of appending a new document.
+    """
     print("\n=== OFFLINE INGESTION PIPELINE STARTED ===\n")
     
     # Load raw documents
@@ -45,13 +57,22 @@ def run_offline_pipeline(files: List[str]) -> None:
     # Store chunks in Postgres
     print("[3] Storing chunks in Postgres...")
     pg = PostgresStore(DB_CONFIG)
-    pg.insert_document_with_chunks(
-        source_path=source_path,
-        source_type=source_type,
-        checksum=checksum,
-        chunks=chunks,
-        version=VERSION
-    )
+    if replace_existing:
+        # previous versions deleted, chunk caches holding them invalidated
+        document_id = pg.replace_document(
+            source_path=source_path,
+            source_type=source_type,
+            checksum=checksum,
+            chunks=chunks
+        )
+    else:
+        document_id = pg.insert_document_with_chunks(
+            source_path=source_path,
+            source_type=source_type,
+            checksum=checksum,
+            chunks=chunks,
+            version=VERSION
+        )
     print("✅ Chunks stored successfully")
 
 
@@ -72,7 +93,11 @@ def run_offline_pipeline(files: List[str]) -> None:
         # ---- TEXT ----
         if chunk.get("clean_text"):
             emb = embed_text(chunk["clean_text"])
-            mm_store.add_text(emb, chunk_id)
+            mm_store.add_text(
+                emb,
+                chunk_id,
+                meta=evidence_sidecar(document_id, chunk["clean_text"])
+            )
             text_count += 1
 
         # ---- TABLE ----
@@ -101,7 +126,20 @@ def run_offline_pipeline(files: List[str]) -> None:
     mm_store.save_all()
     print("    Vector stores saved")
 
+    # Local chunk store: lets serving replicas run without Postgres
+    if emit_chunk_store:
+        print("[8] Writing memory-mapped chunk store...")
+        rows = write_chunk_store(
+            chunks=chunks,
+            document_id=document_id,
+            text_id_map=mm_store.text_store.id_map
+        )
+        print(f"    Chunk store rows: {rows}")
+
+    # New corpus version: invalidates every version-keyed cache
+    publish_index_version(source="offline_pipeline")
+
     print("\n=== OFFLINE INGESTION PIPELINE COMPLETED ===\n")
 
 if __name__ == "__main__":
-    run_offline_pipeline(FILES_TO_INGEST)
\ No newline at end of file
+    run_offline_pipeline(FILES_TO_INGEST, emit_chunk_store=CHUNK_STORE_ENABLED)
\ No newline at end of file
@@ -1,9 +1,15 @@
 # online_pipeline.py
-from graph.workflow import build_query_graph
-from agents.state import QueryState
+from graph.service import QueryService
 from indexes.sparse_index import BM25Index
 from storage.multimodel_vector_store import MultiModalVectorStore
 from retrieval.chunk_retriever import ChunkRetriever
+from storage.chunk_store import MmapChunkStore, CHUNK_STORE_ENABLED
+from retrieval.async_chunk_retriever import AsyncChunkRetriever
+from utils.response_cache import ResponseCache
+from utils.semantic_cache import SemanticCache, SEMANTIC_CACHE_ENABLED
+from agents.local_intent import LocalIntentClassifier
+from retrieval.context_compressor import ContextCompressor, CONTEXT_COMPRESSION
+from retrieval.reranker import CrossEncoderReranker, RERANKER_ENABLED
 from config import DB_CONFIG
 
 vector_store = MultiModalVectorStore()
@@ -11,59 +17,57 @@ bm25_store = BM25Index()
 # load the sparse index pickle file
 bm25_store.load("sparse_store/bm25_index.pkl")
 
-chunk_retriever = ChunkRetriever(db_config=DB_CONFIG)
+# CHUNK_STORE=1: local mmap chunk store (no DB; must be re-emitted after
+# every ingest), otherwise Postgres behind the in-process cache (dropped via LISTEN/NOTIFY)
+async_chunk_retriever = None
+if CHUNK_STORE_ENABLED:
+    chunk_retriever = MmapChunkStore()
+else:
+    chunk_retriever = ChunkRetriever(db_config=DB_CONFIG, listen_for_invalidation=True)
+    # non-blocking chunk lookups for run_query_async (if asyncpg is installed)
+    if AsyncChunkRetriever.available():
+        async_chunk_retriever = AsyncChunkRetriever(db_config=DB_CONFIG)
+
+# local intent model (trained with `python -m agents.local_intent` from
+# logged LLM decisions); absent → every query asks the LLM
+intent_classifier = LocalIntentClassifier.load() if LocalIntentClassifier.exists() else None
+
+# Compiled once per process, reused by every request
+query_service = QueryService(
+    vector_store=vector_store,
+    bm25_store=bm25_store,
+    chunk_retriever=chunk_retriever,
+    async_chunk_retriever=async_chunk_retriever,
+    # repeated / trivially different questions; dropped on new index version
+    response_cache=ResponseCache(),
+    # SEMANTIC_CACHE=1: paraphrases reuse the answer (citations re-verified)
+    semantic_cache=SemanticCache() if SEMANTIC_CACHE_ENABLED else None,
+    intent_classifier=intent_classifier,
+    # CONTEXT_COMPRESSION=1: only the evidence sentences closest to the query reach the answer LLM
+    context_compressor=ContextCompressor() if CONTEXT_COMPRESSION else None,
+    # RERANKER=1: CPU cross-encoder over the fused top-N (latency-budgeted)
+    reranker=CrossEncoderReranker() if RERANKER_ENABLED else None
+)
 
 def run_query(user_query: str):
-    workflow = build_query_graph(
-        vector_store=vector_store,
-        bm25_store=bm25_store,
-        chunk_retriever=chunk_retriever
-    )
-
-    initial_state: QueryState = {
-        "user_query": user_query,
-
-        # intent
-        "intent": None,
-        "intent_confidence": None,
-        "intent_reason": None,
-        "should_refuse": False,
-
-        # rewrite
-        "rewrite_candidates": None,
-        "rewrite_risk": None,
-        "original_query": user_query,
-        "selected_queries": None,
-        "rewrite_allowed": None,
-        "final_query": None,
-
-        # retrieval
-        "retrieved_chunks": [],
-        "retrieval_debug": None,
-
-        # validation
-        "final_chunks": [],
-        "validation_status": None,
-        "validation_reason": None,
-
-        # answer
-        "answer_text": None,
-        "answer_citations": [],
-
-        # final output
-        "final_response": None,
-        "refused": None,
-        "refusal_reason": None,
-    }
-
-    final_state = workflow.invoke(initial_state)
-
-    return {
-        "answer": final_state.get("final_response"),
-        "citations": final_state.get("answer_citations"),
-        "refused": final_state.get("refused"),
-        "reason": final_state.get("refusal_reason") or final_state.get("validation_reason"),
-    }
+    return query_service.run(user_query)
+
+
+async def run_query_async(user_query: str):
+    return await query_service.arun(user_query)
+
+
+def stream_query(user_query: str):
+    """Yields {"type": "token", ...} events, then {"type": "final", "response": ...}."""
+    return query_service.stream(user_query)
+
+
+def stream_query_async(user_query: str):
+    return query_service.astream(user_query)
+
+
+def run_queries(user_queries: list):
+    return query_service.run_queries(user_queries)
 
 
 if __name__ == "__main__":
@@ -72,4 +76,4 @@ if __name__ == "__main__":
 
     print("\n--- RESPONSE ---")
     for k, v in response.items():
-        print(f"{k}: {v}")
\ No newline at end of file
+        print(f"{k}: {v}")
@@ -0,0 +1,174 @@
+# retrieval/async_chunk_retriever.py
+import asyncio
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import asyncpg
+except ImportError:   # optional: only needed for the async Postgres path
+    asyncpg = None
+
+from retrieval.chunk_cache import ChunkCache, default_chunk_cache
+from retrieval.chunk_retriever import chunk_record
+
+ASYNC_POOL_MAX_SIZE = 10
+
+CHUNKS_BY_ID_SQL = """
+    SELECT chunk_id, document_id, chunk_index, page_number, clean_text, created_at
+    FROM chunks
+    WHERE chunk_id = ANY($1::uuid[])
+"""
+
+CHUNK_WINDOWS_SQL = """
+    SELECT c.chunk_id, c.document_id, c.chunk_index, c.page_number, c.clean_text, c.created_at
+    FROM unnest($1::uuid[], $2::int[], $3::int[]) AS w(document_id, lo, hi)
+    JOIN chunks c
+      ON c.document_id = w.document_id
+     AND c.chunk_index BETWEEN w.lo AND w.hi
+    ORDER BY c.document_id, c.chunk_index
+"""
+
+
+class AsyncChunkRetriever:
+    """
+    Async (asyncpg) counterpart of ChunkRetriever for the online flow.
+
+    Same semantics, awaited:
+    - get_chunk(chunk_id) → record, ValueError if missing
+    - get_chunks(ids) → (records in requested order, missing ids)
+    - get_neighbour_windows(windows) → records by (document_id, chunk_index)
+
+    Shares the in-process ChunkCache with the sync retriever. Lookups
+    never block the event loop, so they overlap with other in-flight
+    requests. asyncpg pools are loop-bound: one pool per event loop,
+    closed when that loop shuts down (asyncio.run cancelling leftover
+    tasks) or by `close()` on it.
+    """
+
+    def __init__(
+        self,
+        db_config,
+        cache: Optional[ChunkCache] = None,
+        max_size: int = ASYNC_POOL_MAX_SIZE
+    ):
+        if asyncpg is None:
+            raise ImportError("AsyncChunkRetriever requires `asyncpg` (uv sync --extra async)")
+
+        self.db_config = dict(db_config)
+        self.cache = cache if cache is not None else default_chunk_cache
+        self.max_size = max_size
+        # keyed by event loop; a pool holds its loop, so entries are removed
+        # explicitly (a weak key would never die)
+        self._pools: Dict[asyncio.AbstractEventLoop, "asyncpg.Pool"] = {}
+        self._pool_locks: Dict[asyncio.AbstractEventLoop, asyncio.Lock] = {}
+        self._closers: Dict[asyncio.AbstractEventLoop, asyncio.Task] = {}
+
+    @staticmethod
+    def available() -> bool:
+        return asyncpg is not None
+
+    async def _pool(self):
+        loop = asyncio.get_running_loop()
+        pool = self._pools.get(loop)
+        if pool is not None:
+            return pool
+
+        # concurrent first calls on a loop: only one of them creates the pool
+        lock = self._pool_locks.setdefault(loop, asyncio.Lock())
+        async with lock:
+            pool = self._pools.get(loop)
+            if pool is not None:
+                return pool
+
+            pool = await asyncpg.create_pool(
+                host=self.db_config.get("host"),
+                database=self.db_config.get("database"),
+                user=self.db_config.get("user"),
+                password=self.db_config.get("password"),
+                port=self.db_config.get("port"),
+                min_size=1,
+                max_size=self.max_size
+            )
+            self._pools[loop] = pool
+            self._closers[loop] = loop.create_task(self._close_on_shutdown(loop, pool))
+            return pool
+
+    async def _close_on_shutdown(self, loop, pool):
+        # parked until the loop shuts down: asyncio.run cancels leftover
+        # tasks before closing the loop, which closes this loop's pool
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await self._release(loop, pool)
+
+    async def _release(self, loop, pool):
+        if self._pools.get(loop) is not pool:
+            return   # already released
+        del self._pools[loop]
+        self._pool_locks.pop(loop, None)
+        self._closers.pop(loop, None)
+        await pool.close()
+
+    async def _fetch(self, sql: str, *args) -> List[dict]:
+        pool = await self._pool()
+        rows = await pool.fetch(sql, *args)
+        return [chunk_record(row) for row in rows]
+
+    # --------------------
+    # SAME INTERFACE AS ChunkRetriever
+    # --------------------
+    async def get_chunk(self, chunk_id: str) -> dict:
+        """
+        Raises:
+            ValueError if chunk does not exist
+        """
+        chunks, _ = await self.get_chunks([chunk_id])
+        if not chunks:
+            raise ValueError(f"Chunk not found: {chunk_id}")
+        return chunks[0]
+
+    async def get_chunks(self, chunk_ids: List[str]) -> Tuple[List[dict], List[str]]:
+        ids = list(dict.fromkeys(str(c) for c in chunk_ids))
+        if not ids:
+            return [], []
+
+        by_id, to_fetch = self.cache.get_many(ids)
+        if to_fetch:
+            generation = self.cache.generation
+            fetched = await self._fetch(CHUNKS_BY_ID_SQL, to_fetch)
+            self.cache.put_many(fetched, generation)
+            by_id.update((c["chunk_id"], c) for c in fetched)
+
+        chunks = [by_id[i] for i in ids if i in by_id]
+        missing = [i for i in ids if i not in by_id]
+        return chunks, missing
+
+    async def get_neighbour_windows(self, windows: List[Tuple[str, int, int]]) -> List[dict]:
+        if not windows:
+            return []
+
+        doc_ids, los, his = zip(*windows)
+        generation = self.cache.generation
+        records = await self._fetch(
+            CHUNK_WINDOWS_SQL,
+            [str(d) for d in doc_ids],
+            list(los),
+            list(his)
+        )
+        self.cache.put_many(records, generation)
+        return records
+
+    def cache_stats(self) -> dict:
+        return self.cache.stats()
+
+    async def close(self):
+        """Close the running loop's pool (other loops close theirs on shutdown)."""
+        loop = asyncio.get_running_loop()
+        pool = self._pools.get(loop)
+        if pool is None:
+            return
+
+        closer = self._closers.get(loop)
+        await self._release(loop, pool)
+        if closer is not None:
+            closer.cancel()
+
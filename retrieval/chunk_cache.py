@@ -0,0 +1,236 @@
+# retrieval/chunk_cache.py
+import os
+import select
+import threading
+import weakref
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import psycopg2
+
+CHUNK_CACHE_MAX_ENTRIES = int(os.getenv("CHUNK_CACHE_MAX_ENTRIES", 10_000))
+CHUNK_CACHE_MAX_BYTES = int(os.getenv("CHUNK_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+RECORD_OVERHEAD_BYTES = 256   # dict + ids + metadata, rough
+
+# Postgres NOTIFY channel used by PostgresStore on replace / delete
+INVALIDATION_CHANNEL = "chunk_invalidation"
+
+
+class ChunkCache:
+    """
+    Bounded, size-aware LRU of chunk records keyed by chunk_id.
+
+    Responsibilities:
+    - Serve hot chunk records without touching Postgres
+    - Evict least-recently-used records past max_entries / max_bytes
+    - Drop every chunk of a document when that document changes
+    - Expose hit / miss metrics
+
+    Thread-safe; one instance is shared by every retriever in a process.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = CHUNK_CACHE_MAX_ENTRIES,
+        max_bytes: int = CHUNK_CACHE_MAX_BYTES
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+
+        self._entries: "OrderedDict[str, Tuple[dict, int]]" = OrderedDict()
+        self._by_document: Dict[str, set] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+        # bumped on every invalidation; a fill started before it is stale
+        self.generation = 0
+
+        _live_caches.add(self)
+
+    @staticmethod
+    def _sizeof(record: dict) -> int:
+        return len(record.get("clean_text") or "") + RECORD_OVERHEAD_BYTES
+
+    # --------------------
+    # READ
+    # --------------------
+    def get_many(self, chunk_ids: List[str]) -> Tuple[Dict[str, dict], List[str]]:
+        """
+        Returns (chunk_id → record for hits, chunk_ids that missed).
+        """
+        found = {}
+        missing = []
+
+        with self._lock:
+            for chunk_id in chunk_ids:
+                entry = self._entries.get(chunk_id)
+                if entry is None:
+                    missing.append(chunk_id)
+                    continue
+                self._entries.move_to_end(chunk_id)
+                found[chunk_id] = dict(entry[0])
+
+            self.hits += len(found)
+            self.misses += len(missing)
+
+        return found, missing
+
+    def get(self, chunk_id: str) -> Optional[dict]:
+        found, _ = self.get_many([chunk_id])
+        return found.get(chunk_id)
+
+    # --------------------
+    # WRITE
+    # --------------------
+    def put_many(self, records: List[dict], generation: Optional[int] = None) -> None:
+        """
+        `generation`: value of self.generation read BEFORE the DB fetch;
+        if an invalidation happened since, the records are dropped.
+        """
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            for record in records:
+                self._put(record)
+            self._evict()
+
+    def put(self, record: dict, generation: Optional[int] = None) -> None:
+        self.put_many([record], generation)
+
+    def _put(self, record: dict) -> None:
+        chunk_id = record["chunk_id"]
+        self._remove(chunk_id)
+
+        size = self._sizeof(record)
+        if size > self.max_bytes:
+            return
+
+        self._entries[chunk_id] = (dict(record), size)
+        self._by_document.setdefault(record.get("document_id"), set()).add(chunk_id)
+        self._bytes += size
+
+    def _remove(self, chunk_id: str) -> None:
+        entry = self._entries.pop(chunk_id, None)
+        if entry is None:
+            return
+
+        record, size = entry
+        self._bytes -= size
+        doc_chunks = self._by_document.get(record.get("document_id"))
+        if doc_chunks is not None:
+            doc_chunks.discard(chunk_id)
+            if not doc_chunks:
+                del self._by_document[record.get("document_id")]
+
+    def _evict(self) -> None:
+        while self._entries and (
+            len(self._entries) > self.max_entries or self._bytes > self.max_bytes
+        ):
+            chunk_id = next(iter(self._entries))
+            self._remove(chunk_id)
+            self.evictions += 1
+
+    # --------------------
+    # INVALIDATION
+    # --------------------
+    def invalidate(self, chunk_ids: List[str]) -> None:
+        with self._lock:
+            for chunk_id in chunk_ids:
+                self._remove(chunk_id)
+            self.generation += 1
+            self.invalidations += 1
+
+    def invalidate_document(self, document_id: str) -> None:
+        with self._lock:
+            for chunk_id in list(self._by_document.get(str(document_id), ())):
+                self._remove(chunk_id)
+            self.generation += 1
+            self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._by_document.clear()
+            self._bytes = 0
+            self.generation += 1
+
+    # --------------------
+    # METRICS
+    # --------------------
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+# --------------------
+# PROCESS-WIDE INVALIDATION
+# --------------------
+_live_caches = weakref.WeakSet()
+
+default_chunk_cache = ChunkCache()
+
+
+def invalidate_document(document_id: str) -> None:
+    """Drop a document's chunks from every cache in this process."""
+    for cache in list(_live_caches):
+        cache.invalidate_document(document_id)
+
+
+class InvalidationListener(threading.Thread):
+    """
+    Cross-process invalidation: LISTENs on INVALIDATION_CHANNEL over a
+    dedicated autocommit connection and drops the notified document_ids
+    from this process's caches. Reconnects if the connection drops.
+    """
+
+    POLL_SECONDS = 5.0
+
+    def __init__(self, db_config):
+        super().__init__(name="chunk-cache-invalidation", daemon=True)
+        self.db_config = dict(db_config)
+        self._stop_event = threading.Event()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+
+    def run(self) -> None:
+        while not self._stop_event.is_set():
+            try:
+                self._listen()
+            except psycopg2.Error as e:
+                print(f"⚠️ Chunk cache invalidation listener reconnecting: {e}")
+                # anything may have changed while we were deaf
+                for cache in list(_live_caches):
+                    cache.clear()
+                self._stop_event.wait(self.POLL_SECONDS)
+
+    def _listen(self) -> None:
+        conn = psycopg2.connect(**self.db_config)
+        try:
+            conn.autocommit = True
+            with conn.cursor() as cur:
+                cur.execute(f"LISTEN {INVALIDATION_CHANNEL}")
+
+            while not self._stop_event.is_set():
+                if select.select([conn], [], [], self.POLL_SECONDS) == ([], [], []):
+                    continue
+                conn.poll()
+                while conn.notifies:
+                    notify = conn.notifies.pop(0)
+                    invalidate_document(notify.payload)
+        finally:
+            conn.close()
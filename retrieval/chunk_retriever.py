@@ -1,7 +1,31 @@
 # storage/chunk_retriever.py
-import psycopg2
+from typing import List, Tuple, Optional
 from psycopg2.extras import RealDictCursor
 
+from storage.pool import ConnectionPool, get_pool
+from retrieval.chunk_cache import ChunkCache, InvalidationListener, default_chunk_cache
+
+CHUNK_COLUMNS = """
+    chunk_id,
+    document_id,
+    chunk_index,
+    page_number,
+    clean_text,
+    created_at
+"""
+
+
+def chunk_record(row) -> dict:
+    """DB row (psycopg2 RealDictRow / asyncpg Record) → chunk record."""
+    return {
+        "chunk_id": str(row["chunk_id"]),
+        "document_id": str(row["document_id"]),
+        "chunk_index": row["chunk_index"],
+        "page_number": row["page_number"],
+        "clean_text": row["clean_text"],
+        "created_at": row["created_at"],
+    }
+
 
 class ChunkRetriever:
     """
@@ -10,10 +34,27 @@ class ChunkRetriever:
     Responsibility:
     - Fetch ground-truth chunk content by chunk_id
     - Nothing else
+
+    Connections come from the shared bounded pool, so one retriever can
+    be used from many threads / concurrent queries at once. Records are
+    served from an in-process LRU (ChunkCache) when possible.
     """
 
-    def __init__(self, db_config):
-        self.conn = psycopg2.connect(**db_config)
+    def __init__(
+        self,
+        db_config,
+        pool: Optional[ConnectionPool] = None,
+        cache: Optional[ChunkCache] = None,
+        listen_for_invalidation: bool = False
+    ):
+        self.pool = pool or get_pool(db_config)
+        self.cache = cache if cache is not None else default_chunk_cache
+
+        # other processes (ingestion) replacing / deleting documents
+        self.listener = None
+        if listen_for_invalidation:
+            self.listener = InvalidationListener(db_config)
+            self.listener.start()
 
     def get_chunk(self, chunk_id: str) -> dict:
         """
@@ -22,37 +63,122 @@ class ChunkRetriever:
         Raises:
             ValueError if chunk does not exist
         """
-        with self.conn.cursor(cursor_factory=RealDictCursor) as cur:
-            cur.execute(
-                """
-                SELECT
-                    chunk_id,
-                    document_id,
-                    chunk_index,
-                    page_number,
-                    clean_text,
-                    created_at
-                FROM chunks
-                WHERE chunk_id = %s
-                """,
-                (chunk_id,)
-            )
-
-            row = cur.fetchone()
+        cached = self.cache.get(chunk_id)
+        if cached is not None:
+            return cached
+        generation = self.cache.generation
+
+        def fetch(conn):
+            with conn.cursor(cursor_factory=RealDictCursor) as cur:
+                cur.execute(
+                    f"""
+                    SELECT {CHUNK_COLUMNS}
+                    FROM chunks
+                    WHERE chunk_id = %s
+                    """,
+                    (chunk_id,)
+                )
+                return cur.fetchone()
+
+        row = self.pool.run(fetch)
 
         if row is None:
             raise ValueError(f"Chunk not found: {chunk_id}")
 
-        return {
-            "chunk_id": str(row["chunk_id"]),
-            "document_id": str(row["document_id"]),
-            "chunk_index": row["chunk_index"],
-            "page_number": row["page_number"],
-            "clean_text": row["clean_text"],
-            "created_at": row["created_at"],
-        }
+        record = chunk_record(row)
+        self.cache.put(record, generation)
+        return record
+
+    def get_chunks(self, chunk_ids: List[str]) -> Tuple[List[dict], List[str]]:
+        """
+        Fetch many chunks in ONE round trip.
+
+        Returns:
+            (chunks, missing)
+            - chunks: found records, in requested order (duplicates collapsed)
+            - missing: requested chunk_ids with no row (never raises for these)
+        """
+        ids = list(dict.fromkeys(str(c) for c in chunk_ids))
+        if not ids:
+            return [], []
+
+        by_id, to_fetch = self.cache.get_many(ids)
+        if not to_fetch:
+            return [by_id[i] for i in ids], []
+        generation = self.cache.generation
+
+        def fetch(conn):
+            with conn.cursor(cursor_factory=RealDictCursor) as cur:
+                cur.execute(
+                    f"""
+                    SELECT {CHUNK_COLUMNS}
+                    FROM chunks
+                    WHERE chunk_id = ANY(%s::uuid[])
+                    """,
+                    (to_fetch,)
+                )
+                return cur.fetchall()
+
+        rows = self.pool.run(fetch)
+
+        fetched = [chunk_record(row) for row in rows]
+        self.cache.put_many(fetched, generation)
+        by_id.update((c["chunk_id"], c) for c in fetched)
+
+        chunks = [by_id[i] for i in ids if i in by_id]
+        missing = [i for i in ids if i not in by_id]
+        return chunks, missing
+
+    def get_neighbour_windows(self, windows: List[Tuple[str, int, int]]) -> List[dict]:
+        """
+        Every chunk with chunk_index in [lo, hi] of its document, for
+        all (document_id, lo, hi) windows, in ONE range query
+        (served by the (document_id, chunk_index) index).
+
+        Returns records ordered by (document_id, chunk_index).
+        """
+        if not windows:
+            return []
+
+        doc_ids, los, his = zip(*windows)
+        generation = self.cache.generation
+
+        def fetch(conn):
+            with conn.cursor(cursor_factory=RealDictCursor) as cur:
+                cur.execute(
+                    """
+                    SELECT
+                        c.chunk_id,
+                        c.document_id,
+                        c.chunk_index,
+                        c.page_number,
+                        c.clean_text,
+                        c.created_at
+                    FROM unnest(%s::uuid[], %s::int[], %s::int[]) AS w(document_id, lo, hi)
+                    JOIN chunks c
+                      ON c.document_id = w.document_id
+                     AND c.chunk_index BETWEEN w.lo AND w.hi
+                    ORDER BY c.document_id, c.chunk_index
+                    """,
+                    (list(map(str, doc_ids)), list(los), list(his))
+                )
+                return cur.fetchall()
+
+        rows = self.pool.run(fetch)
+
+        records = [chunk_record(row) for row in rows]
+        self.cache.put_many(records, generation)
+        return records
+
+    def cache_stats(self) -> dict:
+        return self.cache.stats()
+
+    def close(self):
+        # the pool is shared (get_pool) or the caller's: not ours to close
+        if self.listener is not None:
+            self.listener.stop()
 
 if __name__ == "__main__":
     from config import DB_CONFIG
     retrieve = ChunkRetriever(DB_CONFIG)
-    print(retrieve.get("5b99de2f-45ff-4703-85a4-fe9f884a7d66"))
\ No newline at end of file
+    print(retrieve.get_chunk("5b99de2f-45ff-4703-85a4-fe9f884a7d66"))
\ No newline at end of file
@@ -0,0 +1,155 @@
+# retrieval/context_compressor.py
+"""
+Extractive compression of validated evidence before the answer call.
+
+Every chunk is split into sentences; sentences are scored by cosine
+similarity to the query embedding and only the best ones are kept:
+- the best sentence of EVERY chunk (chunk ids / citations survive)
+- then the remaining sentences by score while the token budget allows
+
+Kept sentences stay in their original order inside their chunk; gaps
+are marked with " … ". Sentence embeddings are cached, so a chunk that
+shows up again costs no BGE forward pass.
+"""
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import List, Tuple
+
+import numpy as np
+
+from retrieval.context_packer import token_counter
+
+# off by default: enable with CONTEXT_COMPRESSION=1 (see evaluation/eval_compression.py)
+CONTEXT_COMPRESSION = os.getenv("CONTEXT_COMPRESSION", "0") == "1"
+COMPRESSION_TOKEN_BUDGET = int(os.getenv("COMPRESSION_TOKEN_BUDGET", 400))
+SENTENCE_CACHE_MAX_ENTRIES = 50_000
+GAP_MARKER = " … "
+
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+|\n+")
+
+
+def split_sentences(text: str) -> List[str]:
+    return [s.strip() for s in _SENTENCE_SPLIT.split(text or "") if s.strip()]
+
+
+class SentenceEmbeddingCache:
+    """Bounded LRU: sentence text → normalised embedding."""
+
+    def __init__(self, max_entries: int = SENTENCE_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._vectors: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_many(self, sentences: List[str]) -> np.ndarray:
+        """One row per sentence; misses embedded in ONE batch."""
+        found = {}
+        with self._lock:
+            for s in sentences:
+                v = self._vectors.get(s)
+                if v is not None:
+                    self._vectors.move_to_end(s)
+                    found[s] = v
+            missing = [s for s in dict.fromkeys(sentences) if s not in found]
+            self.hits += len(sentences) - len(missing)
+            self.misses += len(missing)
+
+        if missing:
+            from indexes.dense_embeddings import embed_texts   # loads the BGE model
+            vectors = np.asarray(embed_texts(missing), dtype=np.float32)
+            vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+            with self._lock:
+                for s, v in zip(missing, vectors):
+                    self._vectors[s] = v
+                    found[s] = v
+                while len(self._vectors) > self.max_entries:
+                    self._vectors.popitem(last=False)
+
+        return np.stack([found[s] for s in sentences])
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._vectors),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+class ContextCompressor:
+    def __init__(
+        self,
+        token_budget: int = COMPRESSION_TOKEN_BUDGET,
+        cache: SentenceEmbeddingCache = None
+    ):
+        self.token_budget = token_budget
+        self.cache = cache or SentenceEmbeddingCache()
+
+    def compress(self, query_embedding: np.ndarray, final_chunks: List[dict]) -> Tuple[List[dict], dict]:
+        """
+        (compressed final_chunks, report). Chunk order, ids and every
+        field except "text" are unchanged.
+        """
+        per_chunk = [split_sentences(c["text"]) for c in final_chunks]
+        flat = [(i, j, s) for i, sentences in enumerate(per_chunk) for j, s in enumerate(sentences)]
+
+        tokens_before = sum(token_counter.count(c["text"], c["chunk_id"]) for c in final_chunks)
+        if not flat:
+            return final_chunks, self._report(len(flat), len(flat), tokens_before, tokens_before)
+
+        query = np.asarray(query_embedding, dtype=np.float32).reshape(-1)
+        query = query / max(float(np.linalg.norm(query)), 1e-12)
+        scores = self.cache.get_many([s for _, _, s in flat]) @ query
+        sizes = [token_counter.count(s) for _, _, s in flat]
+
+        # 1. best sentence of every chunk (keeps each citation backed)
+        keep = set()
+        best = {}
+        for k, (i, _, _) in enumerate(flat):
+            if i not in best or scores[k] > scores[best[i]]:
+                best[i] = k
+        keep.update(best.values())
+        used = sum(sizes[k] for k in keep)
+
+        # 2. remaining sentences by score, while they fit
+        for k in np.argsort(-scores):
+            k = int(k)
+            if k in keep or used + sizes[k] > self.token_budget:
+                continue
+            keep.add(k)
+            used += sizes[k]
+
+        # 3. rebuild each chunk from its kept sentences, in order
+        kept_by_chunk = {}
+        for k in sorted(keep):
+            i, j, s = flat[k]
+            kept_by_chunk.setdefault(i, []).append((j, s))
+
+        compressed = []
+        for i, c in enumerate(final_chunks):
+            kept = kept_by_chunk.get(i)
+            if not kept or len(kept) == len(per_chunk[i]):
+                compressed.append(c)
+                continue
+
+            text = kept[0][1]
+            for (prev_j, _), (j, s) in zip(kept, kept[1:]):
+                text += (" " if j == prev_j + 1 else GAP_MARKER) + s
+            compressed.append({**c, "text": text})
+
+        tokens_after = sum(token_counter.count(c["text"], c["chunk_id"]) for c in compressed)
+        return compressed, self._report(len(flat), len(keep), tokens_before, tokens_after)
+
+    @staticmethod
+    def _report(total: int, kept: int, before: int, after: int) -> dict:
+        return {
+            "sentences_total": total,
+            "sentences_kept": kept,
+            "tokens_before": before,
+            "tokens_after": after,
+        }
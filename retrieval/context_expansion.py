@@ -0,0 +1,148 @@
+# retrieval/context_expansion.py
+"""
+Neighbour-window expansion of selected evidence.
+
+Chunks are cut at a fixed size with overlap, so an answer often straddles
+a boundary. For every selected chunk we pull chunk_index ± window from the
+same document in ONE range fetch, merge overlapping windows, and stitch
+each window into a single passage with the duplicated overlap removed.
+"""
+import os
+from typing import Callable, Dict, List, Tuple
+
+from ingestion.chunks import DEFAULT_OVERLAP
+
+# 0 → expansion off
+CONTEXT_WINDOW = int(os.getenv("CONTEXT_EXPANSION_WINDOW", 0))
+MIN_OVERLAP_MATCH = 16   # shorter suffix/prefix matches are coincidence
+
+
+def plan_windows(final_chunks: List[dict], window: int) -> List[Tuple[str, int, int]]:
+    """
+    Merged (document_id, lo, hi) ranges covering chunk_index ± window
+    of every selected chunk. Adjacent / overlapping ranges are merged.
+    """
+    by_doc: Dict[str, List[Tuple[int, int]]] = {}
+    for c in final_chunks:
+        if c.get("chunk_index") is None:
+            continue
+        idx = c["chunk_index"]
+        by_doc.setdefault(c["document_id"], []).append(
+            (max(0, idx - window), idx + window)
+        )
+
+    merged = []
+    for doc_id, ranges in by_doc.items():
+        ranges.sort()
+        lo, hi = ranges[0]
+        for r_lo, r_hi in ranges[1:]:
+            if r_lo <= hi + 1:
+                hi = max(hi, r_hi)
+                continue
+            merged.append((doc_id, lo, hi))
+            lo, hi = r_lo, r_hi
+        merged.append((doc_id, lo, hi))
+
+    return merged
+
+
+def strip_overlap(prev: str, nxt: str, max_overlap: int = DEFAULT_OVERLAP) -> Tuple[str, bool]:
+    """
+    (`nxt` without the prefix it shares with the end of `prev`, matched?)
+
+    The chunker's overlap may end mid-word, so a matched remainder
+    continues `prev` character for character and must be appended as is.
+    """
+    longest = min(len(prev), len(nxt), max_overlap)
+    for k in range(longest, MIN_OVERLAP_MATCH - 1, -1):
+        if prev.endswith(nxt[:k]):
+            return nxt[k:], True
+    return nxt, False
+
+
+def stitch(records: List[dict]) -> str:
+    """Consecutive chunk records (same document, ascending index) → one passage."""
+    text = ""
+    prev_index = None
+    for r in records:
+        piece = r["clean_text"]
+        if not text:
+            text = piece
+        elif r["chunk_index"] == prev_index + 1:
+            rest, matched = strip_overlap(text, piece)
+            text = (text + rest) if matched else f"{text} {rest}"
+        else:
+            text = f"{text} {piece}"
+        prev_index = r["chunk_index"]
+    return text.strip()
+
+
+def expand_chunks(
+    final_chunks: List[dict],
+    records: List[dict],
+    window: int,
+    budget: int,
+    size: Callable[[str], int] = len
+) -> List[dict]:
+    """
+    Replace selected chunks with their stitched neighbour windows.
+
+    `records` is the result of ONE get_neighbour_windows call. Windows
+    are taken in evidence order; a window is only used if the passage
+    still fits `budget` overall (measured with `size`: chars by default,
+    tokens when given a token counter), otherwise its chunks stay as
+    they were. The prompt budget therefore never grows.
+    """
+    by_doc: Dict[str, List[dict]] = {}
+    for r in records:
+        by_doc.setdefault(r["document_id"], []).append(r)
+    for rows in by_doc.values():
+        rows.sort(key=lambda r: r["chunk_index"])
+
+    # group selected chunks by the merged range that covers them
+    windows = {}   # (document_id, lo, hi) → selected chunks
+    singles = []   # chunks without a chunk_index are never expanded
+    merged_ranges = plan_windows(final_chunks, window)
+
+    for c in final_chunks:
+        if c.get("chunk_index") is None:
+            singles.append(c)
+            continue
+        idx = c["chunk_index"]
+        key = next(
+            r for r in merged_ranges
+            if r[0] == c["document_id"] and r[1] <= idx <= r[2]
+        )
+        windows.setdefault(key, []).append(c)
+
+    total = sum(size(c["text"]) for c in final_chunks)
+    expanded = []
+
+    for key, selected in windows.items():
+        doc_id, lo, hi = key
+        rows = [
+            r for r in by_doc.get(doc_id, [])
+            if lo <= r["chunk_index"] <= hi
+        ]
+        if not rows:
+            expanded.extend(selected)
+            continue
+
+        passage = stitch(rows)
+        original = sum(size(c["text"]) for c in selected)
+        passage_size = size(passage)
+
+        if total - original + passage_size > budget:
+            expanded.extend(selected)
+            continue
+
+        total += passage_size - original
+        best = max(selected, key=lambda c: c.get("final_score", 0.0))
+        expanded.append({
+            **best,
+            "text": passage,
+            "window": [rows[0]["chunk_index"], rows[-1]["chunk_index"]],
+            "window_chunk_ids": [r["chunk_id"] for r in rows],
+        })
+
+    return expanded + singles
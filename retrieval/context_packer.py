@@ -0,0 +1,157 @@
+# retrieval/context_packer.py
+"""
+Token-budgeted context packing.
+
+Evidence is measured in model tokens (tiktoken) instead of characters,
+and the budget is filled optimally by score: a 0/1 knapsack over the
+candidates, so a smaller lower-ranked chunk that fits is not lost behind
+a larger one that does not.
+
+- Token counts are cached per chunk (chunk_id + text hash)
+- If the tiktoken encoding cannot be loaded (e.g. offline, BPE file not
+  cached), counts fall back to ceil(chars / CHARS_PER_TOKEN)
+"""
+import os
+import math
+import threading
+from collections import OrderedDict
+from typing import Callable, List, Optional
+
+import numpy as np
+
+try:
+    import tiktoken
+except ImportError:  # optional at runtime: char-based estimate instead
+    tiktoken = None
+
+# cl100k_base approximates the Gemini tokenizer well enough for budgeting
+TOKEN_ENCODING = os.getenv("CONTEXT_TOKEN_ENCODING", "cl100k_base")
+MAX_CONTEXT_TOKENS = int(os.getenv("MAX_CONTEXT_TOKENS", 1500))   # ≈ the old 6000-char budget
+CHARS_PER_TOKEN = 4
+TOKEN_CACHE_MAX_ENTRIES = 100_000
+
+_encoding = None
+_encoding_failed = False
+_encoding_lock = threading.Lock()
+
+
+def _get_encoding():
+    global _encoding, _encoding_failed
+    if _encoding is not None or _encoding_failed:
+        return _encoding
+
+    with _encoding_lock:
+        if _encoding is None and not _encoding_failed:
+            try:
+                if tiktoken is None:
+                    raise ImportError("tiktoken not installed")
+                _encoding = tiktoken.get_encoding(TOKEN_ENCODING)
+            except Exception as e:
+                _encoding_failed = True
+                print(f"⚠️ tiktoken encoding unavailable ({e}); estimating tokens as chars/{CHARS_PER_TOKEN}")
+    return _encoding
+
+
+def count_tokens(text: str) -> int:
+    if not text:
+        return 0
+    encoding = _get_encoding()
+    if encoding is None:
+        return math.ceil(len(text) / CHARS_PER_TOKEN)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+class TokenCounter:
+    """Bounded LRU of token counts, keyed by (chunk_id, text hash)."""
+
+    def __init__(self, max_entries: int = TOKEN_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._counts: "OrderedDict[tuple, int]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def count(self, text: str, chunk_id: Optional[str] = None) -> int:
+        key = (chunk_id, hash(text))
+
+        with self._lock:
+            n = self._counts.get(key)
+            if n is not None:
+                self._counts.move_to_end(key)
+                self.hits += 1
+                return n
+            self.misses += 1
+
+        n = count_tokens(text)
+
+        with self._lock:
+            self._counts[key] = n
+            while len(self._counts) > self.max_entries:
+                self._counts.popitem(last=False)
+        return n
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._counts),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+token_counter = TokenCounter()
+
+
+def pack(
+    candidates: List[dict],
+    budget: int,
+    max_per_doc: int,
+    tokens: Callable[[dict], int],
+    score: Callable[[dict], float] = lambda c: c.get("final_score", 0.0)
+) -> List[int]:
+    """
+    Indices of the candidates to keep, in input (rank) order.
+
+    - Per-document cap applied first, in rank order (as before)
+    - Then maximise total score subject to sum(tokens) <= budget
+      (exact DP over token capacity; candidate lists are small)
+    """
+    eligible = []
+    doc_counter = {}
+    for i, c in enumerate(candidates):
+        if tokens(c) > budget:
+            continue
+        doc_id = c["document_id"]
+        if doc_counter.get(doc_id, 0) >= max_per_doc:
+            continue
+        doc_counter[doc_id] = doc_counter.get(doc_id, 0) + 1
+        eligible.append(i)
+
+    if not eligible:
+        return []
+
+    weights = [tokens(candidates[i]) for i in eligible]
+    if sum(weights) <= budget:
+        return eligible
+
+    # best[b] = max total score with capacity b
+    best = np.zeros(budget + 1)
+    keep = np.zeros((len(eligible), budget + 1), dtype=bool)
+
+    for k, i in enumerate(eligible):
+        w, v = weights[k], score(candidates[i])
+        with_item = np.full(budget + 1, -np.inf)
+        with_item[w:] = best[:budget + 1 - w] + v
+        keep[k] = with_item > best
+        best = np.where(keep[k], with_item, best)
+
+    chosen = []
+    capacity = budget
+    for k in range(len(eligible) - 1, -1, -1):
+        if keep[k, capacity]:
+            chosen.append(eligible[k])
+            capacity -= weights[k]
+
+    return sorted(chosen)
@@ -63,6 +63,7 @@ def hybrid_fusion(dense_results, sparse_results, intent, top_k=10):
 
     dense_scores = {r["chunk_id"]: r["dense_score"] for r in dense_results}
     sparse_scores = {r["chunk_id"]: r["sparse_score"] for r in sparse_results}
+    dense_meta = {r["chunk_id"]: r["meta"] for r in dense_results if "meta" in r}
 
     dense_norm = min_max_normalize(dense_scores)
     sparse_norm = min_max_normalize(sparse_scores)
@@ -79,14 +80,58 @@ def hybrid_fusion(dense_results, sparse_results, intent, top_k=10):
         if dense_norm[cid] < DENSE_GATE:
             continue
 
-        fused.append({
+        entry = {
             "chunk_id": cid,
             "final_score": (
                 w_dense * dense_norm[cid] +
                 w_sparse * sparse_norm.get(cid, 0.0)
             )
-        })
+        }
+        if cid in dense_meta:
+            entry["meta"] = dense_meta[cid]
+        fused.append(entry)
 
     fused.sort(key=lambda x: x["final_score"], reverse=True)
     return fused[:top_k]
 
+
+RRF_K = 60
+
+def multi_query_fusion(dense_lists, sparse_lists, intent, top_k=10, rrf_k=RRF_K):
+    """
+    Fuse retrieval for several query variants (original + rewrites).
+
+    - Each variant is fused dense+sparse with `hybrid_fusion`
+    - Variants are merged with Reciprocal Rank Fusion (ordering)
+    - `final_score` keeps the best per-variant blend, so the
+      validator's MIN_FINAL_SCORE still means the same thing
+    """
+    if len(dense_lists) == 1:
+        return hybrid_fusion(dense_lists[0], sparse_lists[0], intent, top_k=top_k)
+
+    merged = {}
+    for dense_results, sparse_results in zip(dense_lists, sparse_lists):
+        fused = hybrid_fusion(
+            dense_results=dense_results,
+            sparse_results=sparse_results,
+            intent=intent,
+            top_k=top_k
+        )
+
+        for rank, r in enumerate(fused):
+            entry = merged.setdefault(r["chunk_id"], {
+                "chunk_id": r["chunk_id"],
+                "final_score": 0.0,
+                "rrf_score": 0.0
+            })
+            if "meta" in r:
+                entry["meta"] = r["meta"]
+            entry["rrf_score"] += 1.0 / (rrf_k + rank + 1)
+            entry["final_score"] = max(entry["final_score"], r["final_score"])
+
+    ranked = sorted(
+        merged.values(),
+        key=lambda x: (x["rrf_score"], x["final_score"]),
+        reverse=True
+    )
+    return ranked[:top_k]
@@ -0,0 +1,215 @@
+# retrieval/reranker.py
+"""
+CPU cross-encoder re-ranking of fused candidates.
+
+- Scores (query, chunk text) pairs with a small cross-encoder in ONE
+  batch per call. The scores only ORDER candidates ("rerank_score");
+  "final_score" stays the fused score, so the validator's MIN_FINAL_SCORE
+  keeps gating on the scale it was tuned for (raw cross-encoder sigmoids
+  are not calibrated relevance)
+- Score cache keyed by (query, chunk_id, text hash)
+- Latency budget, per call: the per-pair cost is tracked (EMA); the
+  number of candidates scored per query shrinks, and in a batch only the
+  queries whose uncached pairs fit the budget are scored (the rest keep
+  their fused order)
+- Only the top `keep` re-ranked candidates go on to validation
+"""
+import os
+import time
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+RERANKER_ENABLED = os.getenv("RERANKER", "0") == "1"
+RERANKER_MODEL = os.getenv("RERANKER_MODEL", "cross-encoder/ms-marco-MiniLM-L-6-v2")
+RERANK_TOP_N = int(os.getenv("RERANK_TOP_N", 8))          # fused candidates considered
+RERANK_KEEP = int(os.getenv("RERANK_KEEP", 5))            # passed on to validation
+RERANK_LATENCY_BUDGET_MS = float(os.getenv("RERANK_LATENCY_BUDGET_MS", 150))
+MIN_RERANK_N = 3           # never score fewer than this, whatever the budget
+RERANK_MAX_LENGTH = 512
+RERANK_CACHE_MAX_ENTRIES = 50_000
+LATENCY_EMA_ALPHA = 0.3
+
+
+class CrossEncoderReranker:
+    def __init__(
+        self,
+        model_name: str = RERANKER_MODEL,
+        top_n: int = RERANK_TOP_N,
+        keep: int = RERANK_KEEP,
+        latency_budget_ms: float = RERANK_LATENCY_BUDGET_MS,
+        max_entries: int = RERANK_CACHE_MAX_ENTRIES
+    ):
+        self.model_name = model_name
+        self.top_n = top_n
+        self.keep = keep
+        self.latency_budget_ms = latency_budget_ms
+        self.max_entries = max_entries
+
+        self._tokenizer = None
+        self._model = None
+        self._load_lock = threading.Lock()
+
+        self._scores: "OrderedDict[tuple, float]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.per_pair_ms = None   # EMA, None until the first model call
+
+        self.hits = 0
+        self.misses = 0
+        self.truncated = 0
+        self.over_budget = 0
+
+    # --------------------
+    # MODEL
+    # --------------------
+    def _load(self):
+        with self._load_lock:
+            if self._model is None:
+                import torch
+                from transformers import AutoTokenizer, AutoModelForSequenceClassification
+
+                self._torch = torch
+                self._tokenizer = AutoTokenizer.from_pretrained(self.model_name)
+                self._model = AutoModelForSequenceClassification.from_pretrained(self.model_name)
+                self._model.eval()
+        return self._tokenizer, self._model
+
+    def _predict(self, pairs: List[Tuple[str, str]]) -> np.ndarray:
+        tokenizer, model = self._load()
+
+        inputs = tokenizer(
+            [q for q, _ in pairs],
+            [t for _, t in pairs],
+            padding=True,
+            truncation=True,
+            max_length=RERANK_MAX_LENGTH,
+            return_tensors="pt"
+        )
+        with self._torch.no_grad():
+            logits = model(**inputs).logits
+
+        logits = logits.float().cpu().numpy()
+        # single relevance logit (ms-marco style) or [irrelevant, relevant]
+        logits = logits[:, 0] if logits.shape[1] == 1 else logits[:, -1] - logits[:, 0]
+        return 1.0 / (1.0 + np.exp(-logits))
+
+    def _score_pairs(self, pairs: List[Tuple[str, str]]) -> np.ndarray:
+        """Model scores for uncached pairs in ONE forward pass; updates the latency EMA."""
+        start = time.perf_counter()
+        scores = self._predict(pairs)
+        per_pair = (time.perf_counter() - start) * 1000 / len(pairs)
+
+        with self._lock:
+            self.per_pair_ms = per_pair if self.per_pair_ms is None else (
+                LATENCY_EMA_ALPHA * per_pair + (1 - LATENCY_EMA_ALPHA) * self.per_pair_ms
+            )
+        return scores
+
+    # --------------------
+    # BUDGET
+    # --------------------
+    def affordable_pairs(self):
+        """Uncached pairs one call can score within the budget (None → unknown yet)."""
+        with self._lock:
+            per_pair = self.per_pair_ms
+        if per_pair is None or per_pair <= 0:
+            return None
+        return int(self.latency_budget_ms / per_pair)
+
+    def adaptive_n(self) -> int:
+        """Candidates per query that fit the latency budget."""
+        affordable = self.affordable_pairs()
+        if affordable is None:
+            return self.top_n
+        return max(MIN_RERANK_N, min(self.top_n, affordable))
+
+    # --------------------
+    # RERANK
+    # --------------------
+    def rerank_many(self, requests: List[Tuple[str, List[dict]]], texts: Dict[str, str]) -> List[List[dict]]:
+        """
+        requests: (query, fused candidates) per query.
+        texts:    chunk_id → chunk text (candidates without text are dropped).
+
+        Returns per query the top `keep` candidates by cross-encoder
+        score ("rerank_score"; "final_score" is left as fused). Queries
+        whose uncached pairs no longer fit the call's budget keep their
+        fused order (the first query is always scored).
+        """
+        n = self.adaptive_n()
+        affordable = self.affordable_pairs()
+
+        keys = []       # per request: [(candidate, cache key, cached score or None)], None → over budget
+        todo = {}       # cache key → (query, text), uncached only
+        for query, candidates in requests:
+            entries, missing = [], {}
+            for c in candidates[:n]:
+                text = texts.get(c["chunk_id"])
+                if not text:
+                    continue
+                key = (query, c["chunk_id"], hash(text))
+
+                with self._lock:
+                    cached = self._scores.get(key)
+                    if cached is not None:
+                        self._scores.move_to_end(key)
+                if cached is None and key not in todo:
+                    missing[key] = (query, text)
+                entries.append((c, key, cached))
+
+            if todo and affordable is not None and len(todo) + len(missing) > affordable:
+                with self._lock:
+                    self.over_budget += 1
+                keys.append(None)
+                continue
+
+            with self._lock:
+                self.hits += sum(cached is not None for _, _, cached in entries)
+                self.misses += sum(cached is None for _, _, cached in entries)
+                if len(candidates) > n:
+                    self.truncated += 1
+            todo.update(missing)
+            keys.append(entries)
+
+        fresh = {}
+        if todo:
+            scores = self._score_pairs(list(todo.values()))
+            fresh = dict(zip(todo, (float(s) for s in scores)))
+            with self._lock:
+                self._scores.update(fresh)
+                while len(self._scores) > self.max_entries:
+                    self._scores.popitem(last=False)
+
+        results = []
+        for (_, candidates), entries in zip(requests, keys):
+            if entries is None:
+                results.append(candidates[:self.keep])
+                continue
+            scored = [
+                {**c, "rerank_score": fresh[key] if cached is None else cached}
+                for c, key, cached in entries
+            ]
+            scored.sort(key=lambda c: c["rerank_score"], reverse=True)
+            results.append(scored[:self.keep])
+        return results
+
+    def rerank(self, query: str, candidates: List[dict], texts: Dict[str, str]) -> List[dict]:
+        return self.rerank_many([(query, candidates)], texts)[0]
+
+    # --------------------
+    # METRICS
+    # --------------------
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._scores),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "per_pair_ms": self.per_pair_ms,
+                "truncated_queries": self.truncated,
+                "over_budget_queries": self.over_budget,
+            }
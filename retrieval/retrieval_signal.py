@@ -2,20 +2,25 @@
 from typing import List, Dict
 
 
+def _dense_hit(r: Dict) -> Dict:
+    hit = {
+        "chunk_id": r["chunk_id"],
+        "dense_score": float(r["score"]),
+        "sparse_score": 0.0
+    }
+    # ingestion sidecar (document_id, text_length, answerable), if indexed
+    if "meta" in r:
+        hit["meta"] = r["meta"]
+    return hit
+
+
 def dense_retrieve_text(query_embedding, vector_store, top_k: int = 40) -> List[Dict]:
     if query_embedding is None:
         return []
 
     results = vector_store.search_text(query_embedding, top_k)
 
-    return [
-        {
-            "chunk_id": r["chunk_id"],
-            "dense_score": float(r["score"]),
-            "sparse_score": 0.0
-        }
-        for r in results
-    ]
+    return [_dense_hit(r) for r in results]
 
 
 def sparse_retrieve(query: str, bm25_index, top_k: int = 40) -> List[Dict]:
@@ -30,3 +35,32 @@ def sparse_retrieve(query: str, bm25_index, top_k: int = 40) -> List[Dict]:
         }
         for r in results
     ]
+
+
+def dense_retrieve_text_batch(query_embeddings, vector_store, top_k: int = 40) -> List[List[Dict]]:
+    if query_embeddings is None or len(query_embeddings) == 0:
+        return []
+
+    batch_results = vector_store.search_text_batch(query_embeddings, top_k)
+
+    return [
+        [_dense_hit(r) for r in results]
+        for results in batch_results
+    ]
+
+
+def sparse_retrieve_batch(queries: List[str], bm25_index, top_k: int = 40) -> List[List[Dict]]:
+
+    batch_results = bm25_index.search_batch(queries, top_k)
+
+    return [
+        [
+            {
+                "chunk_id": r["chunk_id"],
+                "dense_score": 0.0,
+                "sparse_score": float(r["score"])
+            }
+            for r in results
+        ]
+        for results in batch_results
+    ]
@@ -0,0 +1,216 @@
+# chunk_store.py
+import os
+import json
+import mmap
+from datetime import datetime, timezone
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+CHUNK_STORE_PATH = os.getenv("CHUNK_STORE_PATH", "./chunk_store")
+# opt-in: ingestion emits the store and serving reads chunk text from it
+# (bypassing Postgres and its cache invalidation) only when CHUNK_STORE=1
+CHUNK_STORE_ENABLED = os.getenv("CHUNK_STORE", "0") == "1"
+
+TEXTS_FILE = "texts.bin"          # utf-8 clean_text, concatenated
+OFFSETS_FILE = "offsets.npy"      # int64[n + 1], byte offsets into texts.bin
+META_FILE = "meta.npy"            # structured[n], aligned with offsets
+IDS_FILE = "ids.json"             # chunk_ids[n] + document_ids
+MANIFEST_FILE = "manifest.json"   # written LAST: store is complete once it exists
+
+META_DTYPE = np.dtype([
+    ("document", "<i4"),          # index into ids.json "document_ids"
+    ("chunk_index", "<i4"),
+    ("page_number", "<i4"),       # -1 → None
+])
+
+
+class MmapChunkStore:
+    """
+    Read-only, memory-mapped chunk store for database-free serving.
+
+    Layout (one directory, emitted by the offline pipeline):
+    - texts.bin:   every chunk's clean_text, back to back
+    - offsets.npy: row i's text is texts[offsets[i]:offsets[i + 1]]
+    - meta.npy:    document / chunk_index / page_number per row
+    - ids.json:    chunk_id per row; row i == text vector id i
+
+    Same read interface as ChunkRetriever (get_chunk / get_chunks), so
+    validation can resolve evidence with zero network hops.
+    """
+
+    def __init__(self, base_path: str = CHUNK_STORE_PATH):
+        self.base_path = base_path
+
+        with open(os.path.join(base_path, MANIFEST_FILE), "r") as f:
+            self.manifest = json.load(f)
+        with open(os.path.join(base_path, IDS_FILE), "r") as f:
+            ids = json.load(f)
+
+        self.chunk_ids: List[str] = ids["chunk_ids"]
+        self.document_ids: List[str] = ids["document_ids"]
+        self.row_of: Dict[str, int] = {c: i for i, c in enumerate(self.chunk_ids)}
+
+        self.offsets = np.load(os.path.join(base_path, OFFSETS_FILE), mmap_mode="r")
+        self.meta = np.load(os.path.join(base_path, META_FILE), mmap_mode="r")
+
+        if not (len(self.chunk_ids) == len(self.meta) == len(self.offsets) - 1):
+            raise ValueError(f"Corrupt chunk store at {base_path}: row counts differ")
+
+        self._file = open(os.path.join(base_path, TEXTS_FILE), "rb")
+        # mmap of an empty file is not allowed
+        self._texts = (
+            mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            if self.offsets[-1] > 0 else b""
+        )
+        self.created_at = datetime.fromisoformat(self.manifest["created_at"])
+
+        # (document_id, chunk_index) → row, for neighbour-window fetches
+        self.row_at: Dict[Tuple[str, int], int] = {
+            (self.document_ids[int(m["document"])], int(m["chunk_index"])): row
+            for row, m in enumerate(self.meta)
+        }
+
+    @staticmethod
+    def exists(base_path: str = CHUNK_STORE_PATH) -> bool:
+        return os.path.exists(os.path.join(base_path, MANIFEST_FILE))
+
+    # --------------------
+    # READ
+    # --------------------
+    def _record(self, row: int) -> dict:
+        start, end = int(self.offsets[row]), int(self.offsets[row + 1])
+        meta = self.meta[row]
+        page = int(meta["page_number"])
+
+        return {
+            "chunk_id": self.chunk_ids[row],
+            "document_id": self.document_ids[int(meta["document"])],
+            "chunk_index": int(meta["chunk_index"]),
+            "page_number": page if page >= 0 else None,
+            "clean_text": self._texts[start:end].decode("utf-8"),
+            "created_at": self.created_at,
+        }
+
+    def get_by_vector_id(self, vector_id: int) -> dict:
+        """Text vector id → chunk record (rows are aligned with the text index)."""
+        return self._record(int(vector_id))
+
+    def get_chunk(self, chunk_id: str) -> dict:
+        """
+        Raises:
+            ValueError if chunk does not exist
+        """
+        row = self.row_of.get(str(chunk_id))
+        if row is None:
+            raise ValueError(f"Chunk not found: {chunk_id}")
+        return self._record(row)
+
+    def get_chunks(self, chunk_ids: List[str]) -> Tuple[List[dict], List[str]]:
+        """
+        Same contract as ChunkRetriever.get_chunks:
+        (found records in requested order, missing chunk_ids).
+        """
+        ids = list(dict.fromkeys(str(c) for c in chunk_ids))
+
+        chunks, missing = [], []
+        for chunk_id in ids:
+            row = self.row_of.get(chunk_id)
+            if row is None:
+                missing.append(chunk_id)
+            else:
+                chunks.append(self._record(row))
+
+        return chunks, missing
+
+    def get_neighbour_windows(self, windows: List[Tuple[str, int, int]]) -> List[dict]:
+        """
+        Same contract as ChunkRetriever.get_neighbour_windows:
+        records in [lo, hi] per (document_id, lo, hi), by (document_id, chunk_index).
+        """
+        rows = sorted({
+            (str(doc_id), idx)
+            for doc_id, lo, hi in windows
+            for idx in range(lo, hi + 1)
+            if (str(doc_id), idx) in self.row_at
+        })
+        return [self._record(self.row_at[key]) for key in rows]
+
+    def size(self) -> int:
+        return len(self.chunk_ids)
+
+    def close(self):
+        if isinstance(self._texts, mmap.mmap):
+            self._texts.close()
+        self._file.close()
+
+
+# --------------------
+# WRITE (offline)
+# --------------------
+def write_chunk_store(
+    chunks: List[dict],
+    document_id: str,
+    text_id_map: Dict[int, str],
+    base_path: str = CHUNK_STORE_PATH
+) -> int:
+    """
+    Emit the mmap chunk store for `chunks` of one document.
+
+    `text_id_map` is the text VectorStore's id_map (vector id → chunk_id);
+    rows are written in vector-id order so row i matches vector i. Chunks
+    without a text vector are appended after them.
+
+    Each file is written to a temp name and swapped in; the manifest goes
+    last, so readers never see a half-written store.
+    """
+    os.makedirs(base_path, exist_ok=True)
+
+    by_id = {c["chunk_id"]: (idx, c) for idx, c in enumerate(chunks)}
+    ordered = [text_id_map[i] for i in sorted(text_id_map)]
+    with_vector = set(ordered)
+    ordered += [c for c in by_id if c not in with_vector]
+
+    unknown = [c for c in ordered if c not in by_id]
+    if unknown:
+        raise ValueError(f"Vector ids reference unknown chunks: {unknown[:5]}")
+
+    blobs = []
+    offsets = np.zeros(len(ordered) + 1, dtype="<i8")
+    meta = np.zeros(len(ordered), dtype=META_DTYPE)
+
+    for row, chunk_id in enumerate(ordered):
+        # chunk_index matches PostgresStore (position within the document)
+        idx, chunk = by_id[chunk_id]
+        blob = chunk["clean_text"].encode("utf-8")
+        page = (chunk.get("metadata") or {}).get("page_number")
+
+        blobs.append(blob)
+        offsets[row + 1] = offsets[row] + len(blob)
+        meta[row] = (0, idx, page if page is not None else -1)
+
+    def publish(name, write):
+        tmp = os.path.join(base_path, f".{name}.tmp")
+        with open(tmp, "wb") as f:
+            write(f)
+        os.replace(tmp, os.path.join(base_path, name))
+
+    # invalidate the current store first: no manifest → not loadable
+    manifest_path = os.path.join(base_path, MANIFEST_FILE)
+    if os.path.exists(manifest_path):
+        os.remove(manifest_path)
+
+    publish(TEXTS_FILE, lambda f: f.writelines(blobs))
+    publish(OFFSETS_FILE, lambda f: np.save(f, offsets))
+    publish(META_FILE, lambda f: np.save(f, meta))
+    publish(IDS_FILE, lambda f: f.write(json.dumps({
+        "chunk_ids": ordered,
+        "document_ids": [str(document_id)],
+    }).encode("utf-8")))
+    publish(MANIFEST_FILE, lambda f: f.write(json.dumps({
+        "rows": len(ordered),
+        "text_vectors": len(text_id_map),
+        "created_at": datetime.now(timezone.utc).isoformat(),
+    }).encode("utf-8")))
+
+    return len(ordered)
@@ -1,6 +1,6 @@
 # multimodal_vector_store.py
 
-from typing import Dict, List
+from typing import Dict, List, Optional
 import numpy as np
 
 from storage.vector_store import VectorStore
@@ -107,8 +107,8 @@ class MultiModalVectorStore:
     # --------------------
     # ADD
     # --------------------
-    def add_text(self, vector: np.ndarray, chunk_id: str) -> None:
-        self.text_store.add(vector, chunk_id)
+    def add_text(self, vector: np.ndarray, chunk_id: str, meta: Optional[dict] = None) -> None:
+        self.text_store.add(vector, chunk_id, meta)
 
     def add_image(self, vector: np.ndarray, chunk_id: str) -> None:
         self.image_store.add(vector, chunk_id)
@@ -122,6 +122,9 @@ class MultiModalVectorStore:
     def search_text(self, query_vector: np.ndarray, top_k: int = 10) -> List[Dict]:
         return self.text_store.search(query_vector, top_k)
 
+    def search_text_batch(self, query_vectors: np.ndarray, top_k: int = 10) -> List[List[Dict]]:
+        return self.text_store.search_batch(query_vectors, top_k)
+
     def search_image(self, query_vector: np.ndarray, top_k: int = 10) -> List[Dict]:
         return self.image_store.search(query_vector, top_k)
 
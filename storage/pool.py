@@ -0,0 +1,205 @@
+# pool.py
+import os
+import time
+import atexit
+import threading
+from collections import deque
+from contextlib import contextmanager
+
+import psycopg2
+
+POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX_SIZE", 10))
+ACQUIRE_TIMEOUT_SECONDS = float(os.getenv("DB_POOL_ACQUIRE_TIMEOUT", 30))
+HEALTHCHECK_IDLE_SECONDS = 30   # idle longer than this → ping before reuse
+
+# errors that mean "this connection is dead", not "this query is wrong"
+CONNECTION_ERRORS = (psycopg2.OperationalError, psycopg2.InterfaceError)
+
+
+class ConnectionPool:
+    """
+    Bounded, thread-safe pool of psycopg2 connections.
+
+    Guarantees:
+    - At most `max_size` open connections; callers wait (up to
+      `acquire_timeout`) instead of failing when the pool is busy
+    - Connections are opened lazily and kept warm for reuse
+    - Health check on checkout (closed, or idle too long → SELECT 1)
+    - Broken connections are discarded and replaced transparently
+    - Release on exit: commit on success, rollback on error, always returned
+    """
+
+    def __init__(
+        self,
+        db_config,
+        max_size: int = POOL_MAX_SIZE,
+        acquire_timeout: float = ACQUIRE_TIMEOUT_SECONDS
+    ):
+        self.db_config = dict(db_config)
+        self.max_size = max_size
+        self.acquire_timeout = acquire_timeout
+
+        self._idle = deque()          # (conn, last_used)
+        self._size = 0                # idle + checked out
+        self._cond = threading.Condition()
+        self.closed = False
+
+    # --------------------
+    # CHECKOUT / RETURN
+    # --------------------
+    def _acquire(self):
+        deadline = time.monotonic() + self.acquire_timeout
+
+        with self._cond:
+            while True:
+                if self.closed:
+                    raise RuntimeError("Connection pool is closed")
+
+                if self._idle:
+                    conn, last_used = self._idle.pop()   # warmest first
+                    break
+
+                if self._size < self.max_size:
+                    self._size += 1
+                    conn, last_used = None, None
+                    break
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError("Timed out waiting for a database connection")
+                self._cond.wait(remaining)
+
+        # connect / ping outside the lock
+        try:
+            if conn is not None and not self._healthy(conn, last_used):
+                self._close_quietly(conn)
+                conn = None
+
+            if conn is None:
+                conn = psycopg2.connect(**self.db_config)
+                conn.autocommit = False
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+
+        return conn
+
+    def _release(self, conn, broken: bool) -> None:
+        with self._cond:
+            if broken or conn.closed or self.closed:
+                self._size -= 1
+                self._close_quietly(conn)
+            else:
+                self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+
+    @staticmethod
+    def _healthy(conn, last_used) -> bool:
+        if conn.closed:
+            return False
+
+        if time.monotonic() - last_used < HEALTHCHECK_IDLE_SECONDS:
+            return True
+
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    @staticmethod
+    def _close_quietly(conn) -> None:
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    # --------------------
+    # PUBLIC API
+    # --------------------
+    @contextmanager
+    def connection(self):
+        """
+        with pool.connection() as conn:
+            ...   # one transaction; committed on exit, rolled back on error
+        """
+        conn = self._acquire()
+        broken = False
+
+        try:
+            yield conn
+            conn.commit()
+        except Exception as e:
+            broken = isinstance(e, CONNECTION_ERRORS) or conn.closed
+            if not broken:
+                try:
+                    conn.rollback()
+                except psycopg2.Error:
+                    broken = True
+            raise
+        finally:
+            self._release(conn, broken)
+
+    def run(self, fn, retries: int = 1):
+        """
+        Run an IDEMPOTENT read `fn(conn)`; if the connection dies mid-call,
+        reconnect and retry up to `retries` times.
+        """
+        for attempt in range(retries + 1):
+            try:
+                with self.connection() as conn:
+                    return fn(conn)
+            except CONNECTION_ERRORS:
+                if attempt == retries:
+                    raise
+
+    def close(self) -> None:
+        with self._cond:
+            self.closed = True
+            while self._idle:
+                conn, _ = self._idle.pop()
+                self._size -= 1
+                self._close_quietly(conn)
+            self._cond.notify_all()
+
+
+# --------------------
+# PROCESS-WIDE REGISTRY
+# --------------------
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(db_config) -> ConnectionPool:
+    """
+    Shared pool per (process, db_config): every store in a process draws
+    from the same bounded set of connections. Keyed by pid so forked
+    workers never reuse a parent's sockets.
+    """
+    key = (os.getpid(), tuple(sorted(db_config.items())))
+
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None or pool.closed:
+            pool = _pools[key] = ConnectionPool(db_config)
+        return pool
+
+
+def close_pools() -> None:
+    """
+    Shutdown hook: close this process's shared pools. Holders of a
+    shared pool never close it themselves (others may still use it).
+    """
+    pid = os.getpid()
+    with _pools_lock:
+        keys = [key for key in _pools if key[0] == pid]
+        pools = [_pools.pop(key) for key in keys]
+    for pool in pools:
+        pool.close()
+
+
+atexit.register(close_pools)
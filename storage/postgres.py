@@ -1,15 +1,18 @@
 # postgres.py
-import psycopg2
 import uuid
 import hashlib
+from typing import Optional
 from psycopg2.extras import execute_batch
 from psycopg2.extras import RealDictCursor
 
+from storage.pool import ConnectionPool, get_pool
+from retrieval.chunk_cache import INVALIDATION_CHANNEL, invalidate_document
+
 
 class PostgresStore:
-    def __init__(self, db_config):
-        self.conn = psycopg2.connect(**db_config)
-        self.conn.autocommit = False  # IMPORTANT
+    def __init__(self, db_config, pool: Optional[ConnectionPool] = None):
+        # shared bounded pool; every call is its own transaction (IMPORTANT)
+        self.pool = pool or get_pool(db_config)
 
     # ----------------------------
     # DOCUMENT + CHUNKS (ATOMIC)
@@ -22,64 +25,127 @@ class PostgresStore:
         chunks,
         version=1
     ):
+        # atomic: committed on exit, rolled back on any error
+        with self.pool.connection() as conn:
+            with conn.cursor() as cur:
+                return self._insert(
+                    cur, source_path, source_type, checksum, chunks, version
+                )
+
+    @staticmethod
+    def _insert(cur, source_path, source_type, checksum, chunks, version):
         document_id = uuid.uuid4()
 
-        try:
-            with self.conn.cursor() as cur:
-                # insert document
+        # insert document
+        cur.execute("""
+            INSERT INTO documents (
+                document_id, source_path, source_type, checksum, version
+            )
+            VALUES (%s, %s, %s, %s, %s)
+        """, (
+            str(document_id),
+            source_path,
+            source_type,
+            checksum,
+            version
+        ))
+
+        # prepare chunk rows
+        rows = []
+        for idx, chunk in enumerate(chunks):
+            # chunk_id = uuid.uuid4()
+            chunk_id = chunk["chunk_id"]
+            chunk_hash = hashlib.sha256(
+                chunk["clean_text"].encode("utf-8")
+            ).hexdigest()
+
+            rows.append((
+                str(chunk_id),
+                str(document_id),
+                idx,
+                chunk["raw_text"],
+                chunk["clean_text"],
+                chunk_hash
+            ))
+
+        execute_batch(
+            cur,
+            """
+            INSERT INTO chunks (
+                chunk_id,
+                document_id,
+                chunk_index,
+                raw_text,
+                clean_text,
+                chunk_hash
+            )
+            VALUES (%s, %s, %s, %s, %s, %s)
+            """,
+            rows
+        )
+
+        return document_id
+
+    # ----------------------------
+    # REPLACE / DELETE (+ CACHE INVALIDATION)
+    # ----------------------------
+    @staticmethod
+    def _notify_invalidation(cur, document_ids):
+        # delivered to LISTENers only if the transaction commits
+        for document_id in document_ids:
+            cur.execute(
+                "SELECT pg_notify(%s, %s)",
+                (INVALIDATION_CHANNEL, str(document_id))
+            )
+
+    def delete_document(self, document_id):
+        """
+        Delete a document (chunks cascade) and drop its chunks from
+        every chunk cache: this process directly, others via NOTIFY.
+        """
+        with self.pool.connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    "DELETE FROM documents WHERE document_id = %s",
+                    (str(document_id),)
+                )
+                self._notify_invalidation(cur, [document_id])
+
+        invalidate_document(document_id)
+
+    def replace_document(
+        self,
+        source_path,
+        source_type,
+        checksum,
+        chunks
+    ):
+        """
+        Re-ingest a source in ONE transaction: previous versions of
+        `source_path` are deleted and the new one is inserted at
+        version max + 1. Cached chunks of the old versions are invalidated.
+        """
+        with self.pool.connection() as conn:
+            with conn.cursor() as cur:
                 cur.execute("""
-                    INSERT INTO documents (
-                        document_id, source_path, source_type, checksum, version
-                    )
-                    VALUES (%s, %s, %s, %s, %s)
-                """, (
-                    str(document_id),
-                    source_path,
-                    source_type,
-                    checksum,
-                    version
-                ))
-
-                # prepare chunk rows
-                rows = []
-                for idx, chunk in enumerate(chunks):
-                    # chunk_id = uuid.uuid4()
-                    chunk_id = chunk["chunk_id"]
-                    chunk_hash = hashlib.sha256(
-                        chunk["clean_text"].encode("utf-8")
-                    ).hexdigest()
-
-                    rows.append((
-                        str(chunk_id),
-                        str(document_id),
-                        idx,
-                        chunk["raw_text"],
-                        chunk["clean_text"],
-                        chunk_hash
-                    ))
-
-                execute_batch(
-                    cur,
-                    """
-                    INSERT INTO chunks (
-                        chunk_id,
-                        document_id,
-                        chunk_index,
-                        raw_text,
-                        clean_text,
-                        chunk_hash
-                    )
-                    VALUES (%s, %s, %s, %s, %s, %s)
-                    """,
-                    rows
+                    DELETE FROM documents
+                    WHERE source_path = %s
+                    RETURNING document_id, version
+                """, (source_path,))
+                old = cur.fetchall()
+
+                version = max((v for _, v in old), default=0) + 1
+                old_ids = [str(d) for d, _ in old]
+
+                document_id = self._insert(
+                    cur, source_path, source_type, checksum, chunks, version
                 )
+                self._notify_invalidation(cur, old_ids)
 
-            self.conn.commit()
-            return document_id
+        for old_id in old_ids:
+            invalidate_document(old_id)
 
-        except Exception:
-            self.conn.rollback()
-            raise
+        return document_id
 
     def fetch_all_chunks(self):
         """
@@ -92,17 +158,17 @@ class PostgresStore:
             }
         ]
         """
-        try:
-            with self.conn.cursor(cursor_factory=RealDictCursor) as cur:
+        def fetch(conn):
+            with conn.cursor(cursor_factory=RealDictCursor) as cur:
                 cur.execute("""
                     SELECT
                         chunk_id,
                         clean_text
                     FROM chunks
                 """)
-                rows = cur.fetchall()
-        finally:
-            self.conn.close()
+                return cur.fetchall()
+
+        rows = self.pool.run(fetch)
 
         if not rows:
             raise ValueError("No chunks found in database")
@@ -116,4 +182,6 @@ class PostgresStore:
         ]
 
     def close(self):
-        self.conn.close()
+        # the pool is shared (get_pool) or the caller's: closed by
+        # storage.pool.close_pools at exit, never per holder
+        pass
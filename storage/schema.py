@@ -48,6 +48,12 @@ def run_schema():
             ON chunks(chunk_hash);
         """)
 
+        # neighbour-window range fetches: chunk_index BETWEEN lo AND hi
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_chunks_document_chunk_index
+            ON chunks(document_id, chunk_index);
+        """)
+
         conn.commit()
         print("✅ Schema created successfully")
     except Exception as e:
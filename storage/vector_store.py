@@ -3,7 +3,7 @@ import os
 import json
 import faiss
 import numpy as np
-from typing import List, Dict
+from typing import List, Dict, Optional
 
 # class VectorStore:
 #     """
@@ -109,6 +109,8 @@ class VectorStore:
     - Dimensional consistency enforced
     - Safe disk loading
     - Defensive normalization
+    - Optional per-vector sidecar (document_id, text_length, answerable)
+      returned with search hits, so callers can plan before fetching text
     """
 
     def __init__(self, dim: int, base_path: str = "./vector_store"):
@@ -118,6 +120,7 @@ class VectorStore:
 
         self.index_path = os.path.join(base_path, "vectors.index")
         self.id_map_path = os.path.join(base_path, "id_map.json")
+        self.sidecar_path = os.path.join(base_path, "sidecar.json")
 
         if os.path.exists(self.index_path):
             self.index = faiss.read_index(self.index_path)
@@ -134,9 +137,17 @@ class VectorStore:
                 self.id_map = {int(k): v for k, v in raw_map.items()}
             else:
                 self.id_map = {}
+
+            if os.path.exists(self.sidecar_path):
+                with open(self.sidecar_path, "r") as f:
+                    raw_sidecar = json.load(f)
+                self.sidecar = {int(k): v for k, v in raw_sidecar.items()}
+            else:
+                self.sidecar = {}
         else:
             self.index = faiss.IndexFlatIP(self.dim)
             self.id_map: Dict[int, str] = {}
+            self.sidecar: Dict[int, dict] = {}
 
     # --------------------
     # RESET (re-ingestion)
@@ -148,13 +159,17 @@ class VectorStore:
         if os.path.exists(self.id_map_path):
             os.remove(self.id_map_path)
 
+        if os.path.exists(self.sidecar_path):
+            os.remove(self.sidecar_path)
+
         self.index = faiss.IndexFlatIP(self.dim)
         self.id_map = {}
+        self.sidecar = {}
 
     # --------------------
     # ADD VECTOR
     # --------------------
-    def add(self, vector: np.ndarray, chunk_id: str) -> None:
+    def add(self, vector: np.ndarray, chunk_id: str, meta: Optional[dict] = None) -> None:
         if vector.ndim != 1:
             raise ValueError("Vector must be 1D")
 
@@ -171,10 +186,22 @@ class VectorStore:
         idx = self.index.ntotal
         self.index.add(vector)
         self.id_map[idx] = chunk_id
+        if meta is not None:
+            self.sidecar[idx] = meta
 
     # --------------------
     # SEARCH
     # --------------------
+    def _hit(self, idx, chunk_id: str, score) -> Dict:
+        hit = {
+            "chunk_id": chunk_id,
+            "score": float(score)
+        }
+        meta = self.sidecar.get(int(idx))
+        if meta is not None:
+            hit["meta"] = meta
+        return hit
+
     def search(self, query_vector: np.ndarray, top_k: int = 10) -> List[Dict]:
         if self.index.ntotal == 0:
             return []
@@ -197,14 +224,45 @@ class VectorStore:
             if chunk_id is None:
                 continue
 
-            results.append({
-                "chunk_id": chunk_id,
-                "score": float(score)
-            })
+            results.append(self._hit(idx, chunk_id, score))
         # print(f"✅✅ SUCCESSFULLY SEARCHED DENSE EMBEDDINGS: {len(results)}")
 
         return results
 
+    def search_batch(self, query_vectors: np.ndarray, top_k: int = 10) -> List[List[Dict]]:
+        """
+        Search many query vectors in ONE FAISS call.
+        Returns one result list per query row, same shape as `search`.
+        """
+        if query_vectors.ndim != 2:
+            raise ValueError("Query vectors must be 2D")
+
+        if self.index.ntotal == 0 or query_vectors.shape[0] == 0:
+            return [[] for _ in range(query_vectors.shape[0])]
+
+        # a copy: normalize_L2 works in place and callers reuse their embeddings
+        query_vectors = np.array(query_vectors, dtype="float32", copy=True)
+
+        # 🔒 NORMALIZATION (COSINE SAFETY)
+        faiss.normalize_L2(query_vectors)
+
+        scores, indices = self.index.search(query_vectors, top_k)
+
+        batch_results = []
+        for row_indices, row_scores in zip(indices, scores):
+            results = []
+            for idx, score in zip(row_indices, row_scores):
+                if idx == -1:
+                    continue
+                chunk_id = self.id_map.get(int(idx))
+                if chunk_id is None:
+                    continue
+
+                results.append(self._hit(idx, chunk_id, score))
+            batch_results.append(results)
+
+        return batch_results
+
     # --------------------
     # PERSISTENCE
     # --------------------
@@ -212,6 +270,8 @@ class VectorStore:
         faiss.write_index(self.index, self.index_path)
         with open(self.id_map_path, "w") as f:
             json.dump(self.id_map, f)
+        with open(self.sidecar_path, "w") as f:
+            json.dump(self.sidecar, f)
 
     def size(self) -> int:
         return self.index.ntotal
\ No newline at end of file
@@ -0,0 +1,5 @@
+# tests/conftest.py
+import os
+
+# agents.answer builds the Gemini client at import; the tests never call it
+os.environ.setdefault("GOOGLE_API_KEY", "test-key")
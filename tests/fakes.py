@@ -0,0 +1,84 @@
+# tests/fakes.py
+import time
+import asyncio
+from typing import Dict, List, Tuple
+
+
+class InMemoryChunkRetriever:
+    """
+    Stand-in for AsyncChunkRetriever without a database: same awaited
+    interface over a list of chunk records. `latency` simulates a round
+    trip per call, so overlap between concurrent queries is observable.
+    """
+
+    def __init__(self, records: List[dict], latency: float = 0.0):
+        self.latency = latency
+        self.records: Dict[str, dict] = {str(r["chunk_id"]): dict(r) for r in records}
+        self.calls = 0
+
+    async def _round_trip(self):
+        self.calls += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+    async def get_chunk(self, chunk_id: str) -> dict:
+        chunks, _ = await self.get_chunks([chunk_id])
+        if not chunks:
+            raise ValueError(f"Chunk not found: {chunk_id}")
+        return chunks[0]
+
+    async def get_chunks(self, chunk_ids: List[str]) -> Tuple[List[dict], List[str]]:
+        await self._round_trip()
+        ids = list(dict.fromkeys(str(c) for c in chunk_ids))
+        chunks = [dict(self.records[i]) for i in ids if i in self.records]
+        missing = [i for i in ids if i not in self.records]
+        return chunks, missing
+
+    async def get_neighbour_windows(self, windows: List[Tuple[str, int, int]]) -> List[dict]:
+        await self._round_trip()
+        found = [
+            dict(r) for r in self.records.values()
+            if any(
+                str(r["document_id"]) == str(doc_id) and lo <= r["chunk_index"] <= hi
+                for doc_id, lo, hi in windows
+            )
+        ]
+        return sorted(found, key=lambda r: (str(r["document_id"]), r["chunk_index"]))
+
+    async def close(self):
+        pass
+
+
+class _Reply:
+    def __init__(self, content: str):
+        self.content = content
+
+
+class FakeLLM:
+    """
+    Stand-in for the chat model: returns `replies` in order (the last one
+    repeats) and records every message list it was sent. An Exception
+    instance as a reply is raised instead.
+    """
+
+    def __init__(self, *replies, latency: float = 0.0):
+        self.replies = list(replies)
+        self.latency = latency
+        self.calls: List[list] = []
+
+    def _next(self, messages):
+        self.calls.append(messages)
+        reply = self.replies.pop(0) if len(self.replies) > 1 else self.replies[0]
+        if isinstance(reply, Exception):
+            raise reply
+        return _Reply(reply)
+
+    def invoke(self, messages, config=None):
+        if self.latency:
+            time.sleep(self.latency)
+        return self._next(messages)
+
+    async def ainvoke(self, messages, config=None):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return self._next(messages)
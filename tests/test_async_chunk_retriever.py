@@ -0,0 +1,171 @@
+# tests/test_async_chunk_retriever.py
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+
+import retrieval.async_chunk_retriever as async_chunk_retriever
+from agents.state import initial_state
+from agents.validate import MIN_FINAL_SCORE, validate_node, validate_node_async
+from retrieval.async_chunk_retriever import AsyncChunkRetriever
+from fakes import InMemoryChunkRetriever
+
+TEXT = "a chunk long enough to count as answerable evidence"
+
+
+def _record(document_id, chunk_index):
+    return {
+        "chunk_id": f"{document_id}-{chunk_index}",
+        "document_id": document_id,
+        "chunk_index": chunk_index,
+        "clean_text": f"{TEXT} ({document_id}/{chunk_index})",
+    }
+
+
+RECORDS = [_record("d", i) for i in range(5)] + [_record("e", 0)]
+
+
+def _state(*scored):
+    return {
+        **initial_state("what is x?"),
+        "retrieved_chunks": [{"chunk_id": c, "final_score": s} for c, s in scored],
+    }
+
+
+class SyncChunks:
+    """Blocking view of an InMemoryChunkRetriever (validate_node's interface)."""
+
+    def __init__(self, chunks: InMemoryChunkRetriever):
+        self.chunks = chunks
+
+    def get_chunks(self, chunk_ids):
+        return asyncio.run(self.chunks.get_chunks(chunk_ids))
+
+    def get_neighbour_windows(self, windows):
+        return asyncio.run(self.chunks.get_neighbour_windows(windows))
+
+
+# --------------------
+# validate_node_async
+# --------------------
+def test_only_strong_candidates_are_fetched_in_one_round_trip():
+    chunks = InMemoryChunkRetriever(RECORDS)
+    state = _state(("d-1", 0.9), ("e-0", MIN_FINAL_SCORE), ("d-2", MIN_FINAL_SCORE - 0.01))
+
+    result = asyncio.run(validate_node_async(state, chunk_retriever=chunks, context_window=0))
+
+    assert chunks.calls == 1
+    assert result["validation_status"] == "pass"
+    assert [c["chunk_id"] for c in result["final_chunks"]] == ["d-1", "e-0"]
+    assert result["final_chunks"][0]["text"] == RECORDS[1]["clean_text"]
+    assert result["missing_chunk_ids"] == []
+
+
+def test_missing_chunks_are_reported_and_skipped():
+    chunks = InMemoryChunkRetriever(RECORDS)
+    state = _state(("d-1", 0.9), ("gone", 0.8))
+
+    result = asyncio.run(validate_node_async(state, chunk_retriever=chunks, context_window=0))
+
+    assert result["missing_chunk_ids"] == ["gone"]
+    assert [c["chunk_id"] for c in result["final_chunks"]] == ["d-1"]
+
+
+def test_no_strong_candidate_refuses():
+    chunks = InMemoryChunkRetriever(RECORDS)
+    result = asyncio.run(validate_node_async(_state(("d-1", 0.1)), chunk_retriever=chunks, context_window=0))
+
+    assert result["validation_status"] == "refuse"
+    assert result["final_chunks"] == []
+
+
+def test_neighbour_windows_are_fetched_for_passed_states_only():
+    chunks = InMemoryChunkRetriever(RECORDS)
+    result = asyncio.run(validate_node_async(_state(("d-2", 0.9)), chunk_retriever=chunks, context_window=1))
+
+    assert chunks.calls == 2   # chunks, then one range fetch
+    assert "(d/1)" in result["final_chunks"][0]["text"]
+    assert "(d/3)" in result["final_chunks"][0]["text"]
+
+    refused = InMemoryChunkRetriever(RECORDS)
+    asyncio.run(validate_node_async(_state(("d-2", 0.1)), chunk_retriever=refused, context_window=1))
+    assert refused.calls == 1
+
+
+@pytest.mark.parametrize("window", [0, 1])
+def test_same_decisions_as_validate_node(window):
+    state = _state(("d-1", 0.9), ("d-3", 0.7), ("gone", 0.8), ("e-0", 0.2))
+
+    awaited = asyncio.run(validate_node_async(state, InMemoryChunkRetriever(RECORDS), window))
+    blocking = validate_node(state, SyncChunks(InMemoryChunkRetriever(RECORDS)), window)
+
+    for key in ("validation_status", "final_chunks", "missing_chunk_ids", "context_tokens"):
+        assert awaited[key] == blocking[key]
+
+
+def test_concurrent_lookups_overlap():
+    chunks = InMemoryChunkRetriever(RECORDS, latency=0.2)
+
+    async def main():
+        states = [_state((f"d-{i}", 0.9)) for i in range(4)]
+        return await asyncio.gather(*(validate_node_async(s, chunks, 0) for s in states))
+
+    started = time.perf_counter()
+    results = asyncio.run(main())
+
+    assert all(r["validation_status"] == "pass" for r in results)
+    assert time.perf_counter() - started < 0.6   # serial would be 0.8s
+
+
+# --------------------
+# AsyncChunkRetriever pool lifecycle (no database: fake driver)
+# --------------------
+class FakePool:
+    def __init__(self):
+        self.closed = False
+
+    async def fetch(self, sql, *args):
+        return []
+
+    async def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def pools(monkeypatch):
+    created = []
+
+    async def create_pool(**kwargs):
+        created.append(FakePool())
+        return created[-1]
+
+    monkeypatch.setattr(async_chunk_retriever, "asyncpg", SimpleNamespace(create_pool=create_pool))
+    return created
+
+
+def test_one_pool_per_loop_closed_when_asyncio_run_returns(pools):
+    retriever = AsyncChunkRetriever(db_config={})
+
+    async def lookup():
+        await asyncio.gather(*(retriever.get_chunks([f"c{i}"]) for i in range(3)))
+
+    asyncio.run(lookup())
+    asyncio.run(lookup())
+
+    assert len(pools) == 2   # one per loop, concurrent first calls share it
+    assert all(p.closed for p in pools)
+    assert retriever._pools == {} and retriever._pool_locks == {} and retriever._closers == {}
+
+
+def test_close_releases_the_running_loops_pool(pools):
+    retriever = AsyncChunkRetriever(db_config={})
+
+    async def main():
+        await retriever.get_chunks(["c1"])
+        await retriever.close()
+        assert pools[0].closed and retriever._pools == {}
+        await retriever.get_chunks(["c2"])   # reopened on demand
+
+    asyncio.run(main())
+    assert len(pools) == 2 and pools[1].closed
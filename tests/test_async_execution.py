@@ -0,0 +1,75 @@
+# tests/test_async_execution.py
+import asyncio
+import json
+import threading
+import time
+
+import agents.intent
+from agents.intent import intent_check_node, intent_check_node_async
+from agents.state import initial_state
+from graph.workflow import _node
+from fakes import FakeLLM
+
+INTENT_REPLY = json.dumps({"intent": "factual", "confidence": 0.9, "reason": "r"})
+
+
+def _thread_name(state):
+    return {**state, "thread": threading.current_thread().name}
+
+
+# --------------------
+# node dispatch
+# --------------------
+def test_invoke_runs_the_sync_function_on_the_caller():
+    state = _node(_thread_name).invoke({})
+    assert state["thread"] == threading.current_thread().name
+
+
+def test_blocking_node_is_offloaded_under_ainvoke():
+    state = asyncio.run(_node(_thread_name).ainvoke({}))
+    assert state["thread"].startswith("retrieval")
+
+
+def test_non_blocking_node_runs_inline_under_ainvoke():
+    state = asyncio.run(_node(_thread_name, blocking=False).ainvoke({}))
+    assert state["thread"] == threading.current_thread().name
+
+
+def test_native_async_function_is_used_under_ainvoke():
+    async def native(state):
+        return {**state, "path": "async"}
+
+    node = _node(lambda state: {**state, "path": "sync"}, native)
+
+    assert node.invoke({})["path"] == "sync"
+    assert asyncio.run(node.ainvoke({}))["path"] == "async"
+
+
+# --------------------
+# async LLM nodes
+# --------------------
+def test_async_intent_matches_sync(monkeypatch):
+    monkeypatch.setattr(agents.intent, "get_llm", lambda: FakeLLM(INTENT_REPLY))
+
+    sync = intent_check_node(initial_state("what is bm25?"))
+    async_ = asyncio.run(intent_check_node_async(initial_state("what is bm25?")))
+
+    for key in ("intent", "intent_confidence", "intent_reason", "llm_calls"):
+        assert async_[key] == sync[key]
+
+
+def test_concurrent_async_intent_calls_overlap(monkeypatch):
+    latency, queries = 0.2, 5
+    monkeypatch.setattr(agents.intent, "get_llm", lambda: FakeLLM(INTENT_REPLY, latency=latency))
+
+    async def run_all():
+        return await asyncio.gather(*(
+            intent_check_node_async(initial_state(f"query {i}")) for i in range(queries)
+        ))
+
+    start = time.monotonic()
+    states = asyncio.run(run_all())
+    elapsed = time.monotonic() - start
+
+    assert [s["intent"] for s in states] == ["factual"] * queries
+    assert elapsed < latency * queries / 2
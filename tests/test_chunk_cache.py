@@ -0,0 +1,97 @@
+# tests/test_chunk_cache.py
+from retrieval.chunk_cache import ChunkCache, RECORD_OVERHEAD_BYTES, invalidate_document
+
+
+def _record(chunk_id, document_id="d1", text="some chunk text"):
+    return {"chunk_id": chunk_id, "document_id": document_id, "clean_text": text}
+
+
+def test_hits_and_misses():
+    cache = ChunkCache()
+    cache.put_many([_record("c1"), _record("c2")])
+
+    found, missing = cache.get_many(["c1", "c2", "c3"])
+
+    assert set(found) == {"c1", "c2"}
+    assert missing == ["c3"]
+    assert cache.stats()["hits"] == 2
+    assert cache.stats()["misses"] == 1
+
+
+def test_returned_records_are_copies():
+    cache = ChunkCache()
+    cache.put(_record("c1"))
+    cache.get("c1")["clean_text"] = "mutated"
+    assert cache.get("c1")["clean_text"] == "some chunk text"
+
+
+def test_fill_started_before_an_invalidation_is_dropped():
+    cache = ChunkCache()
+    generation = cache.generation        # read before the DB fetch
+
+    cache.invalidate_document("d1")      # document replaced meanwhile
+    cache.put_many([_record("c1")], generation=generation)
+
+    assert cache.get("c1") is None
+
+
+def test_fill_with_current_generation_is_kept():
+    cache = ChunkCache()
+    cache.put_many([_record("c1")], generation=cache.generation)
+    assert cache.get("c1") is not None
+
+
+def test_invalidate_document_drops_only_its_chunks():
+    cache = ChunkCache()
+    cache.put_many([_record("c1", "d1"), _record("c2", "d1"), _record("c3", "d2")])
+    before = cache.generation
+
+    cache.invalidate_document("d1")
+
+    found, missing = cache.get_many(["c1", "c2", "c3"])
+    assert set(found) == {"c3"}
+    assert sorted(missing) == ["c1", "c2"]
+    assert cache.generation == before + 1
+    assert cache.stats()["invalidations"] == 1
+
+
+def test_invalidate_chunks_and_clear_bump_the_generation():
+    cache = ChunkCache()
+    cache.put_many([_record("c1"), _record("c2")])
+    generation = cache.generation
+
+    cache.invalidate(["c1"])
+    assert cache.get("c1") is None and cache.get("c2") is not None
+    assert cache.generation == generation + 1
+    assert cache.stats()["invalidations"] == 1
+
+    cache.clear()
+    assert cache.stats()["entries"] == 0
+    assert cache.generation == generation + 2
+
+
+def test_process_wide_invalidation_reaches_every_cache():
+    first, second = ChunkCache(), ChunkCache()
+    first.put(_record("c1", "doc-x"))
+    second.put(_record("c1", "doc-x"))
+
+    invalidate_document("doc-x")
+
+    assert first.get("c1") is None
+    assert second.get("c1") is None
+
+
+def test_lru_eviction_by_entries_and_bytes():
+    cache = ChunkCache(max_entries=2)
+    cache.put_many([_record("c1"), _record("c2")])
+    cache.get("c1")                      # c2 is now least recently used
+    cache.put(_record("c3"))
+    assert cache.get("c2") is None
+    assert cache.get("c1") is not None and cache.get("c3") is not None
+
+    size = len("x" * 100) + RECORD_OVERHEAD_BYTES
+    cache = ChunkCache(max_bytes=2 * size)
+    cache.put_many([_record(f"c{i}", text="x" * 100) for i in range(3)])
+    assert cache.stats()["entries"] == 2
+    assert cache.stats()["bytes"] <= 2 * size
+    assert cache.stats()["evictions"] == 1
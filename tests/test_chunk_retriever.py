@@ -0,0 +1,115 @@
+# tests/test_chunk_retriever.py
+from agents.validate import validate_batch
+from retrieval.chunk_cache import ChunkCache
+from retrieval.chunk_retriever import ChunkRetriever
+
+
+def _row(chunk_id, document_id="d1", chunk_index=0):
+    return {
+        "chunk_id": chunk_id,
+        "document_id": document_id,
+        "chunk_index": chunk_index,
+        "page_number": 1,
+        "clean_text": f"answerable evidence text for chunk {chunk_id}",
+        "created_at": None,
+    }
+
+
+class _Cursor:
+    def __init__(self, pool):
+        self.pool = pool
+        self.result = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params):
+        self.pool.queries.append(list(params[0]))
+        # database order, not request order
+        self.result = [self.pool.rows[i] for i in reversed(params[0]) if i in self.pool.rows]
+
+    def fetchall(self):
+        return self.result
+
+
+class _Conn:
+    def __init__(self, pool):
+        self.pool = pool
+
+    def cursor(self, cursor_factory=None):
+        return _Cursor(self.pool)
+
+
+class FakePool:
+    """ConnectionPool stand-in: `run(fn)` against rows keyed by chunk_id."""
+
+    def __init__(self, rows):
+        self.rows = {r["chunk_id"]: r for r in rows}
+        self.queries = []
+
+    def run(self, fn, retries: int = 1):
+        return fn(_Conn(self))
+
+
+def _retriever(*rows):
+    pool = FakePool(rows)
+    return ChunkRetriever(db_config={}, pool=pool, cache=ChunkCache()), pool
+
+
+# --------------------
+# get_chunks
+# --------------------
+def test_one_query_returns_requested_order_and_missing_ids():
+    retriever, pool = _retriever(_row("c1"), _row("c2"), _row("c3"))
+
+    chunks, missing = retriever.get_chunks(["c3", "gone", "c1", "c3"])
+
+    assert [c["chunk_id"] for c in chunks] == ["c3", "c1"]
+    assert missing == ["gone"]
+    assert pool.queries == [["c3", "gone", "c1"]]
+
+
+def test_cached_chunks_are_not_queried_again():
+    retriever, pool = _retriever(_row("c1"), _row("c2"))
+    retriever.get_chunks(["c1"])
+
+    chunks, missing = retriever.get_chunks(["c1", "c2"])
+
+    assert [c["chunk_id"] for c in chunks] == ["c1", "c2"]
+    assert missing == []
+    assert pool.queries == [["c1"], ["c2"]]
+
+
+def test_no_ids_no_query():
+    retriever, pool = _retriever(_row("c1"))
+    assert retriever.get_chunks([]) == ([], [])
+    assert pool.queries == []
+
+
+# --------------------
+# validate_batch
+# --------------------
+def _state(*chunk_ids):
+    return {
+        "retrieved_chunks": [{"chunk_id": c, "final_score": 0.9} for c in chunk_ids],
+        "deadline_at": None,
+        "degraded": [],
+    }
+
+
+def test_batch_validation_fetches_shared_chunks_once():
+    retriever, pool = _retriever(_row("c1"), _row("c2"), _row("c3"))
+
+    states = validate_batch(
+        [_state("c1", "c2"), _state("c2", "c3", "gone")], retriever, context_window=0
+    )
+
+    assert len(pool.queries) == 1
+    assert sorted(pool.queries[0]) == ["c1", "c2", "c3", "gone"]
+    assert [c["chunk_id"] for c in states[0]["final_chunks"]] == ["c1", "c2"]
+    assert {c["chunk_id"] for c in states[1]["final_chunks"]} == {"c2", "c3"}
+    assert states[0]["missing_chunk_ids"] == []
+    assert states[1]["missing_chunk_ids"] == ["gone"]
@@ -0,0 +1,79 @@
+# tests/test_chunk_store.py
+import pytest
+
+from storage.chunk_store import MmapChunkStore, write_chunk_store
+
+
+def _chunk(chunk_id, text, page=None):
+    return {"chunk_id": chunk_id, "clean_text": text, "metadata": {"page_number": page}}
+
+
+CHUNKS = [
+    _chunk("c0", "first chunk", page=1),
+    _chunk("c1", "zweiter Abschnitt — ünïcödé ✓", page=2),
+    _chunk("c2", "third chunk, no page"),
+]
+
+
+@pytest.fixture
+def store(tmp_path):
+    # vector 0 → c1, vector 1 → c0; c2 has no text vector
+    write_chunk_store(CHUNKS, "doc-1", {0: "c1", 1: "c0"}, base_path=str(tmp_path))
+    store = MmapChunkStore(str(tmp_path))
+    yield store
+    store.close()
+
+
+def test_round_trip_records(store):
+    record = store.get_chunk("c1")
+
+    assert record["clean_text"] == "zweiter Abschnitt — ünïcödé ✓"
+    assert record["document_id"] == "doc-1"
+    assert record["chunk_index"] == 1
+    assert record["page_number"] == 2
+    assert store.get_chunk("c2")["page_number"] is None
+    assert store.size() == 3
+
+
+def test_rows_follow_vector_ids(store):
+    assert store.get_by_vector_id(0)["chunk_id"] == "c1"
+    assert store.get_by_vector_id(1)["chunk_id"] == "c0"
+    assert store.get_by_vector_id(2)["chunk_id"] == "c2"
+
+
+def test_get_chunks_matches_the_retriever_contract(store):
+    chunks, missing = store.get_chunks(["c2", "gone", "c0", "c2"])
+
+    assert [c["chunk_id"] for c in chunks] == ["c2", "c0"]
+    assert missing == ["gone"]
+    with pytest.raises(ValueError):
+        store.get_chunk("gone")
+
+
+def test_neighbour_windows(store):
+    records = store.get_neighbour_windows([("doc-1", 1, 5), ("other", 0, 1)])
+    assert [r["chunk_index"] for r in records] == [1, 2]
+
+
+def test_unknown_vector_chunk_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        write_chunk_store(CHUNKS, "doc-1", {0: "missing"}, base_path=str(tmp_path))
+    assert not MmapChunkStore.exists(str(tmp_path))
+
+
+def test_rewrite_replaces_the_store(tmp_path, store):
+    write_chunk_store([_chunk("n0", "new text")], "doc-2", {0: "n0"}, base_path=str(tmp_path))
+    fresh = MmapChunkStore(str(tmp_path))
+
+    assert fresh.size() == 1
+    assert fresh.get_chunk("n0")["document_id"] == "doc-2"
+    assert fresh.get_chunks(["c0"]) == ([], ["c0"])
+    fresh.close()
+
+
+def test_empty_texts(tmp_path):
+    write_chunk_store([_chunk("e0", "")], "doc-1", {0: "e0"}, base_path=str(tmp_path))
+    store = MmapChunkStore(str(tmp_path))
+
+    assert store.get_chunk("e0")["clean_text"] == ""
+    store.close()
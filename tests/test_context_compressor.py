@@ -0,0 +1,96 @@
+# tests/test_context_compressor.py
+import numpy as np
+
+from agents.compress import compress_context_node
+from agents.state import initial_state
+from retrieval.context_compressor import GAP_MARKER, ContextCompressor, SentenceEmbeddingCache, split_sentences
+from retrieval.context_packer import token_counter
+
+TOPICS = ["cat", "dog", "bird"]
+QUERY = np.array([1.0, 0.0, 0.0])   # about cats
+
+
+class TopicCache(SentenceEmbeddingCache):
+    """Sentence embedding = topic word counts (no model)."""
+
+    def get_many(self, sentences):
+        vectors = np.array([[s.lower().count(t) for t in TOPICS] for s in sentences], dtype=np.float32)
+        return vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+
+
+def _chunk(chunk_id, text):
+    return {"chunk_id": chunk_id, "document_id": "d1", "text": text, "final_score": 0.8}
+
+
+def _compressor(budget):
+    return ContextCompressor(token_budget=budget, cache=TopicCache())
+
+
+def test_split_sentences():
+    assert split_sentences("One. Two!  Three?\nFour") == ["One.", "Two!", "Three?", "Four"]
+    assert split_sentences("") == []
+
+
+def test_keeps_the_closest_sentences_in_order_with_gap_markers():
+    chunk = _chunk("c1", "A cat sleeps. A dog barks. A bird sings. The cat purrs.")
+
+    compressed, report = _compressor(budget=0).compress(QUERY, [chunk])
+
+    # budget 0: only the best sentence of the chunk
+    assert compressed[0]["text"] == "A cat sleeps."
+    assert report["sentences_total"] == 4 and report["sentences_kept"] == 1
+
+    roomy = sum(token_counter.count(s) for s in ("A cat sleeps.", "The cat purrs."))
+    compressed, _ = _compressor(budget=roomy).compress(QUERY, [chunk])
+    assert compressed[0]["text"] == f"A cat sleeps.{GAP_MARKER}The cat purrs."
+
+
+def test_every_chunk_keeps_its_best_sentence():
+    chunks = [_chunk("c1", "The cat naps. The cat eats."), _chunk("c2", "A dog runs. A bird flies.")]
+
+    compressed, _ = _compressor(budget=0).compress(QUERY, chunks)
+
+    assert [c["chunk_id"] for c in compressed] == ["c1", "c2"]
+    assert all(c["text"] for c in compressed)
+    assert compressed[1]["text"] in ("A dog runs.", "A bird flies.")
+
+
+def test_fields_other_than_text_are_untouched():
+    chunk = {**_chunk("c1", "A cat sleeps. A dog barks."), "chunk_index": 3, "meta": {"x": 1}}
+
+    compressed, report = _compressor(budget=0).compress(QUERY, [chunk])
+
+    assert {k: v for k, v in compressed[0].items() if k != "text"} == {k: v for k, v in chunk.items() if k != "text"}
+    assert report["tokens_after"] <= report["tokens_before"]
+
+
+def test_chunk_that_fits_whole_is_returned_as_is():
+    chunk = _chunk("c1", "A cat sleeps. The cat purrs.")
+    compressed, _ = _compressor(budget=10_000).compress(QUERY, [chunk])
+    assert compressed[0] is chunk
+
+
+# --------------------
+# node
+# --------------------
+def _validated(**overrides):
+    return {
+        **initial_state("cats?"),
+        "validation_status": "pass",
+        "query_embedding": QUERY,
+        "final_chunks": [_chunk("c1", "A cat sleeps. A dog barks. A bird sings.")],
+        **overrides,
+    }
+
+
+def test_node_compresses_and_reports():
+    state = compress_context_node(_validated(), compressor=_compressor(budget=0))
+
+    assert state["final_chunks"][0]["text"] == "A cat sleeps."
+    assert state["context_tokens"] == state["compression"]["tokens_after"]
+    assert state["compression"]["sentences_kept"] == 1
+
+
+def test_node_leaves_refused_states_alone():
+    refused = _validated(validation_status="refuse")
+    assert compress_context_node(refused, compressor=_compressor(budget=0)) is refused
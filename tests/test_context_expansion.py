@@ -0,0 +1,93 @@
+# tests/test_context_expansion.py
+from retrieval.context_expansion import expand_chunks, plan_windows, stitch, strip_overlap
+
+
+def _chunk(document_id, chunk_index, text="x", score=0.5):
+    return {
+        "chunk_id": f"{document_id}-{chunk_index}",
+        "document_id": document_id,
+        "chunk_index": chunk_index,
+        "text": text,
+        "final_score": score,
+    }
+
+
+def _record(document_id, chunk_index, clean_text):
+    return {
+        "chunk_id": f"{document_id}-{chunk_index}",
+        "document_id": document_id,
+        "chunk_index": chunk_index,
+        "clean_text": clean_text,
+    }
+
+
+# --------------------
+# plan_windows
+# --------------------
+def test_window_around_each_chunk_clamped_at_zero():
+    assert plan_windows([_chunk("d", 0), _chunk("e", 10)], window=2) == [("d", 0, 2), ("e", 8, 12)]
+
+
+def test_overlapping_and_adjacent_windows_merge_per_document():
+    chunks = [_chunk("d", 10), _chunk("d", 3), _chunk("d", 6), _chunk("e", 4)]
+    assert plan_windows(chunks, window=1) == [("d", 2, 7), ("d", 9, 11), ("e", 3, 5)]
+
+
+def test_chunks_without_index_are_not_planned():
+    chunk = _chunk("d", 1)
+    chunk["chunk_index"] = None
+    assert plan_windows([chunk], window=1) == []
+
+
+# --------------------
+# stitch
+# --------------------
+OVERLAP = "the overlapping tail of the first chunk"
+
+
+def test_strip_overlap_removes_the_shared_prefix():
+    rest, matched = strip_overlap(f"Start. {OVERLAP}", f"{OVERLAP} and the rest.")
+    assert matched
+    assert rest == " and the rest."
+
+
+def test_strip_overlap_ignores_short_coincidences():
+    rest, matched = strip_overlap("ends with the", "the next chunk")
+    assert not matched
+    assert rest == "the next chunk"
+
+
+def test_stitch_consecutive_chunks_without_duplicating_overlap():
+    records = [
+        _record("d", 1, f"Start. {OVERLAP}"),
+        _record("d", 2, f"{OVERLAP} middle section, mid-wo"),
+        _record("d", 3, "middle section, mid-word continues here"),
+    ]
+    assert stitch(records) == f"Start. {OVERLAP} middle section, mid-word continues here"
+
+
+def test_stitch_gap_or_no_overlap_joins_with_a_space():
+    records = [_record("d", 1, "first part"), _record("d", 2, "second part"), _record("d", 5, "later")]
+    assert stitch(records) == "first part second part later"
+
+
+# --------------------
+# expand_chunks
+# --------------------
+def test_expand_replaces_chunks_with_their_window():
+    selected = [_chunk("d", 2, "two", score=0.4), _chunk("d", 3, "three", score=0.9)]
+    records = [_record("d", i, t) for i, t in [(1, "one"), (2, "two"), (3, "three"), (4, "four")]]
+
+    expanded = expand_chunks(selected, records, window=1, budget=1_000)
+
+    assert len(expanded) == 1
+    assert expanded[0]["text"] == "one two three four"
+    assert expanded[0]["chunk_id"] == "d-3"              # best-scored chunk represents the window
+    assert expanded[0]["window"] == [1, 4]
+
+
+def test_expand_keeps_chunks_when_window_exceeds_budget():
+    selected = [_chunk("d", 2, "two")]
+    records = [_record("d", i, "long neighbour text") for i in (1, 3)] + [_record("d", 2, "two")]
+
+    assert expand_chunks(selected, records, window=1, budget=10) == selected
@@ -0,0 +1,69 @@
+# tests/test_context_packer.py
+from itertools import combinations
+
+import pytest
+
+from retrieval.context_packer import pack
+
+
+def _candidates(specs):
+    # (document_id, tokens, score) per candidate, in rank order
+    return [
+        {"chunk_id": str(i), "document_id": doc, "tokens": tokens, "final_score": score}
+        for i, (doc, tokens, score) in enumerate(specs)
+    ]
+
+
+def _pack(candidates, budget, max_per_doc=10):
+    return pack(candidates, budget, max_per_doc, tokens=lambda c: c["tokens"])
+
+
+def _best_score(candidates, budget):
+    best = 0.0
+    for r in range(len(candidates) + 1):
+        for subset in combinations(candidates, r):
+            if sum(c["tokens"] for c in subset) <= budget:
+                best = max(best, sum(c["final_score"] for c in subset))
+    return best
+
+
+def test_everything_fits_keeps_rank_order():
+    candidates = _candidates([("a", 10, 0.9), ("b", 20, 0.8), ("c", 30, 0.7)])
+    assert _pack(candidates, budget=100) == [0, 1, 2]
+
+
+def test_smaller_lower_ranked_chunk_is_not_lost():
+    # greedy by rank would take the 80-token chunk and stop
+    candidates = _candidates([("a", 80, 0.9), ("b", 50, 0.6), ("c", 50, 0.6)])
+    assert _pack(candidates, budget=100) == [1, 2]
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_matches_brute_force(seed):
+    import random
+    rng = random.Random(seed)
+    candidates = _candidates([
+        (f"d{i}", rng.randint(1, 40), round(rng.random(), 3)) for i in range(8)
+    ])
+    budget = rng.randint(20, 120)
+
+    chosen = _pack(candidates, budget)
+
+    assert chosen == sorted(chosen)
+    assert sum(candidates[i]["tokens"] for i in chosen) <= budget
+    assert sum(candidates[i]["final_score"] for i in chosen) == pytest.approx(_best_score(candidates, budget))
+
+
+def test_per_document_cap_applies_in_rank_order():
+    candidates = _candidates([("a", 10, 0.5), ("a", 10, 0.9), ("a", 10, 0.9), ("b", 10, 0.1)])
+    assert _pack(candidates, budget=100, max_per_doc=2) == [0, 1, 3]
+
+
+def test_oversized_candidate_is_skipped():
+    candidates = _candidates([("a", 200, 1.0), ("b", 30, 0.2)])
+    assert _pack(candidates, budget=100) == [1]
+
+
+def test_nothing_eligible():
+    assert _pack([], budget=100) == []
+    assert _pack(_candidates([("a", 200, 1.0)]), budget=100) == []
@@ -0,0 +1,62 @@
+# tests/test_deadline.py
+import agents.deadline as deadline
+from agents.deadline import LatencyTracker, _hedge_delay, _streaming
+from graph.streaming import STREAM_CONFIG
+
+
+def _warm_tracker(monkeypatch, seconds=0.5):
+    tracker = LatencyTracker(min_samples=3)
+    for _ in range(3):
+        tracker.observe(seconds)
+    monkeypatch.setattr(deadline, "answer_latency", tracker)
+    return tracker
+
+
+def test_streaming_is_flagged_by_the_stream_config():
+    assert _streaming(STREAM_CONFIG)
+    assert not _streaming(None)
+    assert not _streaming({"configurable": {"thread_id": "1"}})
+
+
+def test_no_hedge_while_streaming(monkeypatch):
+    _warm_tracker(monkeypatch)
+    assert _hedge_delay(True, timeout=10, config=None) == 0.5
+    assert _hedge_delay(True, timeout=10, config=STREAM_CONFIG) is None
+
+
+def test_no_hedge_when_disabled_cold_or_past_the_deadline(monkeypatch):
+    monkeypatch.setattr(deadline, "answer_latency", LatencyTracker(min_samples=3))
+    assert _hedge_delay(True, timeout=10) is None       # latency estimate not warm yet
+
+    _warm_tracker(monkeypatch)
+    assert _hedge_delay(False, timeout=10) is None
+    assert _hedge_delay(True, timeout=0.4) is None
+
+
+def test_hedge_counter():
+    tracker = LatencyTracker()
+    tracker.record_hedge()
+    tracker.record_hedge()
+    assert tracker.hedged == 2
+
+
+def test_deadline_is_off_by_default():
+    assert deadline.deadline_after(0) is None
+    assert not deadline.budget_below({"deadline_at": None}, deadline.LOCAL_INTENT_BELOW_SECONDS)
+
+
+def test_degradation_thresholds_are_seconds_left():
+    state = {"deadline_at": deadline.deadline_after(12)}
+    assert deadline.budget_below(state, deadline.SKIP_REWRITE_BELOW_SECONDS)
+    assert not deadline.budget_below(state, deadline.SKIP_RERANK_BELOW_SECONDS)
+    assert deadline.context_budget(state) == deadline.MAX_CONTEXT_TOKENS
+
+
+def test_sync_call_without_deadline_runs_inline():
+    import threading
+
+    class LLM:
+        def invoke(self, messages, config=None):
+            return threading.current_thread()
+
+    assert deadline.invoke_llm(LLM(), [], {"deadline_at": None}) is threading.current_thread()
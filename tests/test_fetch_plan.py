@@ -0,0 +1,62 @@
+# tests/test_fetch_plan.py
+import random
+
+import pytest
+
+from agents.validate import MIN_FINAL_SCORE, evidence_sidecar, plan_fetch, select_evidence
+
+
+def _corpus(seed, n=14):
+    """Retrieved candidates (with ingestion sidecars) + their chunk records."""
+    rng = random.Random(seed)
+    retrieved, records = [], {}
+
+    for i in range(n):
+        chunk_id, document_id = f"c{i}", f"d{rng.randrange(3)}"
+        # some too short to answer from, most big enough to overflow the budget together
+        text = "short" if rng.random() < 0.15 else " ".join(["evidence"] * rng.randrange(20, 300))
+        records[chunk_id] = {"chunk_id": chunk_id, "document_id": document_id, "clean_text": text}
+        retrieved.append({
+            "chunk_id": chunk_id,
+            "final_score": round(rng.uniform(0.3, 1.0), 3),
+            "meta": evidence_sidecar(document_id, text),
+        })
+
+    retrieved.sort(key=lambda c: c["final_score"], reverse=True)
+    state = {"retrieved_chunks": retrieved, "deadline_at": None, "degraded": []}
+    return state, records
+
+
+def _final_ids(state, records):
+    return [c["chunk_id"] for c in select_evidence(state, records)["final_chunks"]]
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_plan_is_exactly_the_evidence_select_evidence_keeps(seed):
+    state, records = _corpus(seed)
+    assert plan_fetch(state) == _final_ids(state, records)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_fetching_only_the_plan_gives_the_same_evidence(seed):
+    state, records = _corpus(seed)
+    planned = {chunk_id: records[chunk_id] for chunk_id in plan_fetch(state)}
+
+    assert _final_ids(state, planned) == _final_ids(state, records)
+
+
+def test_plan_skips_weak_and_unanswerable_candidates():
+    state, _ = _corpus(0)
+    planned = set(plan_fetch(state))
+
+    for c in state["retrieved_chunks"]:
+        if c["final_score"] < MIN_FINAL_SCORE or not c["meta"]["answerable"]:
+            assert c["chunk_id"] not in planned
+
+
+def test_without_sidecars_every_strong_candidate_is_fetched():
+    state, _ = _corpus(0)
+    state["retrieved_chunks"][0] = {**state["retrieved_chunks"][0], "meta": None}
+
+    strong = [c["chunk_id"] for c in state["retrieved_chunks"] if c["final_score"] >= MIN_FINAL_SCORE]
+    assert plan_fetch(state) == strong
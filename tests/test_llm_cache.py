@@ -0,0 +1,88 @@
+# tests/test_llm_cache.py
+import itertools
+import types
+
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration
+
+import utils.llm_cache
+from utils.llm_cache import DiskLLMCache
+
+LLM = "model=gemini temperature=0"
+
+
+def _generation(text):
+    return [ChatGeneration(message=AIMessage(content=text))]
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    # strictly increasing last_used, so LRU order never ties
+    ticks = itertools.count(1)
+    monkeypatch.setattr(utils.llm_cache, "time", types.SimpleNamespace(time=lambda: float(next(ticks))))
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "llm_cache.sqlite")
+
+
+def test_miss_then_hit_round_trip(path):
+    cache = DiskLLMCache(path)
+
+    assert cache.lookup("prompt", LLM) is None
+    cache.update("prompt", LLM, _generation("answer"))
+    hit = cache.lookup("prompt", LLM)
+
+    assert hit[0].message.content == "answer"
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_key_includes_the_model_params(path):
+    cache = DiskLLMCache(path)
+    cache.update("prompt", LLM, _generation("answer"))
+
+    assert cache.lookup("prompt", "model=gemini temperature=0.7") is None
+
+
+def test_entries_survive_a_new_instance(path):
+    DiskLLMCache(path).update("prompt", LLM, _generation("answer"))
+    assert DiskLLMCache(path).lookup("prompt", LLM)[0].message.content == "answer"
+
+
+def test_least_recently_used_entries_are_evicted(path, clock):
+    cache = DiskLLMCache(path, max_entries=3)
+    for i in range(3):
+        cache.update(f"p{i}", LLM, _generation(str(i)))
+    cache.lookup("p0", LLM)                     # p1 is now the oldest
+
+    cache.update("p3", LLM, _generation("3"))
+
+    assert cache.lookup("p1", LLM) is None
+    assert all(cache.lookup(p, LLM) is not None for p in ("p0", "p2", "p3"))
+    assert cache.stats()["evictions"] == 1
+
+
+def test_byte_limit_evicts(path, clock):
+    cache = DiskLLMCache(path, max_bytes=1)
+    cache.update("p0", LLM, _generation("0"))
+
+    assert cache.stats()["entries"] == 0
+
+
+def test_clear(path):
+    cache = DiskLLMCache(path)
+    cache.update("prompt", LLM, _generation("answer"))
+    cache.clear()
+    assert cache.stats()["entries"] == 0
+
+
+def test_chat_model_serves_repeated_prompts_from_the_cache(path):
+    model = FakeListChatModel(responses=["first", "second"], cache=DiskLLMCache(path))
+
+    assert model.invoke("same prompt").content == "first"
+    assert model.invoke("same prompt").content == "first"
+    assert model.invoke("other prompt").content == "second"
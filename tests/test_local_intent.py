@@ -0,0 +1,166 @@
+# tests/test_local_intent.py
+import json
+import sys
+import time
+import types
+import zlib
+
+import numpy as np
+import pytest
+
+import agents.intent
+from agents.local_intent import (
+    LABELS,
+    LOCAL_INTENT_REASON,
+    LocalIntentClassifier,
+    classify_locally,
+    load_intent_decisions,
+    local_intent_node,
+    train_from_log,
+)
+from agents.state import initial_state
+from fakes import FakeLLM
+
+DIM = 16
+KEYWORDS = {"what": "factual", "why": "analytical", "then": "multi_hop", "dream": "unanswerable"}
+
+
+def _embed(queries):
+    """Label-keyword direction + per-query noise: separable, not identical."""
+    out = []
+    for q in queries:
+        rng = np.random.default_rng(zlib.crc32(q.encode()))
+        v = rng.normal(scale=0.1, size=DIM)
+        for word, label in KEYWORDS.items():
+            if word in q:
+                v[LABELS.index(label)] += 1.0
+        out.append(v)
+    return np.array(out, dtype=np.float32)
+
+
+@pytest.fixture(autouse=True)
+def embedder(monkeypatch):
+    # the BGE module loads a model on import; queries here embed with _embed
+    monkeypatch.setitem(sys.modules, "indexes.dense_embeddings", types.SimpleNamespace(embed_texts=_embed))
+
+
+def _queries(label, n):
+    word = next(w for w, l in KEYWORDS.items() if l == label)
+    return [f"{word} question {i}" for i in range(n)]
+
+
+def _trained(threshold=0.5):
+    queries = [q for label in LABELS for q in _queries(label, 10)]
+    labels = [label for label in LABELS for _ in range(10)]
+    return LocalIntentClassifier(threshold=threshold).fit(_embed(queries), labels)
+
+
+# --------------------
+# classifier
+# --------------------
+def test_fit_then_predict_unseen_queries():
+    clf = _trained()
+
+    for word, label in KEYWORDS.items():
+        predicted, p = clf.predict(_embed([f"{word} unseen query"])[0])
+        assert predicted == label
+        assert p > 1 / len(LABELS)
+
+
+def test_probabilities_sum_to_one():
+    P = _trained().predict_proba(_embed(["what x", "why y"]))
+    assert P.shape == (2, len(LABELS))
+    assert np.allclose(P.sum(axis=1), 1.0)
+
+
+def test_save_load_round_trip(tmp_path):
+    clf = _trained()
+    path = str(tmp_path / "intent.npz")
+    clf.save(path)
+
+    loaded = LocalIntentClassifier.load(path, threshold=0.9)
+
+    x = _embed(["why it works"])
+    assert np.allclose(loaded.predict_proba(x), clf.predict_proba(x))
+    assert loaded.labels == clf.labels
+    assert loaded.threshold == 0.9
+
+
+# --------------------
+# nodes
+# --------------------
+def test_confident_prediction_skips_the_llm(monkeypatch):
+    llm = FakeLLM("unused")
+    monkeypatch.setattr(agents.intent, "get_llm", lambda: llm)
+
+    state = local_intent_node(initial_state("why is it slow"), classifier=_trained(threshold=0.0))
+
+    assert state["intent"] == "analytical"
+    assert state["intent_reason"] == LOCAL_INTENT_REASON
+    assert llm.calls == []
+    assert state["llm_calls"] == 0
+
+
+def test_below_threshold_escalates_to_the_llm(monkeypatch):
+    llm = FakeLLM(json.dumps({"intent": "factual", "confidence": 0.9, "reason": "llm"}))
+    monkeypatch.setattr(agents.intent, "get_llm", lambda: llm)
+
+    state = local_intent_node(initial_state("why is it slow"), classifier=_trained(threshold=1.01))
+
+    assert state["intent"] == "factual"
+    assert state["intent_reason"] == "llm"
+    assert len(llm.calls) == 1
+
+
+def test_low_budget_accepts_an_unconfident_prediction():
+    state = initial_state("why is it slow", deadline_at=time.monotonic() + 5)
+
+    classified = classify_locally(state, _trained(threshold=1.01))
+
+    assert classified["intent"] == "analytical"
+    assert classified["degraded"] == ["local_intent"]
+
+
+# --------------------
+# training
+# --------------------
+def _write_log(path, records):
+    with open(path, "w", encoding="utf-8") as f:
+        for r in records:
+            f.write(json.dumps({"ts": 0, **r}) + "\n")
+
+
+def test_decision_log_keeps_the_latest_confident_label(tmp_path):
+    path = str(tmp_path / "decisions.jsonl")
+    _write_log(path, [
+        {"query": "q1", "intent": "factual", "confidence": 0.9},
+        {"query": " q1 ", "intent": "analytical", "confidence": 0.95},
+        {"query": "q2", "intent": "factual", "confidence": 0.3},
+        {"query": "q3", "intent": "unknown", "confidence": 1.0},
+    ])
+
+    assert load_intent_decisions(path) == (["q1"], ["analytical"])
+
+
+def test_train_from_log(tmp_path):
+    log_path, model_path = str(tmp_path / "decisions.jsonl"), str(tmp_path / "intent.npz")
+    _write_log(log_path, [
+        {"query": q, "intent": label, "confidence": 0.9}
+        for label in LABELS for q in _queries(label, 8)
+    ])
+
+    clf = train_from_log(log_path, model_path)
+
+    assert LocalIntentClassifier.exists(model_path)
+    assert clf.predict(_embed(["then the next step"])[0])[0] == "multi_hop"
+    assert clf.predict(_embed(["dream tonight"])[0])[0] == "unanswerable"
+
+
+def test_train_from_log_needs_a_log(tmp_path):
+    with pytest.raises(ValueError):
+        train_from_log("", str(tmp_path / "intent.npz"))
+
+    path = str(tmp_path / "decisions.jsonl")
+    _write_log(path, [{"query": "q", "intent": "factual", "confidence": 0.9}])
+    with pytest.raises(ValueError):
+        train_from_log(path, str(tmp_path / "intent.npz"))
@@ -0,0 +1,84 @@
+# tests/test_multi_hop.py
+from agents.multi_hop import MAX_SUB_QUESTIONS, _merge_evidence, _sub_questions
+from agents.validate import MAX_CHUNKS_PER_DOC
+from retrieval.context_packer import token_counter
+
+BIG = 10_000
+
+
+def _chunk(chunk_id, document_id="d1", text=None):
+    return {
+        "chunk_id": chunk_id,
+        "document_id": document_id,
+        "text": text or f"evidence text for chunk {chunk_id}",
+        "final_score": 0.9,
+    }
+
+
+def _hop(question, *chunks):
+    return {"final_query": question, "final_chunks": list(chunks)}
+
+
+# --------------------
+# sub-questions
+# --------------------
+def test_sub_questions_are_stripped_deduplicated_and_capped():
+    rewrites = [" a? ", "b?", "a?", "", None] + [f"q{i}?" for i in range(10)]
+    sub_questions = _sub_questions({"rewrite_candidates": rewrites, "user_query": "x"})
+
+    assert sub_questions[:2] == ["a?", "b?"]
+    assert len(sub_questions) == MAX_SUB_QUESTIONS
+
+
+def test_no_usable_sub_question_falls_back_to_the_query():
+    assert _sub_questions({"rewrite_candidates": ["", "  "], "user_query": "x?"}) == ["x?"]
+
+
+# --------------------
+# evidence merge
+# --------------------
+def test_round_robin_gives_every_hop_evidence():
+    hops = [
+        _hop("a?", _chunk("a1", "da"), _chunk("a2", "da"), _chunk("a3", "da")),
+        _hop("b?", _chunk("b1", "db")),
+    ]
+
+    merged = _merge_evidence(hops, BIG)
+
+    assert [c["chunk_id"] for c in merged] == ["a1", "b1", "a2", "a3"]
+    assert [c["sub_question"] for c in merged] == ["a?", "b?", "a?", "a?"]
+
+
+def test_chunks_shared_by_hops_appear_once():
+    hops = [_hop("a?", _chunk("s"), _chunk("a1")), _hop("b?", _chunk("s"), _chunk("b1"))]
+
+    merged = _merge_evidence(hops, BIG)
+
+    assert [c["chunk_id"] for c in merged] == ["s", "a1", "b1"]
+    assert merged[0]["sub_question"] == "a?"
+
+
+def test_per_document_cap_applies_across_hops():
+    hops = [
+        _hop("a?", *[_chunk(f"a{i}", "same") for i in range(MAX_CHUNKS_PER_DOC)]),
+        _hop("b?", _chunk("b0", "same"), _chunk("b1", "other")),
+    ]
+
+    merged = _merge_evidence(hops, BIG)
+
+    assert sum(c["document_id"] == "same" for c in merged) == MAX_CHUNKS_PER_DOC
+    assert "b1" in {c["chunk_id"] for c in merged}
+
+
+def test_budget_skips_a_big_chunk_but_keeps_smaller_ones():
+    small, big = _chunk("small", "d1"), _chunk("big", "d2", text="long " * 400)
+    later = _chunk("later", "d3")
+    budget = sum(token_counter.count(c["text"], c["chunk_id"]) for c in (small, later))
+
+    merged = _merge_evidence([_hop("a?", small, later), _hop("b?", big)], budget)
+
+    assert [c["chunk_id"] for c in merged] == ["small", "later"]
+
+
+def test_hops_without_evidence_merge_to_nothing():
+    assert _merge_evidence([_hop("a?"), _hop("b?")], BIG) == []
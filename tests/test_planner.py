@@ -0,0 +1,137 @@
+# tests/test_planner.py
+import asyncio
+import json
+
+import pytest
+
+import agents.intent
+import agents.planner
+import agents.rewrite
+from agents.planner import planner_node, planner_node_async
+from agents.rewrite import REWRITE_RISK, _parse_rewrite
+from agents.state import initial_state
+from fakes import FakeLLM
+
+
+def _use_llm(monkeypatch, llm):
+    for module in (agents.planner, agents.intent, agents.rewrite):
+        monkeypatch.setattr(module, "get_llm", lambda: llm)
+    return llm
+
+
+def _plan(intent, **rewrites):
+    return json.dumps({"intent": intent, "confidence": 0.9, "reason": "r", **rewrites})
+
+
+# --------------------
+# rewrite parsing
+# --------------------
+def test_parse_rewrite_per_intent():
+    factual, risk = _parse_rewrite("factual", '{"expanded_query": "bm25 ranking"}')
+    assert factual == ["bm25 ranking"]
+    assert risk == REWRITE_RISK["factual"]
+
+    analytical, _ = _parse_rewrite("analytical", '{"expanded_query": "q", "hyde": "h"}')
+    assert analytical == ["q", "h"]
+
+    multi_hop, _ = _parse_rewrite("multi_hop", '{"sub_questions": ["a?", "b?"]}')
+    assert multi_hop == ["a?", "b?"]
+
+
+def test_parse_rewrite_returns_a_copy_of_the_risk_table():
+    _, risk = _parse_rewrite("factual", '{"expanded_query": "q"}')
+    risk["precision_risk"] = 1.0
+    assert REWRITE_RISK["factual"]["precision_risk"] == 0.0
+
+
+def test_parse_rewrite_without_rewrites_for_the_intent():
+    no_risk = {"precision_risk": 0.0, "recall_boost": 0.0}
+    assert _parse_rewrite("unanswerable", '{"expanded_query": "q"}') == ([], no_risk)
+    assert _parse_rewrite("factual", None) == ([], no_risk)
+
+
+@pytest.mark.parametrize("intent, content", [
+    ("factual", "not json"),
+    ("factual", '{"hyde": "h"}'),
+    ("analytical", '{"expanded_query": "q"}'),
+    ("multi_hop", '{"expanded_query": "q"}'),
+])
+def test_parse_rewrite_raises_on_malformed_output(intent, content):
+    with pytest.raises(Exception):
+        _parse_rewrite(intent, content)
+
+
+# --------------------
+# fused planner
+# --------------------
+def test_valid_plan_takes_one_llm_call(monkeypatch):
+    llm = _use_llm(monkeypatch, FakeLLM(_plan("analytical", expanded_query="q+", hyde="h")))
+
+    state = planner_node(initial_state("why is bm25 fast?"))
+
+    assert len(llm.calls) == 1
+    assert state["llm_calls"] == 1
+    assert state["intent"] == "analytical"
+    assert state["intent_confidence"] == 0.9
+    assert state["rewrite_candidates"] == ["q+", "h"]
+    assert state["rewrite_risk"] == REWRITE_RISK["analytical"]
+
+
+def test_unanswerable_plan_has_no_rewrites(monkeypatch):
+    llm = _use_llm(monkeypatch, FakeLLM(_plan("unanswerable")))
+
+    state = planner_node(initial_state("what will I dream tonight?"))
+
+    assert len(llm.calls) == 1
+    assert state["intent"] == "unanswerable"
+    assert state["rewrite_candidates"] == []
+
+
+@pytest.mark.parametrize("first_reply", [
+    "not json at all",                        # unparseable
+    _plan("chit_chat"),                       # invalid label
+    _plan("analytical", expanded_query="q"),  # rewrites missing for the label
+    RuntimeError("provider error"),           # call failed
+])
+def test_unusable_plan_falls_back_to_intent_then_rewrite(monkeypatch, first_reply):
+    llm = _use_llm(monkeypatch, FakeLLM(
+        first_reply,
+        json.dumps({"intent": "analytical", "confidence": 0.8, "reason": "r"}),
+        json.dumps({"expanded_query": "q2", "hyde": "h2"}),
+    ))
+
+    state = planner_node(initial_state("why is bm25 fast?"))
+
+    assert len(llm.calls) == 3
+    assert state["llm_calls"] == 3
+    assert state["intent"] == "analytical"
+    assert state["intent_confidence"] == 0.8
+    assert state["rewrite_candidates"] == ["q2", "h2"]
+
+
+def test_fallback_skips_the_rewrite_call_without_a_rewrite_prompt(monkeypatch):
+    llm = _use_llm(monkeypatch, FakeLLM(
+        "not json",
+        json.dumps({"intent": "unanswerable", "confidence": 0.9, "reason": "r"}),
+    ))
+
+    state = planner_node(initial_state("what will I dream tonight?"))
+
+    assert len(llm.calls) == 2
+    assert state["llm_calls"] == 2
+    assert state["rewrite_candidates"] == []
+
+
+@pytest.mark.parametrize("replies", [
+    (_plan("multi_hop", sub_questions=["a?", "b?"]),),
+    ("not json", _plan("factual"), json.dumps({"expanded_query": "q"})),
+])
+def test_async_planner_matches_sync(monkeypatch, replies):
+    _use_llm(monkeypatch, FakeLLM(*replies))
+    sync = planner_node(initial_state("q"))
+
+    _use_llm(monkeypatch, FakeLLM(*replies))
+    async_ = asyncio.run(planner_node_async(initial_state("q")))
+
+    for key in ("intent", "intent_confidence", "rewrite_candidates", "rewrite_risk", "llm_calls"):
+        assert async_[key] == sync[key]
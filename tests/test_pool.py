@@ -0,0 +1,131 @@
+# tests/test_pool.py
+import threading
+
+import psycopg2
+import pytest
+
+import storage.pool
+from storage.pool import ConnectionPool, close_pools, get_pool
+
+
+class FakeConnection:
+    def __init__(self):
+        self.closed = 0
+        self.autocommit = True
+        self.commits = 0
+        self.rollbacks = 0
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+    def close(self):
+        self.closed = 1
+
+
+@pytest.fixture
+def connections(monkeypatch):
+    opened = []
+
+    def connect(**kwargs):
+        opened.append(FakeConnection())
+        return opened[-1]
+
+    monkeypatch.setattr(storage.pool.psycopg2, "connect", connect)
+    return opened
+
+
+def test_connections_are_reused(connections):
+    pool = ConnectionPool({}, max_size=2)
+
+    with pool.connection() as first:
+        pass
+    with pool.connection() as second:
+        pass
+
+    assert first is second
+    assert len(connections) == 1
+    assert first.commits == 2
+
+
+def test_error_rolls_back_and_keeps_the_connection(connections):
+    pool = ConnectionPool({})
+
+    with pytest.raises(ValueError):
+        with pool.connection():
+            raise ValueError("bad query")
+
+    assert connections[0].rollbacks == 1
+    assert not connections[0].closed
+    with pool.connection() as conn:
+        assert conn is connections[0]
+
+
+def test_busy_pool_times_out_instead_of_opening_more(connections):
+    pool = ConnectionPool({}, max_size=1, acquire_timeout=0.05)
+
+    with pool.connection():
+        with pytest.raises(TimeoutError):
+            with pool.connection():
+                pass
+
+    assert len(connections) == 1
+
+
+def test_waiter_gets_the_released_connection(connections):
+    pool = ConnectionPool({}, max_size=1, acquire_timeout=5)
+    got = []
+    held = pool._acquire()
+
+    waiter = threading.Thread(target=lambda: got.append(pool.run(lambda conn: conn)))
+    waiter.start()
+    pool._release(held, broken=False)
+    waiter.join(timeout=5)
+
+    assert got == [held]
+    assert len(connections) == 1
+
+
+def test_run_retries_on_a_dead_connection(connections):
+    pool = ConnectionPool({})
+    calls = []
+
+    def read(conn):
+        calls.append(conn)
+        if len(calls) == 1:
+            conn.closed = 2
+            raise psycopg2.OperationalError("server closed the connection")
+        return "rows"
+
+    assert pool.run(read) == "rows"
+    assert calls[0] is not calls[1]
+    assert calls[0].closed
+    assert pool._size == 1
+
+
+def test_closed_pool_refuses_checkouts(connections):
+    pool = ConnectionPool({})
+    with pool.connection():
+        pass
+
+    pool.close()
+
+    assert connections[0].closed
+    with pytest.raises(RuntimeError):
+        with pool.connection():
+            pass
+
+
+def test_shared_pool_per_config(connections):
+    config = {"dbname": "rag", "host": "localhost"}
+    shared = get_pool(config)
+
+    assert get_pool(dict(reversed(list(config.items())))) is shared
+    assert get_pool({"dbname": "other"}) is not shared
+
+    close_pools()
+    assert shared.closed
+    assert get_pool(config) is not shared
+    close_pools()
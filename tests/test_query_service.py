@@ -0,0 +1,145 @@
+# tests/test_query_service.py
+import asyncio
+
+import pytest
+
+import graph.service as service
+import utils.response_cache as response_cache
+from agents.state import _INITIAL_STATE, initial_state
+from graph.service import QueryService
+from graph.workflow import build_query_graph
+from utils.response_cache import ResponseCache
+
+
+class FakeWorkflow:
+    """Compiled-graph stand-in: answers every query, records its input states."""
+
+    def __init__(self):
+        self.states = []
+
+    def _answer(self, state):
+        self.states.append(state)
+        return {**state, "final_response": f"answer to {state['user_query']}", "answer_citations": ["c1"]}
+
+    def invoke(self, state, config=None):
+        return self._answer(state)
+
+    async def ainvoke(self, state, config=None):
+        return self._answer(state)
+
+
+@pytest.fixture
+def builds(monkeypatch):
+    compiled = []
+
+    def build(**kwargs):
+        compiled.append(FakeWorkflow())
+        return compiled[-1]
+
+    monkeypatch.setattr(service, "build_query_graph", build)
+    monkeypatch.setattr(response_cache, "current_index_version", lambda: "v1")
+    return compiled
+
+
+def _service(**kwargs):
+    return QueryService(vector_store=None, bm25_store=None, chunk_retriever=None, **kwargs)
+
+
+# --------------------
+# compiled once
+# --------------------
+def test_graph_is_compiled_once_per_service(builds):
+    svc = _service()
+    for q in ("a?", "b?", "c?"):
+        svc.run(q)
+    asyncio.run(svc.arun("d?"))
+
+    assert len(builds) == 1
+    assert [s["user_query"] for s in builds[0].states] == ["a?", "b?", "c?", "d?"]
+
+
+def test_every_request_gets_a_fresh_state(builds):
+    svc = _service()
+    svc.run("a?")
+    svc.run("b?")
+
+    first, second = builds[0].states
+    assert first["request_id"] != second["request_id"]
+    for key in ("degraded", "retrieved_chunks", "final_chunks", "answer_citations"):
+        assert first[key] is not second[key]
+        assert first[key] is not _INITIAL_STATE[key]
+
+
+def test_initial_state_covers_the_template():
+    state = initial_state("q?", deadline_at=12.5)
+
+    assert set(state) == set(_INITIAL_STATE)
+    assert state["user_query"] == state["original_query"] == "q?"
+    assert state["deadline_at"] == 12.5
+
+
+def test_response_shape(builds):
+    response = _service().run("a?")
+    assert response == {
+        "answer": "answer to a?",
+        "citations": ["c1"],
+        "refused": None,
+        "reason": None,
+        "degraded": [],
+    }
+
+
+# --------------------
+# response cache in front of the graph
+# --------------------
+def test_response_cache_hit_skips_the_graph(builds):
+    svc = _service(response_cache=ResponseCache(disk_path=None))
+
+    svc.run("What is X?")
+    svc.run("what is x")
+
+    assert len(builds[0].states) == 1
+
+
+def test_batch_duplicates_run_once(builds, monkeypatch):
+    calls = []
+
+    async def fake_batch(queries, **kwargs):
+        calls.append(list(queries))
+        return [{**initial_state(q), "final_response": f"answer to {q}"} for q in queries]
+
+    monkeypatch.setattr(service, "arun_batch", fake_batch)
+    responses = _service().run_queries(["What is X?", "what is x", "y?"])
+
+    assert calls == [["What is X?", "y?"]]
+    assert [r["answer"] for r in responses] == ["answer to What is X?", "answer to What is X?", "answer to y?"]
+    assert responses[0] is not responses[1]
+
+
+# --------------------
+# the real graph compiles with every option
+# --------------------
+@pytest.mark.parametrize("planner, first", [("fused", "plan"), ("two_step", "intent_check")])
+def test_workflow_compiles(planner, first):
+    nodes = set(build_query_graph(None, None, None, planner=planner).get_graph().nodes)
+
+    assert {first, "route", "retrieve", "validate", "multi_hop", "answer", "refuse"} <= nodes
+    assert not {"speculate", "rerank", "compress", "semantic_cache_lookup"} & nodes
+
+
+def test_optional_collaborators_add_their_nodes():
+    graph = build_query_graph(
+        None, None, None,
+        semantic_cache=object(),
+        speculative=True,
+        context_compressor=object(),
+        reranker=object()
+    )
+    nodes = set(graph.get_graph().nodes)
+
+    assert {"speculate", "rerank", "compress", "semantic_cache_lookup", "semantic_cache_store"} <= nodes
+
+
+def test_unknown_planner_is_rejected():
+    with pytest.raises(ValueError):
+        build_query_graph(None, None, None, planner="three_step")
@@ -0,0 +1,208 @@
+# tests/test_rate_limiter.py
+import asyncio
+import threading
+import time
+
+import pytest
+
+import utils.rate_limiter as rate_limiter
+from utils.rate_limiter import LLMRateLimiter, TokenBucket, is_retryable
+
+
+class RateLimited(Exception):
+    code = 429
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(rate_limiter, "BACKOFF_BASE_SECONDS", 0.0)
+
+
+# --------------------
+# TOKEN BUCKET
+# --------------------
+def test_bucket_starts_full_then_waits_for_refill():
+    bucket = TokenBucket(per_minute=60)   # 1 unit / second
+    now = bucket.updated
+
+    assert bucket.wait_time(60, now) == 0.0
+    bucket.take(60)
+    assert bucket.wait_time(1, now) == pytest.approx(1.0)
+    assert bucket.wait_time(1, now + 1.0) == 0.0
+
+
+def test_bucket_oversized_request_waits_for_a_full_bucket_only():
+    bucket = TokenBucket(per_minute=60)
+    now = bucket.updated
+    bucket.take(30)
+    assert bucket.wait_time(1_000, now) == pytest.approx(30.0)
+
+
+def test_bucket_settles_actual_usage():
+    bucket = TokenBucket(per_minute=60)
+    now = bucket.updated
+    bucket.take(10)
+    bucket.adjust(-10)                 # refund: used less than reserved
+    assert bucket.wait_time(60, now) == 0.0
+    bucket.take(60)
+    bucket.adjust(30)                  # debt: used more than reserved
+    assert bucket.wait_time(1, now) == pytest.approx(31.0)
+
+
+# --------------------
+# LIMITER
+# --------------------
+def test_limits_disabled_by_default():
+    limiter = LLMRateLimiter(rpm=0, tpm=0, max_in_flight=0)
+    assert [limiter.call(lambda: i, tokens=10) for i in range(50)] == list(range(50))
+    assert limiter.stats()["calls"] == 50
+
+
+def test_requests_per_minute():
+    limiter = LLMRateLimiter(rpm=2, tpm=0, max_in_flight=0)
+    limiter.call(lambda: None, tokens=1)
+    limiter.call(lambda: None, tokens=1)
+    # third call would wait ~30s for the bucket: not admitted now
+    assert limiter._requests.wait_time(1, time.monotonic()) > 25
+
+
+def test_max_in_flight():
+    limiter = LLMRateLimiter(rpm=0, tpm=0, max_in_flight=2)
+    lock = threading.Lock()
+    running, peak = [0], [0]
+
+    def work():
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        time.sleep(0.05)
+        with lock:
+            running[0] -= 1
+
+    threads = [threading.Thread(target=limiter.call, args=(work, 1)) for _ in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert peak[0] == 2
+    assert limiter.stats()["in_flight"] == 0
+
+
+def test_retries_rate_limit_errors():
+    limiter = LLMRateLimiter(rpm=0, tpm=0, max_in_flight=0, max_retries=3)
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise RateLimited("429 resource exhausted")
+        return "ok"
+
+    assert limiter.call(flaky, tokens=1) == "ok"
+    assert limiter.stats()["retries"] == 2
+
+
+def test_gives_up_after_max_retries_and_on_other_errors():
+    limiter = LLMRateLimiter(rpm=0, tpm=0, max_in_flight=0, max_retries=2)
+
+    def always_limited():
+        raise RateLimited("quota")
+
+    with pytest.raises(RateLimited):
+        limiter.call(always_limited, tokens=1)
+
+    def broken():
+        raise ValueError("bad request")
+
+    with pytest.raises(ValueError):
+        limiter.call(broken, tokens=1)
+
+    stats = limiter.stats()
+    assert stats["retries"] == 2
+    assert stats["failures"] == 2
+    assert stats["in_flight"] == 0
+
+
+def test_async_calls_share_the_in_flight_limit():
+    limiter = LLMRateLimiter(rpm=0, tpm=0, max_in_flight=1)
+    running, peak = [0], [0]
+
+    async def work():
+        running[0] += 1
+        peak[0] = max(peak[0], running[0])
+        await asyncio.sleep(0.01)
+        running[0] -= 1
+        return True
+
+    async def main():
+        return await asyncio.gather(*(limiter.acall(work, tokens=1) for _ in range(4)))
+
+    assert asyncio.run(main()) == [True] * 4
+    assert peak[0] == 1
+
+
+def test_is_retryable():
+    assert is_retryable(RateLimited("x"))
+    assert is_retryable(RuntimeError("503 Service Unavailable"))
+    assert is_retryable(RuntimeError("model is overloaded"))
+    assert not is_retryable(ValueError("invalid argument"))
+
+
+def test_abandoned_call_is_never_admitted():
+    limiter = LLMRateLimiter(rpm=0, tpm=0, max_in_flight=1)
+    started, gave_up = [], threading.Event()
+    release_first = threading.Event()
+
+    def waiter():
+        rate_limiter.abandoned.set(gave_up)
+        try:
+            limiter.call(lambda: started.append("second"), tokens=1)
+        except rate_limiter.CallAbandoned:
+            started.append("abandoned")
+
+    first = threading.Thread(target=limiter.call, args=(release_first.wait, 1))
+    first.start()
+    second = threading.Thread(target=waiter)
+    second.start()
+    time.sleep(0.05)
+
+    gave_up.set()                        # caller stopped waiting (deadline)
+    release_first.set()
+    first.join()
+    second.join()
+
+    assert started == ["abandoned"]
+    assert limiter.stats()["queued"] == 0
+
+
+def test_stream_without_usage_keeps_the_token_reservation():
+    limiter = LLMRateLimiter(rpm=0, tpm=600, max_in_flight=0)
+
+    chunks = list(limiter.stream(lambda: iter(["a", "b", "c"]), tokens=300, usage=lambda chunk: None))
+
+    assert chunks == ["a", "b", "c"]
+    # half the bucket is still charged: the next 600-token call must wait
+    assert limiter._tokens.wait_time(600, time.monotonic()) > 25
+
+
+def test_stream_usage_settles_the_reservation():
+    limiter = LLMRateLimiter(rpm=0, tpm=600, max_in_flight=0)
+
+    list(limiter.stream(lambda: iter(["a", "b"]), tokens=300, usage=lambda chunk: 50))
+
+    assert limiter._tokens.level == pytest.approx(500, abs=1)
+
+
+def test_async_stream_without_usage_keeps_the_token_reservation():
+    limiter = LLMRateLimiter(rpm=0, tpm=600, max_in_flight=0)
+
+    async def chunks():
+        for c in ["a", "b"]:
+            yield c
+
+    async def main():
+        return [c async for c in limiter.astream(chunks, tokens=300, usage=lambda chunk: None)]
+
+    assert asyncio.run(main()) == ["a", "b"]
+    assert limiter._tokens.level == pytest.approx(300, abs=1)
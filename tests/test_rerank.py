@@ -0,0 +1,91 @@
+# tests/test_rerank.py
+import numpy as np
+
+from agents.rerank import rerank_batch, rerank_node
+from agents.state import initial_state
+from agents.validate import MIN_FINAL_SCORE
+from retrieval.reranker import CrossEncoderReranker
+
+# cross-encoder relevance per chunk (fake model)
+RELEVANCE = {"a": 0.2, "b": 0.5, "c": 0.9, "d": 0.7}
+
+
+class FakeChunks:
+    def __init__(self):
+        self.fetched = []
+
+    def get_chunks(self, chunk_ids):
+        self.fetched.append(list(chunk_ids))
+        return [{"chunk_id": c, "clean_text": f"text of {c}"} for c in chunk_ids], []
+
+
+def _reranker(**kwargs):
+    reranker = CrossEncoderReranker(**kwargs)
+    reranker.scored = []
+
+    def predict(pairs):
+        reranker.scored.append(pairs)
+        return np.array([RELEVANCE[text.split()[-1]] for _, text in pairs])
+
+    reranker._predict = predict
+    return reranker
+
+
+def _state(*candidates, query="what is x?"):
+    return {
+        **initial_state(query),
+        "retrieved_chunks": [
+            {"chunk_id": c, "final_score": s, **({"meta": m} if m is not None else {})}
+            for c, s, m in candidates
+        ],
+    }
+
+
+def test_candidates_are_reordered_by_cross_encoder_score():
+    state = _state(("a", 0.9, None), ("b", 0.8, None), ("c", 0.7, None), ("d", 0.6, None))
+
+    result = rerank_node(state, reranker=_reranker(keep=3), chunk_retriever=FakeChunks())
+
+    kept = result["retrieved_chunks"]
+    assert [c["chunk_id"] for c in kept] == ["c", "d", "b"]
+    assert [c["rerank_score"] for c in kept] == [0.9, 0.7, 0.5]
+    assert [c["final_score"] for c in kept] == [0.7, 0.6, 0.8]   # fused score kept for the gate
+    assert result["retrieval_debug"]["reranked"] == 3
+
+
+def test_only_candidates_validation_can_use_are_fetched_and_scored():
+    state = _state(
+        ("a", 0.9, None),
+        ("b", 0.8, {"answerable": False}),        # sidecar: validate would skip it
+        ("c", MIN_FINAL_SCORE - 0.01, None),      # below the relevance gate
+        ("d", 0.6, {"answerable": True}),
+    )
+    chunks, reranker = FakeChunks(), _reranker()
+
+    result = rerank_node(state, reranker=reranker, chunk_retriever=chunks)
+
+    assert chunks.fetched == [["a", "d"]]
+    assert [t for _, t in reranker.scored[0]] == ["text of a", "text of d"]
+    assert [c["chunk_id"] for c in result["retrieved_chunks"]] == ["d", "a"]
+
+
+def test_state_without_usable_candidates_is_left_for_validation():
+    weak = _state(("a", 0.1, None))
+    strong = _state(("a", 0.9, None), ("c", 0.8, None), query="other")
+    chunks = FakeChunks()
+
+    results = rerank_batch([weak, strong], _reranker(), chunks)
+
+    assert results[0] is weak
+    assert [c["chunk_id"] for c in results[1]["retrieved_chunks"]] == ["c", "a"]
+    assert chunks.fetched == [["a", "c"]]   # one fetch for the batch
+
+
+def test_top_n_bounds_the_candidates_scored():
+    state = _state(("a", 0.9, None), ("b", 0.8, None), ("c", 0.7, None), ("d", 0.6, None))
+    reranker = _reranker(top_n=3)
+
+    result = rerank_node(state, reranker=reranker, chunk_retriever=FakeChunks())
+
+    assert len(reranker.scored[0]) == 3
+    assert "d" not in {c["chunk_id"] for c in result["retrieved_chunks"]}
@@ -0,0 +1,56 @@
+# tests/test_response_cache.py
+import pytest
+
+import utils.response_cache as response_cache
+from utils.response_cache import ResponseCache, normalize_query
+
+
+@pytest.mark.parametrize("a, b", [
+    ("What is the leave policy?", "what is the leave policy"),
+    ("  What   is\tthe leave policy ?? ", "what is the leave policy"),
+    ("ＷＨＡＴ is X?", "what is x"),                 # NFKC full-width
+    ("Straße?", "strasse"),                          # casefold
+    ("What is X…", "what is x"),
+    ("X とは？", "x とは"),
+])
+def test_equivalent_queries_share_a_key(a, b):
+    assert normalize_query(a) == normalize_query(b)
+
+
+@pytest.mark.parametrize("a, b", [
+    ("What is C++?", "What is C?"),
+    ("Is the fee $5?", "Is the fee 5?"),
+    ("policy v2.1", "policy v21"),
+    ("leave policy for contractors", "leave policy for contractors not employees"),
+])
+def test_meaningful_differences_are_kept(a, b):
+    assert normalize_query(a) != normalize_query(b)
+
+
+def test_empty_query():
+    assert normalize_query("") == ""
+    assert normalize_query(None) == ""
+
+
+@pytest.fixture
+def index_version(monkeypatch):
+    version = ["v1"]
+    monkeypatch.setattr(response_cache, "current_index_version", lambda: version[0])
+    return version
+
+
+def test_cache_hit_for_normalised_query(index_version):
+    cache = ResponseCache(disk_path=None)
+    cache.put("What is the leave policy?", {"answer": "20 days"})
+    assert cache.get("what is the leave policy") == {"answer": "20 days"}
+
+
+def test_response_is_not_stored_under_a_newer_version(index_version):
+    cache = ResponseCache(disk_path=None)
+    version = cache.version()            # captured at lookup
+
+    index_version[0] = "v2"              # index published mid-request
+    cache.put("q", {"answer": "old"}, version)
+
+    assert cache.get("q") is None
+    assert cache.get("q", version) is None
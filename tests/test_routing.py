@@ -0,0 +1,135 @@
+# tests/test_routing.py
+import time
+
+import pytest
+
+from agents.local_intent import LOCAL_INTENT_REASON
+from agents.state import initial_state
+from graph.routing import (
+    RouteCounters,
+    decide_route,
+    llm_calls_saved,
+    route_after_policy,
+    route_counters,
+    route_policy_node,
+)
+
+SOON = 5       # seconds left: below SKIP_REWRITE_BELOW_SECONDS
+PLENTY = 120
+
+
+def _state(intent, confidence, rewrites=None, left=None, reason="llm", llm_calls=1):
+    return {
+        **initial_state("what is x?"),
+        "intent": intent,
+        "intent_confidence": confidence,
+        "intent_reason": reason,
+        "rewrite_candidates": rewrites,
+        "deadline_at": None if left is None else time.monotonic() + left,
+        "llm_calls": llm_calls,
+    }
+
+
+@pytest.fixture(autouse=True)
+def fresh_counters():
+    route_counters.reset()
+    yield
+    route_counters.reset()
+
+
+# --------------------
+# decide_route
+# --------------------
+@pytest.mark.parametrize("state, route", [
+    # confident unanswerable → refuse, before anything planning produced
+    (_state("unanswerable", 0.95), "refuse"),
+    (_state("unanswerable", 0.95, rewrites=["x?"]), "refuse"),
+    (_state("unanswerable", 0.5), "rewrite_generate"),
+    # the local classifier's confidence never refuses
+    (_state("unanswerable", 0.99, reason=LOCAL_INTENT_REASON, llm_calls=0), "rewrite_generate"),
+    (_state("unanswerable", 0.99, rewrites=[], reason=LOCAL_INTENT_REASON), "rewrite_guard"),
+    # confident factual → raw query
+    (_state("factual", 0.95), "skip_rewrite"),
+    (_state("factual", 0.5), "rewrite_generate"),
+    (_state("analytical", 0.99), "rewrite_generate"),
+    # fused planner already produced rewrites / sub-questions
+    (_state("analytical", 0.8, rewrites=["x explained"]), "rewrite_guard"),
+    (_state("factual", 0.95, rewrites=[]), "rewrite_guard"),
+    (_state("multi_hop", 0.8, rewrites=["what is a?", "what is b?"]), "multi_hop"),
+    (_state("multi_hop", 0.8, rewrites=[]), "rewrite_guard"),
+    (_state("multi_hop", 0.8), "rewrite_generate"),
+    # deadline: no time for the rewrite call
+    (_state("analytical", 0.8, left=SOON), "skip_rewrite"),
+    (_state("analytical", 0.8, left=PLENTY), "rewrite_generate"),
+    (_state("analytical", 0.8, rewrites=["x explained"], left=SOON), "rewrite_guard"),
+    (_state(None, None), "rewrite_generate"),
+])
+def test_decide_route(state, route):
+    assert decide_route(state) == route
+
+
+# --------------------
+# llm_calls_saved
+# --------------------
+@pytest.mark.parametrize("planner, llm_calls, route, saved", [
+    # fused full path: plan + answer
+    ("fused", 1, "refuse", 1),              # no answer call
+    ("fused", 1, "rewrite_guard", 0),
+    ("fused", 1, "skip_rewrite", 0),
+    ("fused", 0, "rewrite_guard", 1),       # local intent: no plan call
+    ("fused", 2, "rewrite_guard", 0),       # unusable fused output → fallback calls
+    # two_step full path: intent + rewrite + answer
+    ("two_step", 1, "rewrite_generate", 0),
+    ("two_step", 1, "skip_rewrite", 1),
+    ("two_step", 1, "refuse", 2),
+    ("two_step", 0, "skip_rewrite", 2),
+    ("two_step", 0, "refuse", 3),
+])
+def test_llm_calls_saved(planner, llm_calls, route, saved):
+    assert llm_calls_saved({"llm_calls": llm_calls}, route, planner) == saved
+
+
+# --------------------
+# route_policy_node
+# --------------------
+def test_policy_node_sets_route_and_counts_savings():
+    state = route_policy_node(_state("unanswerable", 0.95), planner="two_step")
+
+    assert state["route"] == "refuse" and state["should_refuse"]
+    assert route_after_policy(state) == "refuse"
+
+    stats = route_counters.stats()
+    assert stats["routes"] == {"refuse": 1}
+    assert stats["by_intent"] == {"refuse:unanswerable": 1}
+    assert stats["llm_calls_saved"] == 2
+
+
+def test_confident_skip_is_not_a_degradation():
+    state = route_policy_node(_state("factual", 0.95), planner="fused")
+
+    assert state["route"] == "skip_rewrite"
+    assert route_after_policy(state) == "rewrite_guard"
+    assert state["degraded"] == []
+
+
+def test_deadline_skip_is_recorded_as_degradation():
+    state = route_policy_node(_state("analytical", 0.8, left=SOON), planner="two_step")
+
+    assert state["route"] == "skip_rewrite"
+    assert state["degraded"] == ["skip_rewrite"]
+    assert route_counters.stats()["llm_calls_saved"] == 1
+
+
+def test_counters_aggregate_and_reset():
+    counters = RouteCounters()
+    counters.record("skip_rewrite", "factual", llm_calls_saved=1)
+    counters.record("skip_rewrite", "factual", llm_calls_saved=1)
+    counters.record("rewrite_generate", "analytical")
+
+    stats = counters.stats()
+    assert stats["total"] == 3
+    assert stats["routes"] == {"skip_rewrite": 2, "rewrite_generate": 1}
+    assert stats["llm_calls_saved"] == 2
+
+    counters.reset()
+    assert counters.stats()["total"] == 0
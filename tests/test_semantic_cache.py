@@ -0,0 +1,161 @@
+# tests/test_semantic_cache.py
+import numpy as np
+import pytest
+
+import utils.semantic_cache as semantic_cache
+from agents.semantic_cache import semantic_cache_lookup_node, semantic_cache_store_node
+from utils.semantic_cache import SemanticCache
+
+DIM = 4
+
+
+@pytest.fixture
+def index_version(monkeypatch):
+    version = ["v1"]
+    monkeypatch.setattr(semantic_cache, "current_index_version", lambda: version[0])
+    return version
+
+
+def _vec(*values):
+    return np.array(values, dtype="float32")
+
+
+def _entry(query="q", citations=("c1",)):
+    return {"query": query, "answer": f"answer to {query}", "citations": list(citations)}
+
+
+class FakeChunks:
+    def __init__(self, chunk_ids):
+        self.chunk_ids = set(chunk_ids)
+
+    def get_chunks(self, chunk_ids):
+        found = [
+            {"chunk_id": c, "document_id": "d1", "chunk_index": 0, "clean_text": f"text {c}"}
+            for c in chunk_ids if c in self.chunk_ids
+        ]
+        return found, [c for c in chunk_ids if c not in self.chunk_ids]
+
+
+# --------------------
+# SemanticCache
+# --------------------
+def test_hit_for_a_close_embedding(index_version):
+    cache = SemanticCache(dim=DIM, threshold=0.9)
+    cache.store(_vec(1, 0, 0, 0), _entry("what is the leave policy"))
+
+    entry, similarity = cache.lookup(_vec(1, 0.1, 0, 0))
+
+    assert entry["query"] == "what is the leave policy"
+    assert similarity == pytest.approx(1 / np.sqrt(1.01), rel=1e-5)
+    assert cache.stats()["hits"] == 1
+
+
+def test_miss_below_threshold_and_on_empty_cache(index_version):
+    cache = SemanticCache(dim=DIM, threshold=0.9)
+    assert cache.lookup(_vec(1, 0, 0, 0)) is None
+
+    cache.store(_vec(1, 0, 0, 0), _entry())
+    assert cache.lookup(_vec(1, 1, 0, 0)) is None          # cosine ≈ 0.71
+    assert cache.stats()["misses"] == 2
+
+
+def test_threshold_is_inclusive(index_version):
+    cache = SemanticCache(dim=DIM, threshold=0.6)
+    cache.store(_vec(1, 0, 0, 0), _entry())
+    assert cache.lookup(_vec(0.6, 0.8, 0, 0)) is not None    # cosine 0.6
+    assert cache.lookup(_vec(0.59, 0.81, 0, 0)) is None
+
+
+def test_new_index_version_rejects_older_entries(index_version):
+    cache = SemanticCache(dim=DIM, threshold=0.9)
+    cache.store(_vec(1, 0, 0, 0), _entry())
+
+    index_version[0] = "v2"
+
+    assert cache.lookup(_vec(1, 0, 0, 0)) is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_lru_eviction_and_invalidate(index_version):
+    cache = SemanticCache(dim=DIM, threshold=0.9, max_entries=2)
+    cache.store(_vec(1, 0, 0, 0), _entry("a"))
+    cache.store(_vec(0, 1, 0, 0), _entry("b"))
+    cache.lookup(_vec(1, 0, 0, 0))                           # "b" is now least recent
+    cache.store(_vec(0, 0, 1, 0), _entry("c"))
+
+    assert cache.lookup(_vec(0, 1, 0, 0)) is None
+    entry, _ = cache.lookup(_vec(1, 0, 0, 0))
+    cache.invalidate(entry["entry_id"])
+    assert cache.lookup(_vec(1, 0, 0, 0)) is None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_caller_embedding_is_not_modified(index_version):
+    cache = SemanticCache(dim=DIM)
+    embedding = _vec(3, 4, 0, 0)
+    cache.store(embedding, _entry())
+    cache.lookup(embedding)
+    np.testing.assert_array_equal(embedding, _vec(3, 4, 0, 0))
+
+
+def test_dimension_mismatch_is_an_error(index_version):
+    with pytest.raises(ValueError):
+        SemanticCache(dim=DIM).lookup(_vec(1, 0, 0))
+
+
+# --------------------
+# graph nodes
+# --------------------
+def _state(embedding, **extra):
+    return {"user_query": "q", "query_embedding": embedding, **extra}
+
+
+def test_lookup_node_hit_reuses_answer_with_verified_citations(index_version):
+    cache = SemanticCache(dim=DIM, threshold=0.9)
+    cache.store(_vec(1, 0, 0, 0), _entry("earlier question", citations=["c1", "c2"]))
+
+    state = semantic_cache_lookup_node(_state(_vec(1, 0.05, 0, 0)), cache, FakeChunks({"c1", "c2"}))
+
+    assert state["semantic_cache_hit"] is not None
+    assert state["answer_text"] == "answer to earlier question"
+    assert state["answer_citations"] == ["c1", "c2"]
+    assert state["validation_status"] == "pass"
+
+
+def test_lookup_node_drops_entry_with_missing_citations(index_version):
+    cache = SemanticCache(dim=DIM, threshold=0.9)
+    cache.store(_vec(1, 0, 0, 0), _entry(citations=["c1", "gone"]))
+
+    state = semantic_cache_lookup_node(_state(_vec(1, 0, 0, 0)), cache, FakeChunks({"c1"}))
+
+    assert state["semantic_cache_hit"] is None
+    assert "answer_text" not in state
+    assert cache.stats()["entries"] == 0
+
+
+def test_lookup_node_miss_and_no_embedding(index_version):
+    cache = SemanticCache(dim=DIM, threshold=0.9)
+    chunks = FakeChunks({"c1"})
+    assert semantic_cache_lookup_node(_state(_vec(1, 0, 0, 0)), cache, chunks)["semantic_cache_hit"] is None
+    assert semantic_cache_lookup_node(_state(None), cache, chunks)["semantic_cache_hit"] is None
+
+
+@pytest.mark.parametrize("skip", [
+    {"refused": True},
+    {"semantic_cache_hit": 0.95},
+    {"degraded": ["answer_timeout"]},
+])
+def test_store_node_skips_refused_cached_and_degraded(index_version, skip):
+    cache = SemanticCache(dim=DIM)
+    state = _state(_vec(1, 0, 0, 0), final_response="a", answer_citations=["c1"], **skip)
+    semantic_cache_store_node(state, cache)
+    assert cache.stats()["entries"] == 0
+
+
+def test_store_node_remembers_answered_query(index_version):
+    cache = SemanticCache(dim=DIM)
+    state = _state(_vec(1, 0, 0, 0), final_response="a", answer_citations=["c1"], refused=False)
+    semantic_cache_store_node(state, cache)
+
+    entry, _ = cache.lookup(_vec(1, 0, 0, 0))
+    assert entry["answer"] == "a" and entry["citations"] == ["c1"]
@@ -0,0 +1,56 @@
+# tests/test_sparse_index.py
+import numpy as np
+import pytest
+
+from indexes.sparse_index import BM25Index
+
+CORPUS = [
+    "BM25 ranks documents by term frequency and inverse document frequency.",
+    "Dense retrieval embeds queries and passages with a bi-encoder.",
+    "Hybrid search fuses BM25 and dense scores with reciprocal rank fusion.",
+    "FAISS serves inner-product search over normalised embeddings.",
+    "Term frequency saturates in BM25 through the k1 parameter.",
+    "Chunks are validated against Postgres before reaching the LLM.",
+]
+
+
+@pytest.fixture
+def index():
+    index = BM25Index()
+    index.build([{"chunk_id": f"c{i}", "clean_text": text} for i, text in enumerate(CORPUS)])
+    return index
+
+
+def test_batch_scores_match_get_scores(index):
+    queries = ["bm25 term frequency", "dense dense embeddings", "postgres llm chunks", "unseen words"]
+
+    for query, hits in zip(queries, index.search_batch(queries, top_k=len(CORPUS))):
+        expected = index.bm25.get_scores(index._tokenize(query))
+        by_id = {h["chunk_id"]: h["score"] for h in hits}
+
+        for i, score in enumerate(expected):
+            assert by_id.get(f"c{i}", 0.0) == pytest.approx(max(score, 0.0))
+
+
+def test_batch_ranking_matches_single_search(index):
+    queries = ["bm25 frequency", "search over embeddings", "fusion"]
+
+    assert index.search_batch(queries, top_k=3) == [index.search(q, top_k=3) for q in queries]
+
+
+def test_ranking_follows_get_scores_order(index):
+    query = "bm25 term frequency"
+    scores = index.bm25.get_scores(index._tokenize(query))
+    expected = [f"c{i}" for i in np.argsort(-scores, kind="stable") if scores[i] > 0][:3]
+
+    assert [h["chunk_id"] for h in index.search(query, top_k=3)] == expected
+
+
+def test_empty_queries_have_no_hits(index):
+    assert index.search_batch(["", "!!!", "bm25"], top_k=2)[:2] == [[], []]
+    assert index.search_batch(["", "?"]) == [[], []]
+
+
+def test_unbuilt_index_raises():
+    with pytest.raises(RuntimeError):
+        BM25Index().search("bm25")
@@ -0,0 +1,178 @@
+# tests/test_speculative_retrieval.py
+import threading
+from concurrent.futures import Future
+
+import numpy as np
+import pytest
+
+import agents.retrieve as retrieve
+from agents.retrieve import (
+    discard_speculation,
+    retrieve_node,
+    speculative_embedding,
+    speculative_result,
+    speculative_retrieve_node,
+)
+from agents.semantic_cache import semantic_cache_lookup_node
+from agents.state import initial_state
+from graph.routing import route_policy_node
+
+ORIGINAL = "what is x?"
+REWRITE = "x definition"
+
+
+class FakeVectors:
+    def __init__(self):
+        self.searched = []
+
+    def search_text_batch(self, query_embeddings, top_k):
+        self.searched.append(np.asarray(query_embeddings).copy())
+        return [[{"chunk_id": f"dense-{int(row[0])}", "score": 0.9}] for row in query_embeddings]
+
+
+class FakeBM25:
+    def __init__(self):
+        self.searched = []
+
+    def search_batch(self, queries, top_k):
+        self.searched.append(list(queries))
+        return [[{"chunk_id": f"sparse-{q}", "score": 3.0}] for q in queries]
+
+
+@pytest.fixture
+def raw_search(monkeypatch):
+    """_retrieve_raw without the embedder; `release` holds the job running."""
+    release = threading.Event()
+    release.set()
+
+    def fake_retrieve_raw(query, vector_store, bm25_store, embedded):
+        embedded.set_result(np.array([7.0, 0.0]))
+        release.wait(5)
+        return {
+            "query": query,
+            "embedding": np.array([7.0, 0.0]),
+            "dense": [{"chunk_id": "speculated", "dense_score": 0.95, "sparse_score": 0.0}],
+            "sparse": [],
+        }
+
+    monkeypatch.setattr(retrieve, "_retrieve_raw", fake_retrieve_raw)
+    yield release
+    release.set()
+    retrieve._speculations.clear()
+
+
+def _speculating(**overrides):
+    state = {**initial_state(ORIGINAL), **overrides}
+    return speculative_retrieve_node(state, vector_store=None, bm25_store=None)
+
+
+def _speculated():
+    """Speculation finished (a still-queued job is cancelled, not waited for)."""
+    state = _speculating()
+    retrieve._speculations[state["request_id"]].job.result(timeout=5)
+    return state
+
+
+# --------------------
+# speculation lives outside the state
+# --------------------
+def test_state_carries_no_future(raw_search):
+    state = _speculating()
+
+    assert not any(isinstance(v, Future) for v in state.values())
+    assert state["request_id"] in retrieve._speculations
+
+
+def test_no_request_id_no_speculation(raw_search):
+    _speculating(request_id=None)
+    assert retrieve._speculations == {}
+
+
+def test_result_and_embedding_only_for_the_speculated_query(raw_search):
+    state = _speculated()
+
+    assert speculative_result(state, ORIGINAL)["query"] == ORIGINAL
+    assert speculative_result(state, REWRITE) is None
+    assert speculative_embedding(state, ORIGINAL)[0] == 7.0
+    assert speculative_result(initial_state(ORIGINAL), ORIGINAL) is None   # other request
+
+
+# --------------------
+# retrieve_node reuses the speculated row
+# --------------------
+def test_speculated_row_is_reused_and_other_queries_are_searched(raw_search):
+    state = {
+        **_speculated(),
+        "final_query": ORIGINAL,
+        "selected_queries": [ORIGINAL, REWRITE],
+        "query_embeddings": np.array([[7.0, 0.0], [2.0, 0.0]], dtype="float32"),
+    }
+    vectors, bm25 = FakeVectors(), FakeBM25()
+
+    result = retrieve_node(state, vector_store=vectors, bm25_store=bm25)
+
+    assert len(vectors.searched) == 1 and vectors.searched[0][:, 0].tolist() == [2.0]
+    assert bm25.searched == [[REWRITE]]
+    chunk_ids = {c["chunk_id"] for c in result["retrieved_chunks"]}
+    assert {"speculated", "dense-2"} <= chunk_ids   # both rows fused
+    assert retrieve._speculations == {}   # collected
+
+
+def test_without_speculation_every_query_is_searched(raw_search):
+    state = {
+        **initial_state(ORIGINAL),
+        "final_query": ORIGINAL,
+        "selected_queries": [ORIGINAL, REWRITE],
+        "query_embeddings": np.array([[7.0, 0.0], [2.0, 0.0]], dtype="float32"),
+    }
+    vectors, bm25 = FakeVectors(), FakeBM25()
+
+    retrieve_node(state, vector_store=vectors, bm25_store=bm25)
+
+    assert vectors.searched[0][:, 0].tolist() == [7.0, 2.0]
+    assert bm25.searched == [[ORIGINAL, REWRITE]]
+
+
+# --------------------
+# non-retrieving routes drop it
+# --------------------
+def test_discard_cancels_a_queued_job():
+    state = initial_state(ORIGINAL)
+    job = Future()
+    retrieve._speculations[state["request_id"]] = retrieve._Speculation(ORIGINAL, job, Future())
+
+    discard_speculation(state)
+
+    assert job.cancelled()
+    assert retrieve._speculations == {}
+
+
+def test_refuse_route_discards(raw_search):
+    raw_search.clear()   # still running when routing decides
+    state = {**_speculating(), "intent": "unanswerable", "intent_confidence": 0.99}
+
+    assert route_policy_node(state, planner="fused")["route"] == "refuse"
+    assert retrieve._speculations == {}
+
+
+def test_retrieving_route_keeps_it(raw_search):
+    state = {**_speculating(), "intent": "factual", "intent_confidence": 0.99}
+
+    assert route_policy_node(state, planner="fused")["route"] == "skip_rewrite"
+    assert state["request_id"] in retrieve._speculations
+
+
+def test_semantic_cache_hit_discards(raw_search):
+    class Cache:
+        def lookup(self, embedding):
+            return {"entry_id": 0, "query": ORIGINAL, "answer": "a", "citations": ["c1"]}, 0.99
+
+    class Chunks:
+        def get_chunks(self, chunk_ids):
+            return [{"chunk_id": "c1", "document_id": "d", "clean_text": "text"}], []
+
+    state = {**_speculating(), "query_embedding": np.array([7.0, 0.0])}
+    result = semantic_cache_lookup_node(state, semantic_cache=Cache(), chunk_retriever=Chunks())
+
+    assert result["semantic_cache_hit"] == 0.99
+    assert retrieve._speculations == {}
@@ -0,0 +1,53 @@
+# tests/test_streaming_refusal_gate.py
+from agents.refuse import OVERCLAIM_MIN_CITATIONS, OVERCLAIM_WORDS, StreamingRefusalGate
+
+
+def _stream(gate, tokens):
+    shown = "".join(gate.feed(t) for t in tokens)
+    return shown + gate.flush()
+
+
+def test_clean_answer_is_shown_in_full():
+    gate = StreamingRefusalGate(citation_count=2)
+    tokens = ["Employees", " get 20", " days of paid", " leave per year [1]."]
+    assert _stream(gate, tokens) == "".join(tokens)
+    assert gate.blocked is None
+
+
+def test_tail_is_held_back_until_flush():
+    gate = StreamingRefusalGate(citation_count=2)
+    text = "Employees get 20 days of paid leave per year."
+    shown = gate.feed(text)
+    assert shown == text[:len(text) - StreamingRefusalGate.HOLDBACK]
+    assert shown + gate.flush() == text
+
+
+def test_signal_split_across_tokens_is_never_shown():
+    gate = StreamingRefusalGate(citation_count=2)
+    shown = _stream(gate, ["The evidence is ", "insuf", "ficient to answer."])
+
+    assert gate.blocked == "INSUFFICIENT_EVIDENCE"
+    assert "insuf" not in shown
+    assert gate.feed(" more text") == ""
+
+
+def test_signal_is_case_insensitive():
+    gate = StreamingRefusalGate(citation_count=2)
+    _stream(gate, ["This is NOT MENTIONED in the sources."])
+    assert gate.blocked == "INSUFFICIENT_EVIDENCE"
+
+
+def test_overclaim_stops_the_stream():
+    gate = StreamingRefusalGate(citation_count=OVERCLAIM_MIN_CITATIONS - 1)
+    shown = _stream(gate, ["word "] * (OVERCLAIM_WORDS + 5))
+
+    assert gate.blocked == "OVERCLAIM"
+    assert len(shown.split()) <= OVERCLAIM_WORDS
+
+
+def test_long_answer_with_enough_citations_is_allowed():
+    gate = StreamingRefusalGate(citation_count=OVERCLAIM_MIN_CITATIONS)
+    shown = _stream(gate, ["word "] * (OVERCLAIM_WORDS + 5))
+
+    assert gate.blocked is None
+    assert len(shown.split()) == OVERCLAIM_WORDS + 5
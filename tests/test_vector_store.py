@@ -0,0 +1,48 @@
+# tests/test_vector_store.py
+import numpy as np
+import pytest
+
+from storage.vector_store import VectorStore
+
+DIM = 8
+
+
+@pytest.fixture
+def store(tmp_path):
+    rng = np.random.default_rng(0)
+    store = VectorStore(dim=DIM, base_path=str(tmp_path))
+    for i in range(20):
+        store.add(rng.normal(size=DIM).astype("float32"), f"c{i}", meta={"answerable": i % 2 == 0})
+    return store
+
+
+def test_search_batch_equals_per_row_search(store):
+    queries = np.random.default_rng(1).normal(size=(4, DIM)).astype("float32")
+
+    batched = store.search_batch(queries, top_k=5)
+    single = [store.search(q, top_k=5) for q in queries]
+
+    assert [[h["chunk_id"] for h in row] for row in batched] == [[h["chunk_id"] for h in row] for row in single]
+    for b_row, s_row in zip(batched, single):
+        assert [h["score"] for h in b_row] == pytest.approx([h["score"] for h in s_row], abs=1e-6)
+        assert [h["meta"] for h in b_row] == [h["meta"] for h in s_row]
+
+
+@pytest.mark.parametrize("dtype", ["float32", "float64"])
+def test_search_batch_leaves_its_input_untouched(store, dtype):
+    queries = np.random.default_rng(2).normal(size=(3, DIM)).astype(dtype) * 5
+    before = queries.copy()
+
+    store.search_batch(queries, top_k=3)
+
+    np.testing.assert_array_equal(queries, before)
+
+
+def test_search_batch_on_empty_store(tmp_path):
+    store = VectorStore(dim=DIM, base_path=str(tmp_path))
+    assert store.search_batch(np.ones((2, DIM), dtype="float32")) == [[], []]
+
+
+def test_search_batch_rejects_1d_input(store):
+    with pytest.raises(ValueError):
+        store.search_batch(np.ones(DIM, dtype="float32"))
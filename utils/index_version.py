@@ -0,0 +1,48 @@
+# index_version.py
+import os
+import json
+import uuid
+from datetime import datetime, timezone
+
+INDEX_VERSION_PATH = os.getenv("INDEX_VERSION_PATH", "./index_version.json")
+
+_cached = {"mtime": None, "version": None}
+
+
+def current_index_version(path: str = INDEX_VERSION_PATH) -> str:
+    """
+    Version of the corpus / indexes currently on disk.
+
+    Re-read only when the file changes (one stat per call), so callers
+    can check it on every request. "unversioned" until the first publish.
+    """
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return "unversioned"
+
+    if mtime != _cached["mtime"]:
+        with open(path, "r") as f:
+            _cached["version"] = json.load(f)["version"]
+        _cached["mtime"] = mtime
+
+    return _cached["version"]
+
+
+def publish_index_version(source: str, path: str = INDEX_VERSION_PATH) -> str:
+    """
+    Called by ingestion / index builds after their files are saved.
+    Every cache keyed by the index version is invalidated by this.
+    """
+    version = uuid.uuid4().hex
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump({
+            "version": version,
+            "source": source,
+            "published_at": datetime.now(timezone.utc).isoformat(),
+        }, f)
+    os.replace(tmp, path)
+
+    print(f"✅ Published index version {version} ({source})")
+    return version
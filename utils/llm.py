@@ -1,20 +1,89 @@
 # llm.py
+import os
+from functools import partial
 from langchain_google_genai import ChatGoogleGenerativeAI
 from dotenv import load_dotenv
 
+from utils.llm_cache import DiskLLMCache
+from utils.rate_limiter import llm_limiter
+
 
 load_dotenv(override=True)
 
 CONTROL_MODEL = "gemini-2.5-flash"
 TEMPERATURE = 0.0
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE", "1") != "0"
+OUTPUT_TOKEN_ESTIMATE = 256   # reserved per call until the provider reports usage
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(messages) -> int:
+    chars = sum(len(str(getattr(m, "content", m))) for m in messages)
+    return chars // CHARS_PER_TOKEN + OUTPUT_TOKEN_ESTIMATE
+
+
+def _usage(message) -> int:
+    usage = getattr(message, "usage_metadata", None) or {}
+    return usage.get("total_tokens")
+
+
+def _result_tokens(result) -> int:
+    return _usage(result.generations[0].message) if result.generations else None
+
+
+def _chunk_tokens(chunk) -> int:
+    return _usage(chunk.message)
+
+
+class RateLimitedChatGoogleGenerativeAI(ChatGoogleGenerativeAI):
+    """
+    Gemini chat model whose provider calls go through the shared
+    `llm_limiter` (RPM, TPM, in-flight, backoff). Disk-cache hits never
+    reach these methods, so they are not rate limited.
+    """
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        return llm_limiter.call(
+            partial(super()._generate, messages, stop, run_manager, **kwargs),
+            estimate_tokens(messages),
+            _result_tokens
+        )
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        return await llm_limiter.acall(
+            partial(super()._agenerate, messages, stop, run_manager, **kwargs),
+            estimate_tokens(messages),
+            _result_tokens
+        )
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        yield from llm_limiter.stream(
+            partial(super()._stream, messages, stop, run_manager, **kwargs),
+            estimate_tokens(messages),
+            _chunk_tokens
+        )
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        async for chunk in llm_limiter.astream(
+            partial(super()._astream, messages, stop, run_manager, **kwargs),
+            estimate_tokens(messages),
+            _chunk_tokens
+        ):
+            yield chunk
+
 
 _llm = None
 
 def get_llm():
     global _llm
     if _llm is None:
-        _llm = ChatGoogleGenerativeAI(
+        # identical prompts at temperature 0 → served from the disk cache
+        cache = DiskLLMCache() if LLM_CACHE_ENABLED and TEMPERATURE == 0 else None
+        _llm = RateLimitedChatGoogleGenerativeAI(
             model = CONTROL_MODEL,
-            temperature = TEMPERATURE
+            temperature = TEMPERATURE,
+            cache = cache,
+            # retries are the limiter's job (backoff + re-queue); 1 = no SDK retries
+            max_retries = 1
         )
-    return _llm
\ No newline at end of file
+    return _llm
@@ -0,0 +1,142 @@
+# llm_cache.py
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+from contextlib import contextmanager
+from typing import Any, Optional
+
+from langchain_core.caches import BaseCache, RETURN_VAL_TYPE
+from langchain_core.load import dumps, loads
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, Generation
+
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", "./.llm_cache.sqlite")
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", 50_000))
+LLM_CACHE_MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_BYTES", 256 * 1024 * 1024))
+EVICT_FRACTION = 0.1   # when over a limit, drop the least recently used 10%
+
+# only what a chat model returns may be revived from the cache file
+CACHED_TYPES = [ChatGeneration, ChatGenerationChunk, Generation, AIMessage, AIMessageChunk]
+
+
+class DiskLLMCache(BaseCache):
+    """
+    Persistent LLM response cache (SQLite), plugged into LangChain via
+    `ChatGoogleGenerativeAI(cache=...)`.
+
+    - Key: sha256(llm_string + prompt) — llm_string carries model,
+      temperature and call params; prompt is the serialised messages
+    - Bounded by entries and bytes; least recently used rows evicted
+    - Survives restarts and is shared by every process on the host,
+      so re-running evals with identical prompts costs nothing
+    - Hit / miss metrics
+
+    Only meaningful for deterministic (temperature 0) models.
+    """
+
+    def __init__(
+        self,
+        path: str = LLM_CACHE_PATH,
+        max_entries: int = LLM_CACHE_MAX_ENTRIES,
+        max_bytes: int = LLM_CACHE_MAX_BYTES
+    ):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        with self._db() as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("""
+                CREATE TABLE IF NOT EXISTS llm_cache (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    last_used REAL NOT NULL
+                )
+            """)
+            db.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_last_used ON llm_cache(last_used)")
+
+    @contextmanager
+    def _db(self):
+        db = sqlite3.connect(self.path, timeout=10)
+        try:
+            with db:
+                yield db
+        finally:
+            db.close()
+
+    @staticmethod
+    def _key(prompt: str, llm_string: str) -> str:
+        return hashlib.sha256(f"{llm_string}\n{prompt}".encode("utf-8")).hexdigest()
+
+    # --------------------
+    # BaseCache
+    # --------------------
+    def lookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        key = self._key(prompt, llm_string)
+
+        with self._db() as db:
+            row = db.execute("SELECT value FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                db.execute("UPDATE llm_cache SET last_used = ? WHERE key = ?", (time.time(), key))
+
+        with self._lock:
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+
+        return loads(row[0], allowed_objects=CACHED_TYPES)
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        value = dumps(return_val)
+
+        with self._db() as db:
+            db.execute(
+                "INSERT OR REPLACE INTO llm_cache VALUES (?, ?, ?, ?)",
+                (self._key(prompt, llm_string), value, len(value), time.time())
+            )
+            self._evict(db)
+
+    def clear(self, **kwargs: Any) -> None:
+        with self._db() as db:
+            db.execute("DELETE FROM llm_cache")
+
+    def _evict(self, db) -> None:
+        entries, total = db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_cache").fetchone()
+        if entries <= self.max_entries and total <= self.max_bytes:
+            return
+
+        drop = max(1, int(entries * EVICT_FRACTION))
+        db.execute("""
+            DELETE FROM llm_cache WHERE key IN (
+                SELECT key FROM llm_cache ORDER BY last_used LIMIT ?
+            )
+        """, (drop,))
+        with self._lock:
+            self.evictions += drop
+
+    # --------------------
+    # METRICS
+    # --------------------
+    def stats(self) -> dict:
+        with self._db() as db:
+            entries, total = db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_cache").fetchone()
+
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": entries,
+                "bytes": total,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+            }
@@ -0,0 +1,321 @@
+# rate_limiter.py
+"""
+Process-wide limiter for provider LLM calls.
+
+- Requests per minute and tokens per minute: token buckets (a full
+  minute of quota may burst, then refills continuously)
+- Maximum in-flight calls
+- Fair: callers are admitted strictly in arrival order (FIFO), sync
+  threads and async tasks share the same queue
+- Rate-limit / overload errors are retried with full-jitter exponential
+  backoff; every retry queues again like a new call
+- Token cost is estimated before the call and settled with the
+  provider's usage afterwards (over-use becomes debt on the bucket)
+- Abandoned calls (the caller stopped waiting, see `abandoned`) leave the
+  queue and are not retried
+"""
+import os
+import time
+import random
+import asyncio
+import threading
+import contextvars
+from collections import deque
+from typing import Callable, Optional
+
+# unlimited unless configured (0 → no limit); set them to the project's
+# provider quota, e.g. Gemini 2.5 Flash free tier: LLM_RPM=10 LLM_TPM=250000
+LLM_RPM = int(os.getenv("LLM_RPM", 0))
+LLM_TPM = int(os.getenv("LLM_TPM", 0))
+LLM_MAX_IN_FLIGHT = int(os.getenv("LLM_MAX_IN_FLIGHT", 0))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", 5))
+BACKOFF_BASE_SECONDS = 1.0
+BACKOFF_CAP_SECONDS = 30.0
+ASYNC_POLL_SECONDS = 0.05      # async waiters re-check at least this often
+IDLE_WAIT_SECONDS = 1.0        # sync waiters are woken on release anyway
+
+RETRYABLE_CODES = {429, 500, 503}
+RETRYABLE_MARKERS = (
+    "429", "resource_exhausted", "resourceexhausted", "rate limit",
+    "ratelimit", "quota", "503", "unavailable", "overloaded"
+)
+
+
+# set by callers that may stop waiting on a sync call they cannot cancel
+# (agents/deadline.py); once the event is set the call gives up its place
+abandoned: contextvars.ContextVar = contextvars.ContextVar("llm_call_abandoned", default=None)
+
+
+class CallAbandoned(Exception):
+    pass
+
+
+def _check_abandoned():
+    event = abandoned.get()
+    if event is not None and event.is_set():
+        raise CallAbandoned("caller stopped waiting")
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """Provider rate-limit / overload errors (by status code or message)."""
+    code = getattr(exc, "code", None) or getattr(exc, "status_code", None)
+    if code in RETRYABLE_CODES:
+        return True
+    text = f"{type(exc).__name__} {exc}".lower()
+    return any(marker in text for marker in RETRYABLE_MARKERS)
+
+
+class TokenBucket:
+    """Refills `per_minute` units per minute up to `capacity`. Not thread-safe: callers lock."""
+
+    def __init__(self, per_minute: float, capacity: Optional[float] = None):
+        self.capacity = float(capacity or per_minute)
+        self.rate = per_minute / 60.0
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until `amount` is available (0 → take it now)."""
+        self._refill(now)
+        amount = min(amount, self.capacity)   # oversized calls wait for a full bucket, not forever
+        return 0.0 if self.level >= amount else (amount - self.level) / self.rate
+
+    def take(self, amount: float):
+        self.level -= min(amount, self.capacity)
+
+    def adjust(self, amount: float):
+        # positive → charge more (may go negative: debt), negative → refund
+        self.level = min(self.capacity, self.level - amount)
+
+
+class LLMRateLimiter:
+    def __init__(
+        self,
+        rpm: int = LLM_RPM,
+        tpm: int = LLM_TPM,
+        max_in_flight: int = LLM_MAX_IN_FLIGHT,
+        max_retries: int = LLM_MAX_RETRIES
+    ):
+        # <= 0 disables a limit
+        self._requests = TokenBucket(rpm) if rpm > 0 else None
+        self._tokens = TokenBucket(tpm) if tpm > 0 else None
+        self.max_in_flight = max_in_flight if max_in_flight > 0 else None
+        self.max_retries = max_retries
+
+        self._cond = threading.Condition()
+        self._queue = deque()
+        self._in_flight = 0
+
+        self.calls = 0
+        self.retries = 0
+        self.failures = 0
+        self.waited_seconds = 0.0
+
+    # --------------------
+    # ADMISSION
+    # --------------------
+    def _try_admit(self, ticket, tokens: int) -> float:
+        """Under the lock: admit `ticket` (→ 0.0) or return seconds to wait."""
+        if self._queue[0] is not ticket:
+            return IDLE_WAIT_SECONDS
+        if self.max_in_flight is not None and self._in_flight >= self.max_in_flight:
+            return IDLE_WAIT_SECONDS
+
+        now = time.monotonic()
+        wait = max(
+            self._requests.wait_time(1, now) if self._requests else 0.0,
+            self._tokens.wait_time(tokens, now) if self._tokens else 0.0
+        )
+        if wait > 0:
+            return wait
+
+        if self._requests:
+            self._requests.take(1)
+        if self._tokens:
+            self._tokens.take(tokens)
+        self._in_flight += 1
+        self.calls += 1
+        self._queue.popleft()
+        self._cond.notify_all()   # next in line may be admissible too
+        return 0.0
+
+    def _leave(self, ticket):
+        # cancelled / failed while queued: don't block the callers behind
+        with self._cond:
+            if ticket in self._queue:
+                self._queue.remove(ticket)
+                self._cond.notify_all()
+
+    def acquire(self, tokens: int) -> int:
+        """Block until admitted; returns the reserved tokens for `release`."""
+        ticket = object()
+        start = time.perf_counter()
+        with self._cond:
+            self._queue.append(ticket)
+        try:
+            with self._cond:
+                while True:
+                    # abandoned waiters are never admitted, and leave within IDLE_WAIT_SECONDS
+                    _check_abandoned()
+                    wait = self._try_admit(ticket, tokens)
+                    if wait <= 0:
+                        break
+                    self._cond.wait(min(wait, IDLE_WAIT_SECONDS))
+        finally:
+            self._leave(ticket)
+        self._waited(start)
+        return tokens
+
+    async def aacquire(self, tokens: int) -> int:
+        ticket = object()
+        start = time.perf_counter()
+        with self._cond:
+            self._queue.append(ticket)
+        try:
+            while True:
+                with self._cond:
+                    wait = self._try_admit(ticket, tokens)
+                if wait <= 0:
+                    break
+                await asyncio.sleep(min(wait, ASYNC_POLL_SECONDS))
+        finally:
+            self._leave(ticket)
+        self._waited(start)
+        return tokens
+
+    def release(self, reserved: int, used: Optional[int] = None):
+        """Free the in-flight slot; settle the token estimate with actual usage."""
+        with self._cond:
+            self._in_flight -= 1
+            if used is not None and self._tokens:
+                self._tokens.adjust(used - reserved)
+            self._cond.notify_all()
+
+    def _waited(self, start: float):
+        with self._cond:
+            self.waited_seconds += time.perf_counter() - start
+
+    # --------------------
+    # RETRY
+    # --------------------
+    def _backoff(self, exc: BaseException, attempt: int) -> Optional[float]:
+        """Seconds to sleep before retrying, or None → re-raise."""
+        if attempt >= self.max_retries or not is_retryable(exc):
+            with self._cond:
+                self.failures += 1
+            return None
+
+        with self._cond:
+            self.retries += 1
+        delay = random.uniform(0, min(BACKOFF_CAP_SECONDS, BACKOFF_BASE_SECONDS * 2 ** attempt))
+        print(f"⏳ LLM rate limited ({type(exc).__name__}), retry {attempt + 1} in {delay:.1f}s")
+        return delay
+
+    def call(self, fn: Callable, tokens: int, usage: Callable = lambda result: None):
+        attempt = 0
+        while True:
+            reserved = self.acquire(tokens)
+            used = None
+            try:
+                result = fn()
+                used = usage(result)
+                return result
+            except Exception as e:
+                delay = self._backoff(e, attempt)
+                if delay is None:
+                    raise
+            finally:
+                self.release(reserved, used)
+            time.sleep(delay)
+            _check_abandoned()
+            attempt += 1
+
+    async def acall(self, afn: Callable, tokens: int, usage: Callable = lambda result: None):
+        attempt = 0
+        while True:
+            reserved = await self.aacquire(tokens)
+            used = None
+            try:
+                result = await afn()
+                used = usage(result)
+                return result
+            except Exception as e:
+                delay = self._backoff(e, attempt)
+                if delay is None:
+                    raise
+            finally:
+                self.release(reserved, used)
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    def stream(self, make_stream: Callable, tokens: int, usage: Callable = lambda chunk: None):
+        """
+        Holds the in-flight slot until the stream is exhausted or closed.
+        Retried only if nothing was yielded yet.
+        """
+        attempt = 0
+        while True:
+            reserved = self.acquire(tokens)
+            used, started = None, False
+            try:
+                for chunk in make_stream():
+                    started = True
+                    # no reported usage → keep the estimate (None), not a refund
+                    u = usage(chunk)
+                    if u is not None:
+                        used = (used or 0) + u
+                    yield chunk
+                return
+            except Exception as e:
+                delay = None if started else self._backoff(e, attempt)
+                if delay is None:
+                    raise
+            finally:
+                self.release(reserved, used)
+            time.sleep(delay)
+            _check_abandoned()
+            attempt += 1
+
+    async def astream(self, make_stream: Callable, tokens: int, usage: Callable = lambda chunk: None):
+        attempt = 0
+        while True:
+            reserved = await self.aacquire(tokens)
+            used, started = None, False
+            try:
+                async for chunk in make_stream():
+                    started = True
+                    # no reported usage → keep the estimate (None), not a refund
+                    u = usage(chunk)
+                    if u is not None:
+                        used = (used or 0) + u
+                    yield chunk
+                return
+            except Exception as e:
+                delay = None if started else self._backoff(e, attempt)
+                if delay is None:
+                    raise
+            finally:
+                self.release(reserved, used)
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    # --------------------
+    # METRICS
+    # --------------------
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "calls": self.calls,
+                "retries": self.retries,
+                "failures": self.failures,
+                "in_flight": self._in_flight,
+                "queued": len(self._queue),
+                "waited_seconds": self.waited_seconds,
+            }
+
+
+llm_limiter = LLMRateLimiter()
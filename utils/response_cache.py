@@ -0,0 +1,189 @@
+# response_cache.py
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+import unicodedata
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Optional
+
+from utils.index_version import current_index_version
+
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", 5_000))
+RESPONSE_CACHE_TTL_SECONDS = float(os.getenv("RESPONSE_CACHE_TTL_SECONDS", 24 * 3600))
+RESPONSE_CACHE_DB = os.getenv("RESPONSE_CACHE_DB")   # unset → memory only
+
+# stripped from the END only: inner punctuation is meaningful ("C++", ".NET", "a/b")
+TRAILING_PUNCTUATION = "?!.,;:…。？！"
+
+
+def normalize_query(query: str) -> str:
+    """
+    Questions differing only in case, whitespace or trailing punctuation
+    share one cache entry.
+    """
+    query = unicodedata.normalize("NFKC", query or "").casefold()
+    query = " ".join(query.split())
+    return query.rstrip(TRAILING_PUNCTUATION).rstrip()
+
+
+class ResponseCache:
+    """
+    Whole-pipeline response cache: normalised query → final response.
+
+    - Key includes the published index version, so a new ingestion /
+      index build makes every earlier entry unreachable (and purged)
+    - In-memory LRU with TTL; optional SQLite tier shared across
+      restarts / processes
+    - Hit / miss metrics
+    """
+
+    def __init__(
+        self,
+        max_entries: int = RESPONSE_CACHE_MAX_ENTRIES,
+        ttl_seconds: float = RESPONSE_CACHE_TTL_SECONDS,
+        disk_path: Optional[str] = RESPONSE_CACHE_DB
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.disk_path = disk_path
+
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()   # key → (response, expires_at)
+        self._lock = threading.Lock()
+        self._version = None
+
+        self.hits = 0
+        self.misses = 0
+
+        if disk_path:
+            with self._disk() as db:
+                db.execute("PRAGMA journal_mode=WAL")   # concurrent readers
+                db.execute("""
+                    CREATE TABLE IF NOT EXISTS responses (
+                        key TEXT PRIMARY KEY,
+                        index_version TEXT NOT NULL,
+                        response TEXT NOT NULL,
+                        expires_at REAL NOT NULL
+                    )
+                """)
+                db.execute("DELETE FROM responses WHERE expires_at <= ?", (time.time(),))
+
+    @contextmanager
+    def _disk(self):
+        # short-lived connections: safe across threads and processes
+        db = sqlite3.connect(self.disk_path, timeout=5)
+        try:
+            with db:   # commit / rollback
+                yield db
+        finally:
+            db.close()
+
+    # --------------------
+    # KEYS / VERSIONING
+    # --------------------
+    def version(self) -> str:
+        """
+        Published index version (purges entries of older ones). Capture it
+        BEFORE computing a response and pass it to get / put, so an answer
+        computed against version N is never stored under N + 1.
+        """
+        version = current_index_version()
+        if version != self._version:
+            self._on_new_version(version)
+        return version
+
+    @staticmethod
+    def _key(query: str, version: str) -> str:
+        raw = f"{version}\n{normalize_query(query)}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _on_new_version(self, version: str) -> None:
+        with self._lock:
+            if version == self._version:
+                return
+            self._entries.clear()
+            self._version = version
+
+        if self.disk_path:
+            with self._disk() as db:
+                db.execute("DELETE FROM responses WHERE index_version != ?", (version,))
+
+    # --------------------
+    # READ / WRITE
+    # --------------------
+    def get(self, query: str, version: Optional[str] = None) -> Optional[dict]:
+        key = self._key(query, version or self.version())
+        now = time.time()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return dict(entry[0])
+            if entry is not None:
+                del self._entries[key]
+
+        if self.disk_path:
+            with self._disk() as db:
+                row = db.execute(
+                    "SELECT response, expires_at FROM responses WHERE key = ? AND expires_at > ?",
+                    (key, now)
+                ).fetchone()
+            if row is not None:
+                response = json.loads(row[0])
+                self._remember(key, response, row[1])
+                with self._lock:
+                    self.hits += 1
+                return dict(response)
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, query: str, response: dict, version: Optional[str] = None) -> None:
+        current = self.version()
+        if version is not None and version != current:
+            return   # computed against an index that has since been replaced
+
+        key = self._key(query, current)
+        expires_at = time.time() + self.ttl_seconds
+        self._remember(key, response, expires_at)
+
+        if self.disk_path:
+            with self._disk() as db:
+                db.execute(
+                    "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)",
+                    (key, current, json.dumps(response, default=str), expires_at)
+                )
+
+    def _remember(self, key: str, response: dict, expires_at: float) -> None:
+        with self._lock:
+            self._entries[key] = (dict(response), expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+        if self.disk_path:
+            with self._disk() as db:
+                db.execute("DELETE FROM responses")
+
+    # --------------------
+    # METRICS
+    # --------------------
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "index_version": self._version,
+            }
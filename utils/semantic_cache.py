@@ -0,0 +1,130 @@
+# semantic_cache.py
+import os
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+import faiss
+import numpy as np
+
+from utils.index_version import current_index_version
+
+# off by default: a different question with a similar embedding would get
+# another query's answer; enable with SEMANTIC_CACHE=1
+SEMANTIC_CACHE_ENABLED = os.getenv("SEMANTIC_CACHE", "0") == "1"
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", 0.92))
+SEMANTIC_CACHE_MAX_ENTRIES = int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", 2_000))
+
+
+class SemanticCache:
+    """
+    Answer cache keyed by query-embedding similarity (paraphrases hit).
+
+    - Small FAISS inner-product index over normalised query embeddings
+    - Hit = nearest cached query with cosine >= threshold
+    - LRU eviction past max_entries (vectors removed from the index)
+    - Cleared when a new index version is published
+
+    Stores answers only; callers re-verify citations before reuse.
+    """
+
+    def __init__(
+        self,
+        dim: Optional[int] = None,
+        threshold: float = SEMANTIC_CACHE_THRESHOLD,
+        max_entries: int = SEMANTIC_CACHE_MAX_ENTRIES
+    ):
+        if dim is None:
+            # the query embedder's output size
+            from indexes.dense_embeddings import TEXT_EMBEDDING_DIM
+            dim = TEXT_EMBEDDING_DIM
+        self.dim = dim
+        self.threshold = threshold
+        self.max_entries = max_entries
+
+        self.index = faiss.IndexIDMap(faiss.IndexFlatIP(dim))
+        self._entries: "OrderedDict[int, dict]" = OrderedDict()   # id → entry, LRU order
+        self._next_id = 0
+        self._version = None
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _prepare(self, embedding: np.ndarray) -> np.ndarray:
+        # a copy: normalize_L2 works in place and the caller reuses its embedding
+        vector = np.array(embedding, dtype="float32", copy=True).reshape(1, -1)
+        if vector.shape[1] != self.dim:
+            raise ValueError(f"Embedding dim mismatch: expected {self.dim}, got {vector.shape[1]}")
+        faiss.normalize_L2(vector)
+        return vector
+
+    def _check_version(self) -> None:
+        # caller holds the lock
+        version = current_index_version()
+        if version != self._version:
+            self.index.reset()
+            self._entries.clear()
+            self._version = version
+
+    # --------------------
+    # LOOKUP / STORE
+    # --------------------
+    def lookup(self, embedding: np.ndarray) -> Optional[Tuple[dict, float]]:
+        """(entry, similarity) of the closest cached query above threshold, else None."""
+        vector = self._prepare(embedding)
+
+        with self._lock:
+            self._check_version()
+
+            if self.index.ntotal == 0:
+                self.misses += 1
+                return None
+
+            scores, ids = self.index.search(vector, 1)
+            entry_id, score = int(ids[0][0]), float(scores[0][0])
+
+            if entry_id == -1 or score < self.threshold:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(entry_id)
+            self.hits += 1
+            return {**self._entries[entry_id], "entry_id": entry_id}, score
+
+    def store(self, embedding: np.ndarray, entry: dict) -> None:
+        vector = self._prepare(embedding)
+
+        with self._lock:
+            self._check_version()
+
+            entry_id = self._next_id
+            self._next_id += 1
+            self.index.add_with_ids(vector, np.array([entry_id], dtype="int64"))
+            self._entries[entry_id] = dict(entry)
+
+            while len(self._entries) > self.max_entries:
+                old_id, _ = self._entries.popitem(last=False)
+                self.index.remove_ids(np.array([old_id], dtype="int64"))
+                self.evictions += 1
+
+    def invalidate(self, entry_id: int) -> None:
+        """Drop one entry (e.g. its citations failed re-verification)."""
+        with self._lock:
+            if self._entries.pop(entry_id, None) is not None:
+                self.index.remove_ids(np.array([entry_id], dtype="int64"))
+
+    # --------------------
+    # METRICS
+    # --------------------
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+            }